@@ -1,13 +1,58 @@
-from app.db.database import get_connection, init_db, insert_lead, get_all_leads
+from app.db.database import (
+    get_connection,
+    open_pool,
+    close_pool,
+    get_pool_stats,
+    get_async_connection,
+    open_async_pool,
+    close_async_pool,
+    get_async_pool_stats,
+    init_db,
+    insert_lead,
+    insert_leads,
+    bulk_insert_leads,
+    count_leads_by_place_ids,
+    get_lead_identities,
+    get_all_leads
+)
 from app.db.api_keys import (
     create_tables as create_api_key_tables,
     create_api_key,
+    create_api_key_async,
     validate_api_key,
+    validate_api_key_async,
     get_api_key_by_id,
+    get_api_key_by_id_async,
     list_api_keys,
+    list_api_keys_async,
     revoke_api_key,
+    revoke_api_key_async,
     delete_api_key,
+    delete_api_key_async,
     log_usage,
+    bulk_log_usage,
+    insert_usage_events,
+    rebuild_usage_counters,
     get_usage_stats,
-    check_quota
+    get_usage_stats_async,
+    check_quota,
+    check_quota_async
+)
+from app.db.key_cache import key_cache
+from app.db.usage_partitions import (
+    maintain_usage_partitions,
+    list_usage_partitions
+)
+from app.db.checkpoints import (
+    save_checkpoint,
+    load_checkpoint,
+    list_checkpoints,
+    mark_interrupted,
+    delete_checkpoint
+)
+from app.db.search_cache import (
+    normalize_query,
+    get_cached_search,
+    store_search,
+    get_search_cache_stats
 )
@@ -1,16 +1,22 @@
 """
 API Key and Usage Log database operations.
+
+Functions used by async route handlers and dependencies have a `_async`
+twin running the same query over `get_async_connection()`, so a slow query
+doesn't block the event loop. The sync versions serve threads.
 """
 import secrets
 import hashlib
 from datetime import datetime, timedelta
 from typing import Optional, Dict, List
-from app.db.database import get_connection
+from app.db.database import get_connection, get_async_connection
+from app.db.key_cache import key_cache
+from app.db.usage_partitions import create_usage_logs, maintain_usage_partitions, retention_start
 from config import settings, get_tier_limit
 
 
 def create_tables():
-    """Create api_keys and usage_logs tables if they don't exist."""
+    """Create api_keys, usage_logs and usage_counters tables if they don't exist."""
     with get_connection() as conn:
         with conn.cursor() as cur:
             # API Keys table
@@ -28,19 +34,32 @@ def create_tables():
                 )
             ''')
             
-            # Usage logs table
+            # Usage logs table, partitioned by month
+            create_usage_logs(cur)
+            
+            # Per-key monthly totals kept up to date by log_usage
             cur.execute('''
-                CREATE TABLE IF NOT EXISTS usage_logs (
-                    id SERIAL PRIMARY KEY,
-                    api_key_id INT REFERENCES api_keys(id) ON DELETE CASCADE,
-                    endpoint VARCHAR(255),
-                    leads_scraped INT DEFAULT 0,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                CREATE TABLE IF NOT EXISTS usage_counters (
+                    api_key_id INT NOT NULL REFERENCES api_keys(id) ON DELETE CASCADE,
+                    month DATE NOT NULL,
+                    requests BIGINT NOT NULL DEFAULT 0,
+                    leads BIGINT NOT NULL DEFAULT 0,
+                    PRIMARY KEY (api_key_id, month)
                 )
             ''')
             
+            # Logs written before the counters existed
+            cur.execute('''
+                SELECT NOT EXISTS (SELECT 1 FROM usage_counters)
+                   AND EXISTS (SELECT 1 FROM usage_logs) AS backfill
+            ''')
+            backfill = cur.fetchone()["backfill"]
+            
             conn.commit()
-    print("✅ API Keys and Usage Logs tables initialized.")
+    maintain_usage_partitions()
+    if backfill:
+        rebuild_usage_counters()
+    print("✅ API Keys, Usage Logs and Usage Counters tables initialized.")
 
 
 def generate_api_key() -> tuple[str, str, str]:
@@ -61,6 +80,39 @@ def generate_api_key() -> tuple[str, str, str]:
     return full_key, key_hash, key_prefix
 
 
+CREATE_KEY_QUERY = '''
+    INSERT INTO api_keys (name, key_hash, key_prefix, tier, monthly_limit, expires_at)
+    VALUES (%s, %s, %s, %s, %s, %s)
+    RETURNING id, created_at
+'''
+
+
+def _new_key_row(name: str, tier: str, expires_in_days: Optional[int]) -> tuple[str, tuple]:
+    """Generate a key and the values of its api_keys row."""
+    full_key, key_hash, key_prefix = generate_api_key()
+    monthly_limit = get_tier_limit(tier)
+    
+    expires_at = None
+    if expires_in_days:
+        expires_at = datetime.now() + timedelta(days=expires_in_days)
+    
+    return full_key, (name, key_hash, key_prefix, tier, monthly_limit, expires_at)
+
+
+def _created_key(full_key: str, row: tuple, result: Dict) -> Dict:
+    name, _, key_prefix, tier, monthly_limit, expires_at = row
+    return {
+        "id": result["id"],
+        "name": name,
+        "key": full_key,  # Only returned once!
+        "key_prefix": key_prefix,
+        "tier": tier,
+        "monthly_limit": monthly_limit,
+        "created_at": result["created_at"],
+        "expires_at": expires_at
+    }
+
+
 def create_api_key(
     name: str,
     tier: str = "free",
@@ -70,166 +122,392 @@ def create_api_key(
     Create a new API key and store it in the database.
     Returns the key info including the UNHASHED key (only shown once).
     """
-    full_key, key_hash, key_prefix = generate_api_key()
-    monthly_limit = get_tier_limit(tier)
-    
-    expires_at = None
-    if expires_in_days:
-        expires_at = datetime.now() + timedelta(days=expires_in_days)
+    full_key, row = _new_key_row(name, tier, expires_in_days)
     
     with get_connection() as conn:
         with conn.cursor() as cur:
-            cur.execute('''
-                INSERT INTO api_keys (name, key_hash, key_prefix, tier, monthly_limit, expires_at)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                RETURNING id, created_at
-            ''', (name, key_hash, key_prefix, tier, monthly_limit, expires_at))
-            
+            cur.execute(CREATE_KEY_QUERY, row)
             result = cur.fetchone()
             conn.commit()
-            
-            return {
-                "id": result["id"],
-                "name": name,
-                "key": full_key,  # Only returned once!
-                "key_prefix": key_prefix,
-                "tier": tier,
-                "monthly_limit": monthly_limit,
-                "created_at": result["created_at"],
-                "expires_at": expires_at
-            }
+            return _created_key(full_key, row, result)
+
+
+async def create_api_key_async(
+    name: str,
+    tier: str = "free",
+    expires_in_days: Optional[int] = None
+) -> Dict:
+    """Async `create_api_key`, for async route handlers."""
+    full_key, row = _new_key_row(name, tier, expires_in_days)
+    
+    async with get_async_connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(CREATE_KEY_QUERY, row)
+            result = await cur.fetchone()
+            await conn.commit()
+            return _created_key(full_key, row, result)
+
+
+VALIDATE_KEY_QUERY = '''
+    SELECT id, name, key_prefix, tier, monthly_limit, is_active, expires_at
+    FROM api_keys
+    WHERE key_hash = %s
+'''
+
+
+def hash_api_key(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode()).hexdigest()
+
+
+def _usable_key(result: Optional[Dict]) -> Optional[Dict]:
+    """The key's row if it exists, is active and hasn't expired."""
+    if not result:
+        return None
+    
+    # Check if active
+    if not result["is_active"]:
+        return None
+    
+    # Check if expired
+    if result["expires_at"] and result["expires_at"] < datetime.now():
+        return None
+    
+    return dict(result)
 
 
 def validate_api_key(api_key: str) -> Optional[Dict]:
     """
     Validate an API key and return its info if valid.
     Returns None if invalid, expired, or inactive.
+    Valid keys are served from `key_cache` until its TTL runs out.
     """
-    key_hash = hashlib.sha256(api_key.encode()).hexdigest()
+    key_hash = hash_api_key(api_key)
+    cached = key_cache.get(key_hash)
+    if cached:
+        return cached
     
+    generation = key_cache.generation()
     with get_connection() as conn:
         with conn.cursor() as cur:
-            cur.execute('''
-                SELECT id, name, key_prefix, tier, monthly_limit, is_active, expires_at
-                FROM api_keys
-                WHERE key_hash = %s
-            ''', (key_hash,))
-            
-            result = cur.fetchone()
-            
-            if not result:
-                return None
-            
-            # Check if active
-            if not result["is_active"]:
-                return None
-            
-            # Check if expired
-            if result["expires_at"] and result["expires_at"] < datetime.now():
-                return None
-            
-            return dict(result)
+            cur.execute(VALIDATE_KEY_QUERY, (key_hash,))
+            key_data = _usable_key(cur.fetchone())
+    
+    if key_data:
+        key_cache.put(key_hash, key_data, generation)
+    return key_data
+
+
+async def validate_api_key_async(api_key: str) -> Optional[Dict]:
+    """Async `validate_api_key`, for the auth dependencies."""
+    key_hash = hash_api_key(api_key)
+    cached = key_cache.get(key_hash)
+    if cached:
+        return cached
+    
+    generation = key_cache.generation()
+    async with get_async_connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(VALIDATE_KEY_QUERY, (key_hash,))
+            key_data = _usable_key(await cur.fetchone())
+    
+    if key_data:
+        key_cache.put(key_hash, key_data, generation)
+    return key_data
+
+
+GET_KEY_QUERY = '''
+    SELECT id, name, key_prefix, tier, monthly_limit, is_active, created_at, expires_at
+    FROM api_keys
+    WHERE id = %s
+'''
+
+LIST_KEYS_QUERY = '''
+    SELECT id, name, key_prefix, tier, monthly_limit, is_active, created_at, expires_at
+    FROM api_keys
+    ORDER BY created_at DESC
+'''
+
+REVOKE_KEY_QUERY = 'UPDATE api_keys SET is_active = FALSE WHERE id = %s RETURNING id'
+
+DELETE_KEY_QUERY = 'DELETE FROM api_keys WHERE id = %s RETURNING id'
 
 
 def get_api_key_by_id(key_id: int) -> Optional[Dict]:
     """Get API key info by ID (for admin operations)."""
     with get_connection() as conn:
         with conn.cursor() as cur:
-            cur.execute('''
-                SELECT id, name, key_prefix, tier, monthly_limit, is_active, created_at, expires_at
-                FROM api_keys
-                WHERE id = %s
-            ''', (key_id,))
+            cur.execute(GET_KEY_QUERY, (key_id,))
             result = cur.fetchone()
             return dict(result) if result else None
 
 
+async def get_api_key_by_id_async(key_id: int) -> Optional[Dict]:
+    """Async `get_api_key_by_id`."""
+    async with get_async_connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(GET_KEY_QUERY, (key_id,))
+            result = await cur.fetchone()
+            return dict(result) if result else None
+
+
 def list_api_keys() -> List[Dict]:
     """List all API keys (masked) for admin."""
     with get_connection() as conn:
         with conn.cursor() as cur:
-            cur.execute('''
-                SELECT id, name, key_prefix, tier, monthly_limit, is_active, created_at, expires_at
-                FROM api_keys
-                ORDER BY created_at DESC
-            ''')
+            cur.execute(LIST_KEYS_QUERY)
             return [dict(row) for row in cur.fetchall()]
 
 
+async def list_api_keys_async() -> List[Dict]:
+    """Async `list_api_keys`."""
+    async with get_async_connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(LIST_KEYS_QUERY)
+            return [dict(row) for row in await cur.fetchall()]
+
+
 def revoke_api_key(key_id: int) -> bool:
-    """Revoke (deactivate) an API key."""
+    """Revoke (deactivate) an API key and drop it from the key cache."""
     with get_connection() as conn:
         with conn.cursor() as cur:
-            cur.execute('''
-                UPDATE api_keys SET is_active = FALSE WHERE id = %s RETURNING id
-            ''', (key_id,))
+            cur.execute(REVOKE_KEY_QUERY, (key_id,))
             result = cur.fetchone()
             conn.commit()
-            return result is not None
+    key_cache.invalidate(key_id)
+    return result is not None
+
+
+async def revoke_api_key_async(key_id: int) -> bool:
+    """Async `revoke_api_key`."""
+    async with get_async_connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(REVOKE_KEY_QUERY, (key_id,))
+            result = await cur.fetchone()
+            await conn.commit()
+    key_cache.invalidate(key_id)
+    return result is not None
 
 
 def delete_api_key(key_id: int) -> bool:
-    """Permanently delete an API key."""
+    """Permanently delete an API key and drop it from the key cache."""
     with get_connection() as conn:
         with conn.cursor() as cur:
-            cur.execute('DELETE FROM api_keys WHERE id = %s RETURNING id', (key_id,))
+            cur.execute(DELETE_KEY_QUERY, (key_id,))
             result = cur.fetchone()
             conn.commit()
-            return result is not None
+    key_cache.invalidate(key_id)
+    return result is not None
+
+
+async def delete_api_key_async(key_id: int) -> bool:
+    """Async `delete_api_key`."""
+    async with get_async_connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(DELETE_KEY_QUERY, (key_id,))
+            result = await cur.fetchone()
+            await conn.commit()
+    key_cache.invalidate(key_id)
+    return result is not None
 
 
 # ============== Usage Logging ==============
 
+# Month a usage event counts towards, as stored in usage_counters
+CURRENT_MONTH = "date_trunc('month', CURRENT_TIMESTAMP)::date"
+
 def log_usage(api_key_id: int, endpoint: str, leads_scraped: int = 0):
-    """Log an API usage event."""
+    """Log an API usage event and add it to the key's counter for this month."""
     with get_connection() as conn:
         with conn.cursor() as cur:
             cur.execute('''
                 INSERT INTO usage_logs (api_key_id, endpoint, leads_scraped)
                 VALUES (%s, %s, %s)
             ''', (api_key_id, endpoint, leads_scraped))
+            cur.execute(f'''
+                INSERT INTO usage_counters (api_key_id, month, requests, leads)
+                VALUES (%s, {CURRENT_MONTH}, 1, %s)
+                ON CONFLICT (api_key_id, month) DO UPDATE SET
+                    requests = usage_counters.requests + 1,
+                    leads = usage_counters.leads + EXCLUDED.leads
+            ''', (api_key_id, leads_scraped))
             conn.commit()
 
 
-def get_usage_stats(api_key_id: int) -> Dict:
-    """Get usage statistics for an API key."""
+def bulk_log_usage(events: List[Dict]) -> int:
+    """
+    Log many usage events with one COPY, one insert into usage_logs and one
+    grouped counter update. Each event is a dict with api_key_id, endpoint,
+    leads_scraped and an aware `timestamp` of when it happened. Events of
+    keys deleted in the meantime are dropped. Returns how many were logged;
+    raises on error, in which case nothing is logged.
+    """
+    if not events:
+        return 0
     with get_connection() as conn:
         with conn.cursor() as cur:
-            # Total usage
             cur.execute('''
-                SELECT 
-                    COUNT(*) as total_requests,
-                    COALESCE(SUM(leads_scraped), 0) as total_leads
-                FROM usage_logs
-                WHERE api_key_id = %s
-            ''', (api_key_id,))
-            totals = cur.fetchone()
-            
-            # This month's usage
+                CREATE TEMP TABLE usage_staging (
+                    api_key_id INT,
+                    endpoint VARCHAR(255),
+                    leads_scraped INT,
+                    timestamp TIMESTAMPTZ
+                ) ON COMMIT DROP
+            ''')
+            with cur.copy("COPY usage_staging (api_key_id, endpoint, leads_scraped, timestamp) FROM STDIN") as copy:
+                for event in events:
+                    copy.write_row((event["api_key_id"], event["endpoint"], event["leads_scraped"], event["timestamp"]))
+            # Stored in the session time zone, like CURRENT_TIMESTAMP
+            cur.execute('''
+                INSERT INTO usage_logs (api_key_id, endpoint, leads_scraped, timestamp)
+                SELECT s.api_key_id, s.endpoint, s.leads_scraped, s.timestamp::timestamp
+                FROM usage_staging s
+                JOIN api_keys k ON k.id = s.api_key_id
+            ''')
+            logged = cur.rowcount
+            cur.execute('''
+                INSERT INTO usage_counters (api_key_id, month, requests, leads)
+                SELECT s.api_key_id, date_trunc('month', s.timestamp::timestamp)::date, COUNT(*), SUM(s.leads_scraped)
+                FROM usage_staging s
+                JOIN api_keys k ON k.id = s.api_key_id
+                GROUP BY 1, 2
+                ON CONFLICT (api_key_id, month) DO UPDATE SET
+                    requests = usage_counters.requests + EXCLUDED.requests,
+                    leads = usage_counters.leads + EXCLUDED.leads
+            ''')
+            conn.commit()
+    return logged
+
+
+def insert_usage_events(events: List[Dict]) -> int:
+    """
+    Log a batch of usage events with `bulk_log_usage`. If the batch fails,
+    every event is retried on its own so one bad event doesn't lose the
+    others. Returns how many were logged.
+    """
+    if not events:
+        return 0
+    try:
+        return bulk_log_usage(events)
+    except Exception as e:
+        print(f"⚠️ Batch log of {len(events)} usage events failed, logging one by one: {e}")
+    logged = 0
+    for event in events:
+        try:
+            logged += bulk_log_usage([event])
+        except Exception as e:
+            print(f"❌ Usage event {event['endpoint']} for key {event['api_key_id']} not logged: {e}")
+    return logged
+
+
+def rebuild_usage_counters(api_key_id: Optional[int] = None) -> Dict:
+    """
+    Recompute usage counters from usage_logs, for one key or all of them.
+    Concurrent log_usage calls wait until the rebuild commits, so none is
+    lost or counted twice. Months before the retention window keep their
+    counters, as their logs are gone. Returns how many counters were rebuilt and how
+    many of them had drifted from the logs.
+    """
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute('LOCK TABLE usage_counters IN SHARE ROW EXCLUSIVE MODE')
+            params = {"key": api_key_id, "since": retention_start(cur)}
             cur.execute('''
-                SELECT COALESCE(SUM(leads_scraped), 0) as monthly_leads
+                CREATE TEMP TABLE usage_actual ON COMMIT DROP AS
+                SELECT
+                    api_key_id,
+                    date_trunc('month', timestamp)::date AS month,
+                    COUNT(*) AS requests,
+                    COALESCE(SUM(leads_scraped), 0) AS leads
                 FROM usage_logs
-                WHERE api_key_id = %s
-                AND timestamp >= date_trunc('month', CURRENT_TIMESTAMP)
-            ''', (api_key_id,))
-            monthly = cur.fetchone()
+                WHERE api_key_id IS NOT NULL
+                  AND (%(key)s::int IS NULL OR api_key_id = %(key)s::int)
+                  AND (%(since)s::date IS NULL OR timestamp >= %(since)s::date)
+                GROUP BY 1, 2
+            ''', params)
+            cur.execute('''
+                SELECT COUNT(*) AS drifted
+                FROM usage_actual a
+                FULL JOIN (
+                    SELECT * FROM usage_counters
+                    WHERE (%(key)s::int IS NULL OR api_key_id = %(key)s::int)
+                      AND (%(since)s::date IS NULL OR month >= %(since)s::date)
+                ) c USING (api_key_id, month)
+                WHERE a.requests IS DISTINCT FROM c.requests OR a.leads IS DISTINCT FROM c.leads
+            ''', params)
+            drifted = cur.fetchone()["drifted"]
+            cur.execute('''
+                DELETE FROM usage_counters
+                WHERE (%(key)s::int IS NULL OR api_key_id = %(key)s::int)
+                  AND (%(since)s::date IS NULL OR month >= %(since)s::date)
+            ''', params)
+            cur.execute('''
+                INSERT INTO usage_counters (api_key_id, month, requests, leads)
+                SELECT api_key_id, month, requests, leads FROM usage_actual
+            ''')
+            counters = cur.rowcount
+            conn.commit()
+    print(f"🔁 Rebuilt {counters} usage counters ({drifted} had drifted).")
+    return {"counters": counters, "drifted": drifted}
+
+
+USAGE_QUERY = f'''
+    SELECT 
+        COALESCE(SUM(requests), 0)::bigint as total_requests,
+        COALESCE(SUM(leads), 0)::bigint as total_leads,
+        COALESCE(SUM(leads) FILTER (WHERE month = {CURRENT_MONTH}), 0)::bigint as monthly_leads
+    FROM usage_counters
+    WHERE api_key_id = %s
+'''
+
+MONTHLY_LEADS_QUERY = f'''
+    SELECT leads as monthly_leads
+    FROM usage_counters
+    WHERE api_key_id = %s AND month = {CURRENT_MONTH}
+'''
+
+KEY_LIMIT_QUERY = 'SELECT monthly_limit FROM api_keys WHERE id = %s'
+
+
+def _usage_summary(api_key_id: int, usage: Dict, key_info: Optional[Dict]) -> Dict:
+    monthly_limit = key_info["monthly_limit"] if key_info else 100
+    
+    monthly_leads = usage["monthly_leads"]
+    remaining = monthly_limit - monthly_leads if monthly_limit > 0 else -1  # -1 = unlimited
+    
+    return {
+        "api_key_id": api_key_id,
+        "total_requests": usage["total_requests"],
+        "total_leads": usage["total_leads"],
+        "monthly_leads": monthly_leads,
+        "monthly_limit": monthly_limit,
+        "remaining_quota": remaining if remaining >= 0 else "unlimited"
+    }
+
+
+def get_usage_stats(api_key_id: int) -> Dict:
+    """Get usage statistics for an API key, from its monthly counters."""
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            # Total and this month's usage
+            cur.execute(USAGE_QUERY, (api_key_id,))
+            usage = cur.fetchone()
             
             # Get the key's limit
-            cur.execute('SELECT monthly_limit FROM api_keys WHERE id = %s', (api_key_id,))
+            cur.execute(KEY_LIMIT_QUERY, (api_key_id,))
             key_info = cur.fetchone()
-            monthly_limit = key_info["monthly_limit"] if key_info else 100
-            
-            monthly_leads = monthly["monthly_leads"] if monthly else 0
-            remaining = monthly_limit - monthly_leads if monthly_limit > 0 else -1  # -1 = unlimited
             
-            return {
-                "api_key_id": api_key_id,
-                "total_requests": totals["total_requests"],
-                "total_leads": totals["total_leads"],
-                "monthly_leads": monthly_leads,
-                "monthly_limit": monthly_limit,
-                "remaining_quota": remaining if remaining >= 0 else "unlimited"
-            }
+            return _usage_summary(api_key_id, usage, key_info)
+
+
+async def get_usage_stats_async(api_key_id: int) -> Dict:
+    """Async `get_usage_stats`."""
+    async with get_async_connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(USAGE_QUERY, (api_key_id,))
+            usage = await cur.fetchone()
+            await cur.execute(KEY_LIMIT_QUERY, (api_key_id,))
+            key_info = await cur.fetchone()
+            return _usage_summary(api_key_id, usage, key_info)
 
 
 def check_quota(api_key_id: int, monthly_limit: int) -> bool:
@@ -237,19 +515,29 @@ def check_quota(api_key_id: int, monthly_limit: int) -> bool:
     Check if the API key has remaining quota.
     Returns True if quota is available, False if exceeded.
     monthly_limit of -1 means unlimited.
+    One primary-key lookup of this month's counter.
     """
     if monthly_limit == -1:
         return True  # Unlimited
     
     with get_connection() as conn:
         with conn.cursor() as cur:
-            cur.execute('''
-                SELECT COALESCE(SUM(leads_scraped), 0) as monthly_leads
-                FROM usage_logs
-                WHERE api_key_id = %s
-                AND timestamp >= date_trunc('month', CURRENT_TIMESTAMP)
-            ''', (api_key_id,))
+            cur.execute(MONTHLY_LEADS_QUERY, (api_key_id,))
             result = cur.fetchone()
             monthly_leads = result["monthly_leads"] if result else 0
             
             return monthly_leads < monthly_limit
+
+
+async def check_quota_async(api_key_id: int, monthly_limit: int) -> bool:
+    """Async `check_quota`, for the auth dependencies."""
+    if monthly_limit == -1:
+        return True  # Unlimited
+    
+    async with get_async_connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(MONTHLY_LEADS_QUERY, (api_key_id,))
+            result = await cur.fetchone()
+            monthly_leads = result["monthly_leads"] if result else 0
+            
+            return monthly_leads < monthly_limit
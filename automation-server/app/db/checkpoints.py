@@ -0,0 +1,109 @@
+"""
+Durable checkpoints of automation tasks, so interrupted tasks can resume.
+
+A checkpoint holds the task's request and, per location, its status, lead
+count, the place ids already seen, the feed depth reached and the tiles
+already searched. It is rewritten while the task runs and once more when
+the task ends or the server shuts down.
+"""
+from typing import Optional, Dict, List
+from psycopg.types.json import Jsonb
+from app.db.database import get_connection
+
+
+def create_tables():
+    """Create the task_checkpoints table if it doesn't exist."""
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute('''
+                CREATE TABLE IF NOT EXISTS task_checkpoints (
+                    task_id VARCHAR(36) PRIMARY KEY,
+                    status VARCHAR(20) NOT NULL,
+                    request JSONB NOT NULL,
+                    locations JSONB NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            conn.commit()
+    print("✅ Task checkpoints table initialized.")
+
+
+def save_checkpoint(task_id: str, status: str, request: Dict, locations: Dict) -> bool:
+    """Insert or overwrite a task's checkpoint. Returns False if it couldn't be written."""
+    try:
+        with get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute('''
+                    INSERT INTO task_checkpoints (task_id, status, request, locations)
+                    VALUES (%s, %s, %s, %s)
+                    ON CONFLICT (task_id) DO UPDATE SET
+                        status = EXCLUDED.status,
+                        request = EXCLUDED.request,
+                        locations = EXCLUDED.locations,
+                        updated_at = CURRENT_TIMESTAMP
+                ''', (task_id, status, Jsonb(request), Jsonb(locations)))
+                conn.commit()
+                return True
+    except Exception as e:
+        print(f"❌ Checkpoint Error ({task_id}): {e}")
+        return False
+
+
+def load_checkpoint(task_id: str) -> Optional[Dict]:
+    """Get a task's checkpoint, or None if it has none."""
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute('''
+                SELECT task_id, status, request, locations, created_at, updated_at
+                FROM task_checkpoints
+                WHERE task_id = %s
+            ''', (task_id,))
+            result = cur.fetchone()
+            return dict(result) if result else None
+
+
+def list_checkpoints(statuses: Optional[List[str]] = None) -> List[Dict]:
+    """Summaries of stored checkpoints (without seen ids), newest first."""
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute('''
+                SELECT
+                    task_id, status, request->>'industry' AS industry,
+                    (SELECT COUNT(*) FROM jsonb_object_keys(locations)) AS locations,
+                    (SELECT COUNT(*) FROM jsonb_each(locations) l WHERE l.value->>'status' = 'completed') AS locations_completed,
+                    created_at, updated_at
+                FROM task_checkpoints
+                WHERE %(statuses)s::text[] IS NULL OR status = ANY(%(statuses)s::text[])
+                ORDER BY updated_at DESC
+            ''', {"statuses": statuses})
+            return [dict(row) for row in cur.fetchall()]
+
+
+def mark_interrupted(running_statuses: List[str], status: str, stale_seconds: int = 0) -> int:
+    """
+    Set `status` on checkpoints a crashed or killed server left in one of
+    `running_statuses`. A running task rewrites its checkpoint regularly, so
+    checkpoints updated within the last `stale_seconds` are left alone: they
+    may belong to another live server sharing the database. Returns how
+    many were updated.
+    """
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute('''
+                UPDATE task_checkpoints SET status = %s, updated_at = CURRENT_TIMESTAMP
+                WHERE status = ANY(%s)
+                  AND updated_at < CURRENT_TIMESTAMP - make_interval(secs => %s)
+            ''', (status, running_statuses, stale_seconds))
+            conn.commit()
+            return cur.rowcount
+
+
+def delete_checkpoint(task_id: str) -> bool:
+    """Delete a task's checkpoint."""
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute('DELETE FROM task_checkpoints WHERE task_id = %s RETURNING task_id', (task_id,))
+            result = cur.fetchone()
+            conn.commit()
+            return result is not None
@@ -1,9 +1,13 @@
+import asyncio
 import os
 import time
 import psycopg
+from contextlib import asynccontextmanager
 from psycopg.rows import dict_row
+from psycopg_pool import ConnectionPool, AsyncConnectionPool
 from typing import List, Dict, Optional
 from dotenv import load_dotenv
+from config import settings
 
 # Load environment variables from .env.local or .env
 load_dotenv(".env.local")
@@ -18,10 +22,153 @@ DB_CONFIG = {
     "dbname": os.getenv("DB_NAME", "lead_scraper")
 }
 
+# Shared connection pool, opened in the FastAPI lifespan (and in every
+# scraper worker process). Until then connections are opened one per call.
+_pool: Optional[ConnectionPool] = None
+
+def conninfo() -> str:
+    return f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['dbname']}"
+
 def get_connection():
-    """Create and return a connection to the PostgreSQL database."""
-    conn_str = f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['dbname']}"
-    return psycopg.connect(conn_str, row_factory=dict_row)
+    """
+    Return a connection to the PostgreSQL database, for use as a context
+    manager. It comes from the shared pool when one is open (and goes back
+    to it on exit), otherwise a new connection is opened.
+    """
+    if _pool is not None:
+        return _pool.connection()
+    return psycopg.connect(conninfo(), row_factory=dict_row)
+
+def open_pool():
+    """
+    Open the shared connection pool. Connections are checked before they
+    are handed out, closed after `db_pool_max_idle_seconds` unused beyond
+    the minimum size, and replaced after `db_pool_max_lifetime_seconds`.
+    If the pool can't reach the database, connections keep being opened
+    per call.
+    """
+    global _pool
+    if _pool is not None:
+        return
+    pool = ConnectionPool(
+        conninfo(),
+        min_size=settings.db_pool_min_size,
+        max_size=settings.db_pool_max_size,
+        timeout=settings.db_pool_timeout_seconds,
+        max_idle=settings.db_pool_max_idle_seconds,
+        max_lifetime=settings.db_pool_max_lifetime_seconds,
+        check=ConnectionPool.check_connection,
+        kwargs={"row_factory": dict_row},
+        name="anvesh",
+        open=False,
+    )
+    try:
+        pool.open(wait=True, timeout=settings.db_pool_timeout_seconds)
+    except Exception as e:
+        # Keep serving with a connection per call rather than not starting
+        pool.close()
+        print(f"⚠️ Database pool failed to open, using direct connections: {e}")
+        return
+    _pool = pool
+    print(f"✅ Database pool opened ({settings.db_pool_min_size}-{settings.db_pool_max_size} connections).")
+
+def close_pool():
+    """Close the shared pool; later calls open connections directly again."""
+    global _pool
+    pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
+        print("🛑 Database pool closed.")
+
+def get_pool_stats() -> Dict:
+    """Size, utilization and acquire wait times of the shared pool."""
+    return pool_stats(_pool)
+
+def pool_stats(pool) -> Dict:
+    """Stats of a sync or async pool, or {"enabled": False} if it isn't open."""
+    if pool is None:
+        return {"enabled": False}
+    stats = pool.get_stats()
+    in_use = stats.get("pool_size", 0) - stats.get("pool_available", 0)
+    requests = stats.get("requests_num", 0)
+    return {
+        "enabled": True,
+        "min_size": pool.min_size,
+        "max_size": pool.max_size,
+        "size": stats.get("pool_size", 0),
+        "available": stats.get("pool_available", 0),
+        "in_use": in_use,
+        "utilization": round(in_use / pool.max_size, 3),
+        "waiting": stats.get("requests_waiting", 0),
+        "requests": requests,
+        "requests_queued": stats.get("requests_queued", 0),
+        "avg_wait_ms": round(stats.get("requests_wait_ms", 0) / requests, 2) if requests else None,
+        "request_errors": stats.get("requests_errors", 0),
+        "connections_opened": stats.get("connections_num", 0),
+        "connection_errors": stats.get("connections_errors", 0),
+        "connections_lost": stats.get("connections_lost", 0),
+        "timeout_seconds": pool.timeout,
+    }
+
+# ============== Async access (for async route handlers) ==============
+
+# Async counterpart of the shared pool, bound to the event loop of the
+# FastAPI lifespan. Scraper threads keep using the sync pool.
+_async_pool: Optional[AsyncConnectionPool] = None
+_async_pool_loop: Optional[asyncio.AbstractEventLoop] = None
+
+@asynccontextmanager
+async def get_async_connection():
+    """
+    Async context manager yielding a connection that doesn't block the
+    event loop while it waits on PostgreSQL. It comes from the async pool
+    when one is open on the running loop, otherwise a new connection is
+    opened.
+    """
+    if _async_pool is not None and _async_pool_loop is asyncio.get_running_loop():
+        async with _async_pool.connection() as conn:
+            yield conn
+    else:
+        async with await psycopg.AsyncConnection.connect(conninfo(), row_factory=dict_row) as conn:
+            yield conn
+
+async def open_async_pool():
+    """Open the async pool on the running event loop, with the sync pool's settings."""
+    global _async_pool, _async_pool_loop
+    if _async_pool is not None:
+        return
+    pool = AsyncConnectionPool(
+        conninfo(),
+        min_size=settings.db_pool_min_size,
+        max_size=settings.db_pool_max_size,
+        timeout=settings.db_pool_timeout_seconds,
+        max_idle=settings.db_pool_max_idle_seconds,
+        max_lifetime=settings.db_pool_max_lifetime_seconds,
+        check=AsyncConnectionPool.check_connection,
+        kwargs={"row_factory": dict_row},
+        name="anvesh-async",
+        open=False,
+    )
+    try:
+        await pool.open(wait=True, timeout=settings.db_pool_timeout_seconds)
+    except Exception as e:
+        await pool.close()
+        print(f"⚠️ Async database pool failed to open, using direct connections: {e}")
+        return
+    _async_pool, _async_pool_loop = pool, asyncio.get_running_loop()
+    print(f"✅ Async database pool opened ({settings.db_pool_min_size}-{settings.db_pool_max_size} connections).")
+
+async def close_async_pool():
+    """Close the async pool; later calls open connections directly again."""
+    global _async_pool, _async_pool_loop
+    pool, _async_pool, _async_pool_loop = _async_pool, None, None
+    if pool is not None:
+        await pool.close()
+        print("🛑 Async database pool closed.")
+
+def get_async_pool_stats() -> Dict:
+    """Size, utilization and acquire wait times of the async pool."""
+    return pool_stats(_async_pool)
 
 def init_db():
     """Initialize the PostgreSQL database and the leads table."""
@@ -68,48 +215,65 @@ def init_db():
                         has_website BOOLEAN,
                         website_url TEXT,
                         phone VARCHAR(255),
+                        place_id VARCHAR(255),
                         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                         UNIQUE (business_name, address)
                     )
                 ''')
+                # Tables created before leads carried their Maps place id
+                cur.execute('ALTER TABLE leads ADD COLUMN IF NOT EXISTS place_id VARCHAR(255)')
+                cur.execute('CREATE INDEX IF NOT EXISTS idx_leads_place_id ON leads(place_id)')
                 conn.commit()
         print("✅ PostgreSQL Table 'leads' initialized.")
         
         # Initialize API key tables
         from app.db.api_keys import create_tables as create_api_key_tables
         create_api_key_tables()
+        
+        # Initialize task checkpoint table
+        from app.db.checkpoints import create_tables as create_checkpoint_tables
+        create_checkpoint_tables()
+        
+        # Initialize search result cache table
+        from app.db.search_cache import create_tables as create_search_cache_tables
+        create_search_cache_tables()
     except Exception as e:
         print(f"❌ Table Init Error: {e}")
 
+INSERT_LEAD_QUERY = '''
+    INSERT INTO leads (
+        business_name, industry, category, location, address, 
+        rating, review_count, is_claimed, 
+        has_website, website_url, phone, place_id
+    )
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON CONFLICT (business_name, address) DO NOTHING
+    RETURNING id
+'''
+
+def lead_values(lead: Dict) -> tuple:
+    """Column values of a lead, in the order of INSERT_LEAD_QUERY."""
+    return (
+        lead["business_name"],
+        lead["industry"],
+        lead.get("category"),
+        lead["location"],
+        lead["address"],
+        lead.get("rating"),
+        lead.get("review_count"),
+        lead.get("is_claimed"),
+        lead["has_website"],
+        lead["website_url"],
+        lead["phone"],
+        lead.get("place_id")
+    )
+
 def insert_lead(lead: Dict):
     """Insert a lead into PostgreSQL. Returns True if added, False if duplicate."""
     try:
         with get_connection() as conn:
             with conn.cursor() as cur:
-                query = '''
-                    INSERT INTO leads (
-                        business_name, industry, category, location, address, 
-                        rating, review_count, is_claimed, 
-                        has_website, website_url, phone
-                    )
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (business_name, address) DO NOTHING
-                    RETURNING id
-                '''
-                values = (
-                    lead["business_name"],
-                    lead["industry"],
-                    lead.get("category"),
-                    lead["location"],
-                    lead["address"],
-                    lead.get("rating"),
-                    lead.get("review_count"),
-                    lead.get("is_claimed"),
-                    lead["has_website"],
-                    lead["website_url"],
-                    lead["phone"]
-                )
-                cur.execute(query, values)
+                cur.execute(INSERT_LEAD_QUERY, lead_values(lead))
                 result = cur.fetchone()
                 conn.commit()
                 
@@ -121,6 +285,96 @@ def insert_lead(lead: Dict):
         print(f"❌ Insert Error: {e}")
         return False
 
+LEAD_COLUMNS = (
+    "business_name", "industry", "category", "location", "address",
+    "rating", "review_count", "is_claimed",
+    "has_website", "website_url", "phone", "place_id"
+)
+
+def bulk_insert_leads(leads: List[Dict]) -> List[bool]:
+    """
+    Insert many leads with one COPY and one set-based merge.
+
+    The leads are copied into a temporary staging table, then merged into
+    `leads` with a single INSERT ... SELECT ... ON CONFLICT. Returns, per
+    lead, True if added and False if it was already stored or repeats an
+    earlier lead of the same batch. Like the unique constraint (and so
+    `insert_lead`), leads without a name or address never count as
+    repeats. Raises on error; nothing is inserted.
+    """
+    if not leads:
+        return []
+    columns = ", ".join(LEAD_COLUMNS)
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            # Takes its column types from leads; dropped at commit
+            cur.execute(f'''
+                CREATE TEMP TABLE leads_staging ON COMMIT DROP AS
+                SELECT 0 AS position, {columns} FROM leads WITH NO DATA
+            ''')
+            with cur.copy(f"COPY leads_staging (position, {columns}) FROM STDIN") as copy:
+                for position, lead in enumerate(leads):
+                    copy.write_row((position, *lead_values(lead)))
+            # New rows are matched back to their batch position. NULL and ''
+            # are different values to the unique constraint, so they must be
+            # to the join too
+            cur.execute(f'''
+                WITH firsts AS (
+                    (SELECT DISTINCT ON (business_name, address) *
+                     FROM leads_staging
+                     WHERE business_name IS NOT NULL AND address IS NOT NULL
+                     ORDER BY business_name, address, position)
+                    UNION ALL
+                    -- NULLs are distinct in the unique constraint: never collapsed
+                    SELECT * FROM leads_staging
+                    WHERE business_name IS NULL OR address IS NULL
+                ), inserted AS (
+                    INSERT INTO leads ({columns})
+                    SELECT {columns} FROM firsts
+                    ON CONFLICT (business_name, address) DO NOTHING
+                    RETURNING business_name, address
+                )
+                SELECT f.position FROM firsts f
+                JOIN inserted i
+                  ON i.business_name IS NOT DISTINCT FROM f.business_name
+                 AND i.address IS NOT DISTINCT FROM f.address
+            ''')
+            added = {row["position"] for row in cur.fetchall()}
+            conn.commit()
+    return [i in added for i in range(len(leads))]
+
+def insert_leads(leads: List[Dict]) -> List[bool]:
+    """
+    Insert a batch of leads with `bulk_insert_leads`. Returns, per lead,
+    True if added and False if duplicate. If the batch fails (e.g. one
+    malformed lead), every lead is retried on its own so the others are
+    still saved.
+    """
+    if not leads:
+        return []
+    try:
+        return bulk_insert_leads(leads)
+    except Exception as e:
+        print(f"⚠️ Batch insert of {len(leads)} leads failed, inserting one by one: {e}")
+        return [insert_lead(lead) for lead in leads]
+
+def count_leads_by_place_ids(place_ids: List[str]) -> int:
+    """Count the leads stored for a list of Maps place ids."""
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT COUNT(*) AS count FROM leads WHERE place_id = ANY(%s)", (place_ids,))
+            return cur.fetchone()["count"]
+
+def get_lead_identities(after_id: int = 0) -> List[Dict]:
+    """Id, place id, name and location of the leads stored after `after_id`, oldest first."""
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT id, place_id, business_name, location FROM leads WHERE id > %s ORDER BY id",
+                (after_id,)
+            )
+            return cur.fetchall()
+
 def get_all_leads():
     """Retrieve all leads from PostgreSQL for CSV export."""
     try:
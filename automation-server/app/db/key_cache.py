@@ -0,0 +1,128 @@
+"""
+In-process cache of validated API keys.
+
+Every authenticated request used to hash its key and look it up in
+`api_keys`, including clients polling task status in a loop. Validated key
+records are now kept by key hash for `auth_cache_ttl_seconds`, up to
+`auth_cache_max_entries` (least recently used evicted first).
+
+Revoking or deleting a key evicts it right away in this process; other
+processes (e.g. several uvicorn workers) see the change once their entry
+expires. A cached key past its `expires_at` is rejected and dropped.
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional
+from config import settings
+
+
+class KeyCache:
+    """
+    LRU + TTL cache of validated key records, keyed by key hash.
+
+    :param ttl_seconds: How long a record is served without a database lookup (0 = no caching).
+    :param max_entries: Records kept before the least recently used is evicted.
+    """
+
+    def __init__(self, ttl_seconds: float = 60, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._hash_by_id: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key_hash: str) -> Optional[Dict]:
+        """The cached record of a key, or None if it has to be looked up."""
+        with self._lock:
+            entry = self._entries.get(key_hash)
+            if entry is None:
+                self.misses += 1
+                return None
+            record, cached_at = entry
+            if time.monotonic() - cached_at >= self.ttl_seconds or self._key_expired(record):
+                self._remove(key_hash)
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key_hash)
+            self.hits += 1
+            return dict(record)
+
+    def generation(self) -> int:
+        """Invalidation count, taken before a lookup and passed back to put()."""
+        with self._lock:
+            return self.invalidations
+
+    def put(self, key_hash: str, record: Dict, generation: int):
+        """
+        Cache a validated key record. Skipped if a key was invalidated since
+        `generation` was taken, as the record may predate a revocation.
+        """
+        if self.ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            if generation != self.invalidations:
+                return
+            self._remove(key_hash)
+            self._entries[key_hash] = (dict(record), time.monotonic())
+            self._hash_by_id[record["id"]] = key_hash
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, key_id: int) -> bool:
+        """Drop a key by id (after it was revoked or deleted). True if it was cached."""
+        with self._lock:
+            # Counted even if not cached, so a lookup racing the revocation isn't cached
+            self.invalidations += 1
+            key_hash = self._hash_by_id.get(key_id)
+            if key_hash is None:
+                return False
+            self._remove(key_hash)
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._hash_by_id.clear()
+
+    def get_stats(self) -> Dict:
+        """Size and hit ratio since the process started."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, key_hash: str):
+        entry = self._entries.pop(key_hash, None)
+        if entry is not None and self._hash_by_id.get(entry[0]["id"]) == key_hash:
+            del self._hash_by_id[entry[0]["id"]]
+
+    @staticmethod
+    def _key_expired(record: Dict) -> bool:
+        return bool(record.get("expires_at") and record["expires_at"] < datetime.now())
+
+
+# Singleton instance used by validate_api_key(_async)
+key_cache = KeyCache(
+    ttl_seconds=settings.auth_cache_ttl_seconds,
+    max_entries=settings.auth_cache_max_entries,
+)
@@ -0,0 +1,145 @@
+"""
+Cache of search results.
+
+When a location search completes, the place ids of the leads it found are
+stored under the normalized query. A later request for the same industry
+and location with a `max_age` is answered from the leads table while the
+entry is young enough, without launching a browser.
+
+Entries expire after `search_cache_ttl_seconds`; beyond
+`search_cache_max_entries` the least recently used ones are evicted.
+"""
+import re
+import threading
+from typing import Optional, Dict, List
+from app.db.database import get_connection
+from config import settings
+
+# Lookup outcomes since the process started
+_counters = {"lookups": 0, "hits": 0, "misses": 0}
+_counters_lock = threading.Lock()
+
+
+def create_tables():
+    """Create the search_cache table if it doesn't exist."""
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute('''
+                CREATE TABLE IF NOT EXISTS search_cache (
+                    query_key TEXT PRIMARY KEY,
+                    industry VARCHAR(255) NOT NULL,
+                    location VARCHAR(255) NOT NULL,
+                    place_ids TEXT[] NOT NULL,
+                    complete BOOLEAN NOT NULL,
+                    hits INT DEFAULT 0,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    last_used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            cur.execute('''
+                CREATE INDEX IF NOT EXISTS idx_search_cache_last_used
+                ON search_cache(last_used_at)
+            ''')
+            conn.commit()
+    print("✅ Search cache table initialized.")
+
+
+def normalize_query(industry: str, location: str, variant: str = "") -> str:
+    """
+    Cache key of a search. Case, spacing and punctuation are ignored, so
+    "Gyms" in "New York, NY" and "gyms" in "new york ny" share an entry.
+    `variant` separates searches that find different places (e.g. tiled).
+    """
+    parts = [re.sub(r"[\W_]+", " ", part).strip().lower() for part in (industry, location)]
+    if variant:
+        parts.append(variant)
+    return "|".join(parts)
+
+
+def get_cached_search(query_key: str, max_age_seconds: int, min_places: Optional[int] = None) -> Optional[Dict]:
+    """
+    Get a cache entry younger than both `max_age_seconds` and the TTL, or None.
+    Entries of searches that stopped at a lead limit only count if they have
+    at least `min_places`; with `min_places=None` only complete ones do.
+    A hit moves the entry to the front of the LRU order.
+    """
+    max_age = min(max_age_seconds, settings.search_cache_ttl_seconds)
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute('''
+                UPDATE search_cache
+                SET hits = hits + 1, last_used_at = CURRENT_TIMESTAMP
+                WHERE query_key = %(key)s
+                  AND created_at >= CURRENT_TIMESTAMP - make_interval(secs => %(max_age)s)
+                  AND (complete OR cardinality(place_ids) >= %(min_places)s::int)
+                RETURNING
+                    query_key, place_ids, complete, created_at,
+                    EXTRACT(EPOCH FROM (CURRENT_TIMESTAMP - created_at))::int AS age_seconds
+            ''', {"key": query_key, "max_age": max_age, "min_places": min_places})
+            result = cur.fetchone()
+            conn.commit()
+
+    with _counters_lock:
+        _counters["lookups"] += 1
+        _counters["hits" if result else "misses"] += 1
+    return dict(result) if result else None
+
+
+def store_search(query_key: str, industry: str, location: str, place_ids: List[str], complete: bool) -> bool:
+    """
+    Insert or refresh the entry of a finished search, then drop expired
+    entries and evict the least recently used beyond the size cap.
+    """
+    try:
+        with get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute('''
+                    INSERT INTO search_cache (query_key, industry, location, place_ids, complete)
+                    VALUES (%s, %s, %s, %s, %s)
+                    ON CONFLICT (query_key) DO UPDATE SET
+                        place_ids = EXCLUDED.place_ids,
+                        complete = EXCLUDED.complete,
+                        created_at = CURRENT_TIMESTAMP,
+                        last_used_at = CURRENT_TIMESTAMP
+                ''', (query_key, industry, location, sorted(place_ids), complete))
+                cur.execute('''
+                    DELETE FROM search_cache
+                    WHERE created_at < CURRENT_TIMESTAMP - make_interval(secs => %s)
+                       OR query_key IN (
+                           SELECT query_key FROM search_cache
+                           ORDER BY last_used_at DESC
+                           OFFSET %s
+                       )
+                ''', (settings.search_cache_ttl_seconds, settings.search_cache_max_entries))
+                conn.commit()
+                return True
+    except Exception as e:
+        print(f"❌ Search Cache Error: {e}")
+        return False
+
+
+def get_search_cache_stats() -> Dict:
+    """Size of the cache and its hit ratio since the process started."""
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute('''
+                SELECT
+                    COUNT(*) AS entries,
+                    COUNT(*) FILTER (
+                        WHERE created_at >= CURRENT_TIMESTAMP - make_interval(secs => %s)
+                    ) AS fresh_entries,
+                    COALESCE(SUM(cardinality(place_ids)), 0) AS cached_places,
+                    COALESCE(SUM(hits), 0) AS total_hits
+                FROM search_cache
+            ''', (settings.search_cache_ttl_seconds,))
+            table = dict(cur.fetchone())
+
+    with _counters_lock:
+        counters = dict(_counters)
+    return {
+        **table,
+        **counters,
+        "hit_ratio": round(counters["hits"] / counters["lookups"], 3) if counters["lookups"] else None,
+        "ttl_seconds": settings.search_cache_ttl_seconds,
+        "max_entries": settings.search_cache_max_entries,
+    }
@@ -0,0 +1,169 @@
+"""
+Monthly range partitions of the usage_logs table.
+
+usage_logs is partitioned on `timestamp`, one partition per month named
+usage_logs_YYYY_MM, each carrying the (api_key_id, timestamp) index. Rows
+outside the existing months land in a default partition.
+`maintain_usage_partitions()` moves them into month partitions, creates the
+partitions of the coming months and, with a retention policy, detaches or
+drops the months that have aged out. It runs at startup.
+
+Usage counters keep the totals of logs removed by retention, and
+`rebuild_usage_counters` leaves the months before the retention window alone.
+"""
+from datetime import date
+from typing import Optional, Dict, List
+from app.db.database import get_connection
+from config import settings
+
+DEFAULT_PARTITION = "usage_logs_default"
+
+
+def month_start(day: date, offset: int = 0) -> date:
+    """First day of the month of `day`, moved by `offset` months."""
+    index = day.year * 12 + day.month - 1 + offset
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"usage_logs_{month.year:04d}_{month.month:02d}"
+
+
+def create_usage_logs(cur):
+    """
+    Create the partitioned usage_logs table, run inside create_tables'
+    transaction. A plain usage_logs table from before partitioning is
+    copied into the default partition and dropped; the next maintenance
+    run sorts its rows into month partitions.
+    """
+    cur.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass('usage_logs')")
+    existing = cur.fetchone()
+    if existing and existing["relkind"] == "p":
+        return
+
+    if existing:
+        cur.execute("ALTER TABLE usage_logs RENAME TO usage_logs_legacy")
+        cur.execute("ALTER INDEX IF EXISTS usage_logs_pkey RENAME TO usage_logs_legacy_pkey")
+        cur.execute("ALTER SEQUENCE IF EXISTS usage_logs_id_seq RENAME TO usage_logs_legacy_id_seq")
+
+    # The partition key has to be part of the primary key
+    cur.execute('''
+        CREATE TABLE usage_logs (
+            id SERIAL,
+            api_key_id INT REFERENCES api_keys(id) ON DELETE CASCADE,
+            endpoint VARCHAR(255),
+            leads_scraped INT DEFAULT 0,
+            timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (id, timestamp)
+        ) PARTITION BY RANGE (timestamp)
+    ''')
+    cur.execute(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF usage_logs DEFAULT")
+    # Created on every partition, present and future
+    cur.execute("CREATE INDEX idx_usage_logs_key_time ON usage_logs (api_key_id, timestamp)")
+
+    if existing:
+        cur.execute('''
+            INSERT INTO usage_logs (id, api_key_id, endpoint, leads_scraped, timestamp)
+            SELECT id, api_key_id, endpoint, leads_scraped, COALESCE(timestamp, CURRENT_TIMESTAMP)
+            FROM usage_logs_legacy
+        ''')
+        print(f"🛠️  Moved {cur.rowcount} usage logs into the partitioned usage_logs table.")
+        cur.execute('''
+            SELECT setval(pg_get_serial_sequence('usage_logs', 'id'), COALESCE(MAX(id), 0) + 1, false)
+            FROM usage_logs
+        ''')
+        cur.execute("DROP TABLE usage_logs_legacy")
+
+
+def _partitions(cur) -> List[Dict]:
+    cur.execute('''
+        SELECT c.relname AS name, GREATEST(c.reltuples, 0)::bigint AS estimated_rows
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'usage_logs'::regclass
+        ORDER BY c.relname
+    ''')
+    partitions = []
+    for row in cur.fetchall():
+        if row["name"] == DEFAULT_PARTITION:
+            continue
+        year, month = row["name"].rsplit("_", 2)[1:]
+        partitions.append({**row, "month": date(int(year), int(month), 1)})
+    return partitions
+
+
+def _create_partition(cur, month: date):
+    """Create a month's partition, taking over its rows from the default partition."""
+    name = partition_name(month)
+    start, end = month.isoformat(), month_start(month, 1).isoformat()
+    cur.execute(f"CREATE TABLE {name} (LIKE usage_logs INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+    cur.execute(f'''
+        WITH moved AS (
+            DELETE FROM {DEFAULT_PARTITION}
+            WHERE timestamp >= %s AND timestamp < %s
+            RETURNING *
+        )
+        INSERT INTO {name} SELECT * FROM moved
+    ''', (start, end))
+    # Attaching adds the parent's index and foreign key to the partition
+    cur.execute(f"ALTER TABLE usage_logs ATTACH PARTITION {name} FOR VALUES FROM ('{start}') TO ('{end}')")
+
+
+def retention_start(cur) -> Optional[date]:
+    """First month kept under the retention policy, or None if logs are kept forever."""
+    if settings.usage_log_retention_months <= 0:
+        return None
+    cur.execute("SELECT date_trunc('month', CURRENT_TIMESTAMP)::date AS month")
+    return month_start(cur.fetchone()["month"], -settings.usage_log_retention_months)
+
+
+def maintain_usage_partitions() -> Dict:
+    """
+    Create the partitions of this month, the next USAGE_PARTITION_MONTHS_AHEAD
+    months and any month with rows in the default partition, then detach or
+    drop (USAGE_LOG_RETENTION_ACTION) the partitions older than
+    USAGE_LOG_RETENTION_MONTHS. Detached partitions stay in the database as
+    plain tables, e.g. for archiving. Returns the partitions created and
+    removed.
+    """
+    created, removed = [], []
+    drop = settings.usage_log_retention_action == "drop"
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT date_trunc('month', CURRENT_TIMESTAMP)::date AS month")
+            this_month = cur.fetchone()["month"]
+            keep_from = retention_start(cur)
+
+            cur.execute(f"SELECT DISTINCT date_trunc('month', timestamp)::date AS month FROM {DEFAULT_PARTITION}")
+            months = {row["month"] for row in cur.fetchall()}
+            months.update(month_start(this_month, i) for i in range(settings.usage_partition_months_ahead + 1))
+
+            existing = {p["month"] for p in _partitions(cur)}
+            for month in sorted(months - existing):
+                _create_partition(cur, month)
+                created.append(partition_name(month))
+
+            if keep_from:
+                for partition in _partitions(cur):
+                    if partition["month"] >= keep_from:
+                        continue
+                    if drop:
+                        cur.execute(f"DROP TABLE {partition['name']}")
+                    else:
+                        cur.execute(f"ALTER TABLE usage_logs DETACH PARTITION {partition['name']}")
+                    removed.append(partition["name"])
+            conn.commit()
+
+    if created or removed:
+        print(f"🗂️  Usage log partitions: created {len(created)}, {'dropped' if drop else 'detached'} {len(removed)}.")
+    return {"created": created, "removed": removed, "retention_action": "drop" if drop else "detach"}
+
+
+def list_usage_partitions() -> List[Dict]:
+    """Month partitions of usage_logs, oldest first, with planner row estimates."""
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            return [
+                {"name": p["name"], "month": p["month"].isoformat(), "estimated_rows": p["estimated_rows"]}
+                for p in _partitions(cur)
+            ]
@@ -2,20 +2,88 @@ from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 from app.routers import automation, keys, admin
-from app.db import init_db
+from app.db import init_db, open_pool, close_pool, open_async_pool, close_async_pool
+from app.services.browser_pool import browser_pool
+from app.services.lead_writer import lead_writer
+from app.services.usage_writer import usage_writer
+from app.services.workers import worker_supervisor
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
+from config import settings
+import asyncio
 import os
+import signal
+import threading
 
 # API Base URL for OpenAPI docs
 API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
 
+
+def checkpoint_on_shutdown_signals() -> dict:
+    """
+    Uvicorn waits for background tasks to finish before the lifespan
+    shutdown runs, so running automation tasks are stopped (and write their
+    final checkpoint) straight from SIGTERM/SIGINT, then uvicorn's own
+    handler takes over. Returns the handlers it wrapped, which
+    `restore_signal_handlers` puts back when the lifespan exits.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return {}
+    originals = {}
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        previous = originals[sig] = signal.getsignal(sig)
+
+        def handler(signum, frame, previous=previous):
+            automation.interrupt_running_tasks()
+            if callable(previous):
+                previous(signum, frame)
+
+        signal.signal(sig, handler)
+    return originals
+
+
+def restore_signal_handlers(originals: dict):
+    """Put back the handlers `checkpoint_on_shutdown_signals` wrapped."""
+    for sig, previous in originals.items():
+        signal.signal(sig, previous)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start shared resources on startup and release them on shutdown."""
+    if settings.db_pool_enabled:
+        await asyncio.to_thread(open_pool)
+        await open_async_pool()
+    await asyncio.to_thread(automation.recover_checkpoints)
+    original_handlers = checkpoint_on_shutdown_signals()
+    if settings.lead_writer_enabled:
+        lead_writer.start()
+    if settings.usage_writer_enabled:
+        usage_writer.start()
+    if settings.scraper_workers > 0:
+        # Every worker process runs its own browser pool
+        await asyncio.to_thread(worker_supervisor.start)
+    elif settings.browser_pool_enabled:
+        await asyncio.to_thread(browser_pool.start)
+    yield
+    restore_signal_handlers(original_handlers)
+    automation.interrupt_running_tasks()
+    await asyncio.to_thread(worker_supervisor.stop)
+    await asyncio.to_thread(browser_pool.stop)
+    await asyncio.to_thread(lead_writer.stop)
+    await asyncio.to_thread(usage_writer.stop)
+    await asyncio.to_thread(close_pool)
+    await close_async_pool()
+
+
 app = FastAPI(
     title="Anvesh API",
     description="Lead generation engine that hunts for high-value businesses with zero online presence.",
     version="1.0.0",
     servers=[
         {"url": API_BASE_URL, "description": "API Server"}
-    ]
+    ],
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -3,7 +3,7 @@ API Key authentication middleware for FastAPI.
 """
 from fastapi import Header, HTTPException, Depends
 from typing import Optional
-from app.db import validate_api_key, check_quota
+from app.db import validate_api_key_async, check_quota_async
 from config import settings
 from app.models.api_key import APIKeyData
 
@@ -20,7 +20,7 @@ async def get_api_key(x_api_key: str = Header(..., alias="X-API-Key")) -> APIKey
         )
     
     # Validate the key
-    key_data = validate_api_key(x_api_key)
+    key_data = await validate_api_key_async(x_api_key)
     
     if not key_data:
         raise HTTPException(
@@ -29,7 +29,7 @@ async def get_api_key(x_api_key: str = Header(..., alias="X-API-Key")) -> APIKey
         )
     
     # Check quota
-    if not check_quota(key_data["id"], key_data["monthly_limit"]):
+    if not await check_quota_async(key_data["id"], key_data["monthly_limit"]):
         raise HTTPException(
             status_code=429,
             detail="Monthly quota exceeded. Please upgrade your plan."
@@ -53,7 +53,7 @@ async def get_optional_api_key(
     if not x_api_key:
         return None
     
-    key_data = validate_api_key(x_api_key)
+    key_data = await validate_api_key_async(x_api_key)
     if not key_data:
         return None
     
@@ -13,6 +13,38 @@ class TaskStatus(str, Enum):
     COMPLETED = "completed"
     STOPPED = "stopped"
     ERROR = "error"
+    INTERRUPTED = "interrupted"  # The server shut down mid-run; resumable from its checkpoint
+
+
+class ExtractionMode(str, Enum):
+    """How lead details are extracted from Google Maps."""
+    DOM = "dom"          # Open every place page and read the rendered panel
+    NETWORK = "network"  # Decode the Maps XHR payloads, open pages only as a fallback
+
+
+class CardPrefilter(BaseModel):
+    """Checks applied to feed cards on the fast path, before a place page is opened."""
+    
+    skip_with_website: bool = Field(
+        default=True,
+        description="Skip businesses whose card shows a Website button."
+    )
+    min_reviews: int = Field(
+        default=0,
+        description="Skip businesses with fewer reviews than this.",
+        ge=0
+    )
+    max_reviews: Optional[int] = Field(
+        default=None,
+        description="Skip businesses with more reviews than this.",
+        ge=0
+    )
+    min_rating: Optional[float] = Field(
+        default=None,
+        description="Skip businesses rated below this (unrated cards are skipped too).",
+        ge=0,
+        le=5
+    )
 
 
 class ScrapeRequest(BaseModel):
@@ -34,6 +66,55 @@ class ScrapeRequest(BaseModel):
         ge=-1,
         examples=[50, 100, -1]
     )
+    max_parallel_locations: int = Field(
+        default=1,
+        description="Number of locations (or tiles) scraped at the same time. Capped by the server's MAX_PARALLEL_LOCATIONS.",
+        ge=1,
+        le=10,
+        examples=[1, 4]
+    )
+    max_age: Optional[int] = Field(
+        default=None,
+        description="Answer a location from the search cache, without scraping, if the same industry and location were fully scraped at most this many seconds ago. Leave unset to always scrape.",
+        ge=0,
+        examples=[86400, 604800]
+    )
+    tiling: bool = Field(
+        default=False,
+        description="Split large cities into a grid of map viewport searches, subdividing tiles whose results list is full. Locations missing from the built-in gazetteer are searched as one area.",
+        examples=[True, False]
+    )
+    concurrency: int = Field(
+        default=3,
+        description="Number of place detail pages opened in parallel per location.",
+        ge=1,
+        le=10,
+        examples=[1, 3, 5]
+    )
+    extraction_mode: ExtractionMode = Field(
+        default=ExtractionMode.DOM,
+        description="'dom' opens every place page; 'network' decodes the Maps JSON responses and only opens pages the payloads didn't cover.",
+        examples=["dom", "network"]
+    )
+    lean_mode: bool = Field(
+        default=False,
+        description="Block images, fonts, media, map tiles and photos. Only the text the scraper reads is loaded.",
+        examples=[True, False]
+    )
+    fast_path: bool = Field(
+        default=False,
+        description="Read name, rating, reviews, category and website button from the feed cards and only open places that pass the prefilter.",
+        examples=[True, False]
+    )
+    skip_known_leads: bool = Field(
+        default=False,
+        description="Don't open businesses that are already in the leads database (matched on place id, or name and location for older leads). A small share is opened anyway to measure the false-positive rate.",
+        examples=[True, False]
+    )
+    prefilter: CardPrefilter = Field(
+        default_factory=CardPrefilter,
+        description="Card checks used when fast_path is enabled."
+    )
     
     model_config = {
         "json_schema_extra": {
@@ -41,7 +122,8 @@ class ScrapeRequest(BaseModel):
                 {
                     "industry": "restaurants",
                     "locations": ["Mumbai", "Delhi"],
-                    "limit_per_location": 50
+                    "limit_per_location": 50,
+                    "concurrency": 3
                 }
             ]
         }
@@ -56,6 +138,9 @@ class TaskResponse(BaseModel):
     config: dict = Field(description="The scraping configuration for this task")
     running: bool = Field(description="Whether the task is currently running")
     error: Optional[str] = Field(default=None, description="Error message if task failed")
+    stats: dict = Field(default_factory=dict, description="Scraper counters for the task, e.g. idle seconds spent waiting on pages")
+    locations: dict = Field(default_factory=dict, description="Status, lead count, error, tile progress and cache hit of each location, keyed by location")
+    known_leads: Optional[dict] = Field(default=None, description="Businesses skipped because they were already stored, and the audited false-positive rate of that check")
 
 
 class TaskStartResponse(BaseModel):
@@ -11,6 +11,11 @@ from datetime import datetime
 from app.middleware.auth import require_admin
 from app.routers.automation import TASKS
 from app.models.automation import TaskStatus
+from app.services.browser_pool import browser_pool
+from app.services.workers import worker_supervisor
+from app.services.lead_writer import lead_writer
+from app.services.usage_writer import usage_writer
+from app.db import get_search_cache_stats, get_pool_stats, get_async_pool_stats, key_cache
 from app.helpers import api_success
 from app.helpers.response import APIResponse, STANDARD_RESPONSES
 
@@ -123,3 +128,154 @@ async def admin_get_stats(_: bool = Depends(require_admin)):
     }
     
     return api_success("System statistics retrieved", stats)
+
+
+@router.get(
+    "/browser-pool",
+    summary="Get shared browser pool statistics (Admin)",
+    description="""
+Inspect the process-wide Chromium pool used by the scraper.
+
+Returns:
+- Pool size and contexts currently in use
+- Hit/miss counts (a miss means a browser had to be launched)
+- Average and last browser launch latency
+- Recycled and unhealthy browser counts
+    """,
+    response_description="Browser pool statistics",
+    response_model=APIResponse,
+    responses=STANDARD_RESPONSES,
+)
+async def admin_get_browser_pool(_: bool = Depends(require_admin)):
+    """Get shared browser pool statistics. Admin only."""
+    return api_success("Browser pool statistics retrieved", browser_pool.get_stats())
+
+
+@router.get(
+    "/workers",
+    summary="Get scraper worker process statistics (Admin)",
+    description="""
+Inspect the supervised worker processes that run scrape jobs
+(enabled with `SCRAPER_WORKERS` > 0).
+
+Returns:
+- Busy workers and queued jobs
+- Completed, failed and re-queued job counts
+- Hung and crashed workers and restarts
+- Per-process pid, current location and heartbeat age
+    """,
+    response_description="Worker pool statistics",
+    response_model=APIResponse,
+    responses=STANDARD_RESPONSES,
+)
+async def admin_get_workers(_: bool = Depends(require_admin)):
+    """Get scraper worker process statistics. Admin only."""
+    return api_success("Worker statistics retrieved", worker_supervisor.get_stats())
+
+
+@router.get(
+    "/lead-writer",
+    summary="Get lead writer statistics (Admin)",
+    description="""
+Inspect the write-behind queue between the scraper and the database
+(enabled with `LEAD_WRITER_ENABLED`).
+
+Returns:
+- Leads queued and waiting on a write
+- Leads written, how many were new, and batch count
+- Average batch size and average/last batch latency
+- How often and how long scrapes waited on a full queue
+    """,
+    response_description="Lead writer statistics",
+    response_model=APIResponse,
+    responses=STANDARD_RESPONSES,
+)
+async def admin_get_lead_writer(_: bool = Depends(require_admin)):
+    """Get lead writer statistics. Admin only."""
+    return api_success("Lead writer statistics retrieved", lead_writer.get_stats())
+
+
+@router.get(
+    "/usage-writer",
+    summary="Get usage writer statistics (Admin)",
+    description="""
+Inspect the write-behind buffer for API usage events
+(enabled with `USAGE_WRITER_ENABLED`).
+
+Returns:
+- Events queued and waiting on a write
+- Events submitted, written and dropped (e.g. their key was deleted), and batch count
+- Average batch size and average/last batch latency
+- How often and how long requests waited on a full queue
+    """,
+    response_description="Usage writer statistics",
+    response_model=APIResponse,
+    responses=STANDARD_RESPONSES,
+)
+async def admin_get_usage_writer(_: bool = Depends(require_admin)):
+    """Get usage writer statistics. Admin only."""
+    return api_success("Usage writer statistics retrieved", usage_writer.get_stats())
+
+
+@router.get(
+    "/db-pool",
+    summary="Get database connection pool statistics (Admin)",
+    description="""
+Inspect the PostgreSQL connection pool shared by every database call
+(enabled with `DB_POOL_ENABLED`). The pool used by async route handlers
+is reported under `async`.
+
+Returns:
+- Configured min/max size, current size, connections in use and utilization
+- Requests waiting for a connection and average acquire wait
+- Acquire errors (e.g. timeouts), connections opened and lost
+    """,
+    response_description="Database pool statistics",
+    response_model=APIResponse,
+    responses=STANDARD_RESPONSES,
+)
+async def admin_get_db_pool(_: bool = Depends(require_admin)):
+    """Get database connection pool statistics. Admin only."""
+    return api_success("Database pool statistics retrieved", {**get_pool_stats(), "async": get_async_pool_stats()})
+
+
+@router.get(
+    "/auth-cache",
+    summary="Get API key cache statistics (Admin)",
+    description="""
+Inspect the in-process cache of validated API keys, which spares
+authenticated requests (e.g. task status polling) a database lookup.
+
+Returns:
+- Cached keys, size cap and TTL
+- Hits, misses and hit ratio since the server started
+- Entries dropped for age or key expiry, LRU evictions, and revocations
+    """,
+    response_description="API key cache statistics",
+    response_model=APIResponse,
+    responses=STANDARD_RESPONSES,
+)
+async def admin_get_auth_cache(_: bool = Depends(require_admin)):
+    """Get API key cache statistics. Admin only."""
+    return api_success("API key cache statistics retrieved", key_cache.get_stats())
+
+
+@router.get(
+    "/cache",
+    summary="Get search result cache statistics (Admin)",
+    description="""
+Inspect the cache that answers repeat industry + location searches
+(requests with `max_age`) from the leads table instead of scraping.
+
+Returns:
+- Cached searches, how many are within the TTL, and places cached
+- Lookups, hits and misses since the server started, and the hit ratio
+- Total hits per the table, TTL and size cap
+    """,
+    response_description="Search cache statistics",
+    response_model=APIResponse,
+    responses=STANDARD_RESPONSES,
+)
+def admin_get_cache(_: bool = Depends(require_admin)):
+    """Get search result cache statistics. Admin only."""
+    return api_success("Search cache statistics retrieved", get_search_cache_stats())
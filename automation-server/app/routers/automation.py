@@ -14,13 +14,34 @@ from app.models.automation import (
     TaskStatus,
 )
 from app.models.api_key import APIKeyData
-from app.services.scraper import scrape_google_maps
-from app.db import get_all_leads, log_usage
+from app.services.scraper import iter_google_maps, new_scrape_stats, merge_scrape_stats
+from app.services.known_leads import known_leads_report
+from app.services.lead_writer import lead_writer
+from app.services.usage_writer import usage_writer
+from app.services.workers import worker_supervisor
+from app.services.tiling import lookup_bounds, plan_tiles, subdivide, is_saturated, tile_label
+from app.db import (
+    get_all_leads,
+    count_leads_by_place_ids,
+    normalize_query,
+    get_cached_search,
+    store_search,
+    save_checkpoint,
+    load_checkpoint,
+    list_checkpoints,
+    mark_interrupted,
+    delete_checkpoint
+)
 from app.middleware.auth import get_api_key
 from app.helpers import api_success, api_error
 from app.helpers.response import APIResponse, STANDARD_RESPONSES
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from config import settings
 import csv
+import json
 import os
+import threading
+import time
 import uuid
 
 router = APIRouter(prefix="/automation", tags=["Automation"])
@@ -28,47 +49,430 @@ router = APIRouter(prefix="/automation", tags=["Automation"])
 # In-Memory Storage for Tasks
 TASKS = {}
 
+# Resumable progress of each task's locations (place key sets, feed depths,
+# searched tiles), kept apart from TASKS because it is not returned by the API
+TASK_PROGRESS = {}
+
+# Caps the searches (locations or tiles) running at the same time across all tasks
+LOCATION_SLOTS = threading.BoundedSemaphore(settings.max_parallel_locations)
+
+# Guards merging search stats into their location and task
+STATS_LOCK = threading.Lock()
+
+
+def new_task_entry(task_id: str, request: ScrapeRequest) -> dict:
+    """Record of a task kept in TASKS and returned by the task endpoints."""
+    return {
+        "id": task_id,
+        "config": request.model_dump(),
+        "running": True,
+        "stop": False,
+        "status": TaskStatus.IDLE,
+        "error": None,
+        "stats": new_scrape_stats(),
+        "locations": {loc: new_location_entry() for loc in request.locations}
+    }
+
+
+def new_location_entry() -> dict:
+    """Per-location record kept under a task's `locations`."""
+    return {"status": TaskStatus.IDLE, "leads": 0, "error": None, "stats": new_scrape_stats(), "tiles": None, "cache": None}
+
+
+def new_location_progress(saved: dict = None) -> dict:
+    """
+    Resumable progress of one location, optionally restored from the
+    location's state in a checkpoint. `done_keys` are the places finished,
+    `seen_keys` also holds the ones in flight. Feed depths are how far the
+    untiled feed and each unfinished tile were scrolled.
+    """
+    saved = saved or {}
+    done_keys = set(saved.get("done_keys", []))
+    return {
+        "done_keys": done_keys,
+        # Places that became leads (new or already stored), for the search cache
+        "lead_keys": set(saved.get("lead_keys", [])),
+        "seen_keys": set(done_keys),
+        "feed_depth": saved.get("feed_depth", 0),
+        "tiles_done": saved.get("tiles_done", []),
+        "tiles_saturated": saved.get("tiles_saturated", []),
+        "tile_depths": saved.get("tile_depths", {}),
+        # New leads saved so far, counted as they stream in; the tiles of a
+        # location share limit_per_location through it
+        "leads": saved.get("leads", 0),
+        # Live stats of the searches running, by unit label
+        "active": {},
+        # Searches of this run that were stopped or failed
+        "unfinished": 0,
+    }
+
+
+def unit_label(tile: dict) -> str:
+    return tile_label(tile) if tile else ""
+
+
+def pending_tiles(tiles: list, progress: dict) -> list:
+    """
+    Tiles still to search: those not searched yet, and on resume the
+    children of searched tiles that came back saturated.
+    """
+    pending = []
+    for tile in tiles:
+        if tile not in progress["tiles_done"]:
+            pending.append(tile)
+        elif tile in progress["tiles_saturated"] and tile["depth"] < settings.tile_max_depth:
+            pending.extend(pending_tiles(subdivide(tile), progress))
+    return pending
+
+
+def plan_location(task: dict, request: ScrapeRequest, loc: str, progress: dict) -> list:
+    """
+    Work units of one location: its viewport tiles when tiling is on and the
+    location is in the gazetteer, otherwise a single untiled search (None).
+    Tiles a resumed task already searched are left out.
+    """
+    if not request.tiling:
+        return [None]
+
+    bounds = lookup_bounds(loc)
+    if not bounds:
+        print(f"⚠️ {loc} is not in the gazetteer. Searching it as one area.")
+        return [None]
+
+    tiles = pending_tiles(plan_tiles(bounds, settings.tile_size_km), progress)
+    done = len(progress["tiles_done"])
+    subdivided = sum(1 for tile in progress["tiles_saturated"] if tile["depth"] < settings.tile_max_depth)
+    task["locations"][loc]["tiles"] = {"planned": len(tiles) + done, "done": done, "subdivided": subdivided}
+    print(f"🗺️ {loc} split into {len(tiles) + done} tiles{f' ({done} already searched)' if done else ''}.")
+    return tiles
+
+
+def record_unit(progress: dict, tile: dict, stats: dict, finished: bool):
+    """Fold a finished or interrupted search into its location's progress."""
+    label = unit_label(tile)
+    progress["active"].pop(label, None)
+    if not finished:
+        progress["unfinished"] += 1
+    if tile is None:
+        progress["feed_depth"] = max(progress["feed_depth"], stats["feed_cards"])
+    elif finished:
+        progress["tile_depths"].pop(label, None)
+        progress["tiles_done"].append(tile)
+        if is_saturated(stats["feed_cards"]):
+            progress["tiles_saturated"].append(tile)
+    else:
+        progress["tile_depths"][label] = max(progress["tile_depths"].get(label, 0), stats["feed_cards"])
+
+
+def scrape_unit(task_id: str, request: ScrapeRequest, loc: str, tile: dict):
+    """
+    Runs one search (a whole location, or one tile of it) once a global slot
+    is free. Returns the search's stats, or None if it was skipped.
+    """
+    task = TASKS[task_id]
+    entry = task["locations"][loc]
+    progress = TASK_PROGRESS[task_id][loc]
+    limit = request.limit_per_location
+    should_stop = lambda: task["stop"]
+    # Sibling tiles stop as soon as the location's shared budget is spent
+    out_of_budget = lambda: limit != -1 and progress["leads"] >= limit
+
+    with LOCATION_SLOTS:
+        if should_stop():
+            with STATS_LOCK:
+                progress["unfinished"] += 1
+            return None
+
+        with STATS_LOCK:
+            total = -1 if limit == -1 else limit - progress["leads"]
+        if limit != -1 and total <= 0:
+            return None
+
+        label = unit_label(tile)
+        resume_depth = progress["tile_depths"].get(label, 0) if tile else progress["feed_depth"]
+        print(f"📍 Processing location: {loc}{' ' + label if tile else ''}{f' (resuming at {resume_depth} cards)' if resume_depth else ''} (ID: {task_id})")
+        entry["status"] = TaskStatus.RUNNING
+        stats = new_scrape_stats()
+        with STATS_LOCK:
+            progress["active"][label] = stats
+        finished = False
+
+        # Supervised worker processes when enabled, otherwise this thread
+        scrape = worker_supervisor.iter_scrape if worker_supervisor.running else iter_google_maps
+
+        try:
+            leads = scrape(
+                industry=request.industry, 
+                location=loc, 
+                total=total,
+                stop_signal=lambda: should_stop() or out_of_budget(),
+                concurrency=request.concurrency,
+                extraction_mode=request.extraction_mode,
+                lean_mode=request.lean_mode,
+                prefilter=request.prefilter.model_dump() if request.fast_path else None,
+                skip_known=request.skip_known_leads,
+                stats=stats,
+                viewport=tile,
+                seen_keys=progress["seen_keys"],
+                done_keys=progress["done_keys"],
+                resume_depth=resume_depth
+            )
+            # Leads stream in as they are found. A worker process only hands
+            # its sets back when its search ends, so the place ids are
+            # recorded from the leads as well; tiles still running in other
+            # workers don't see each other's places
+            for lead in leads:
+                if lead.get("place_id"):
+                    progress["seen_keys"].add(lead["place_id"])
+                    progress["done_keys"].add(lead["place_id"])
+                    progress["lead_keys"].add(lead["place_id"])
+                if lead.get("is_new"):
+                    with STATS_LOCK:
+                        progress["leads"] += 1
+            finished = not should_stop()
+        except Exception as e:
+            entry["error"] = str(e)
+            print(f"❌ Location {loc} failed (ID: {task_id}): {e}")
+        finally:
+            with STATS_LOCK:
+                merge_scrape_stats(entry["stats"], stats)
+                merge_scrape_stats(task["stats"], stats)
+                entry["leads"] = entry["stats"]["leads_saved"]
+                progress["leads"] = max(progress["leads"], entry["leads"])
+                record_unit(progress, tile, stats, finished)
+        return stats
+
+
+def checkpoint_state(task_id: str) -> dict:
+    """JSON-ready state of each location of a task, as stored in its checkpoint."""
+    task = TASKS[task_id]
+    state = {}
+    with STATS_LOCK:
+        for loc, entry in task["locations"].items():
+            progress = TASK_PROGRESS[task_id][loc]
+            feed_depth = progress["feed_depth"]
+            tile_depths = dict(progress["tile_depths"])
+            for label, stats in progress["active"].items():
+                if label:
+                    tile_depths[label] = max(tile_depths.get(label, 0), stats["feed_cards"])
+                else:
+                    feed_depth = max(feed_depth, stats["feed_cards"])
+
+            state[loc] = {
+                "status": TaskStatus(entry["status"]).value,
+                "leads": entry["leads"],
+                "error": entry["error"],
+                # Copied first: scraper threads keep adding to the set
+                "done_keys": sorted(progress["done_keys"].copy()),
+                "lead_keys": sorted(progress["lead_keys"].copy()),
+                "feed_depth": feed_depth,
+                "tiles_done": list(progress["tiles_done"]),
+                "tiles_saturated": list(progress["tiles_saturated"]),
+                "tile_depths": tile_depths,
+            }
+    return state
+
+
+def write_checkpoint(task_id: str, request: ScrapeRequest):
+    """Save a task's progress. A completed task has nothing to resume, so its checkpoint is dropped."""
+    task = TASKS[task_id]
+    if task["status"] == TaskStatus.COMPLETED:
+        try:
+            delete_checkpoint(task_id)
+        except Exception as e:
+            print(f"❌ Checkpoint Error ({task_id}): {e}")
+        return
+    save_checkpoint(task_id, TaskStatus(task["status"]).value, request.model_dump(mode="json"), checkpoint_state(task_id))
+
+
+def cache_key(request: ScrapeRequest, loc: str) -> str:
+    """Search cache key of a location. Tiling and the prefilter change which places a search finds."""
+    variant = []
+    if request.tiling:
+        variant.append("tiled")
+    if request.fast_path:
+        variant.append("prefilter=" + json.dumps(request.prefilter.model_dump(), sort_keys=True))
+    return normalize_query(request.industry, loc, ";".join(variant))
+
+
+def serve_from_cache(task: dict, request: ScrapeRequest, loc: str) -> bool:
+    """
+    Complete a location from the search cache if the same search finished
+    within `max_age` and found enough places for the limit. The leads are
+    already in the leads table.
+    """
+    limit = request.limit_per_location
+    try:
+        cached = get_cached_search(cache_key(request, loc), request.max_age, None if limit == -1 else limit)
+        if not cached:
+            return False
+        leads = count_leads_by_place_ids(cached["place_ids"])
+    except Exception as e:
+        print(f"❌ Search Cache Error: {e}")
+        return False
+
+    entry = task["locations"][loc]
+    entry["leads"] = leads if limit == -1 else min(leads, limit)
+    entry["cache"] = {"hit": True, "age_seconds": cached["age_seconds"], "scraped_at": cached["created_at"]}
+    entry["status"] = TaskStatus.COMPLETED
+    print(f"♻️ {loc}: {entry['leads']} leads from a search {cached['age_seconds']}s old. Skipping the browser.")
+    return True
+
+
+def finish_location(task: dict, request: ScrapeRequest, loc: str, progress: dict):
+    """
+    Set a location's final status once all of its searches are done. It is
+    completed only if every search ran to its end, even if the task was
+    stopped meanwhile. Completed searches are stored in the search cache.
+    """
+    entry = task["locations"][loc]
+    if entry["error"]:
+        entry["status"] = TaskStatus.ERROR
+    elif progress["unfinished"]:
+        entry["status"] = TaskStatus.STOPPED
+    else:
+        entry["status"] = TaskStatus.COMPLETED
+        print(f"✅ Finished location: {loc}.")
+        # Fewer new leads than the limit means the feed ran out: the search is complete
+        limit = request.limit_per_location
+        complete = limit == -1 or entry["leads"] < limit
+        store_search(cache_key(request, loc), request.industry, loc, list(progress["lead_keys"]), complete)
+
 
 def background_task_scraper(task_id: str, request: ScrapeRequest):
     """
     Runs the scraper in the background for a specific task ID.
+    Every location (or, with tiling, every tile of it) is an independent
+    search; up to `max_parallel_locations` of them run at the same time,
+    capped by the server setting. Tiles whose feed hit the results cap are
+    subdivided and searched again. A stop signal reaches every search.
+
+    With `max_age`, locations searched recently enough are answered from the
+    search cache instead. Progress is checkpointed every
+    `checkpoint_interval_seconds` and when the task ends. A resumed task skips its completed locations and searched
+    tiles, and doesn't open the places its earlier runs finished.
     """
     print(f"▶️ Automation Started: {request.industry} (ID: {task_id})")
-    TASKS[task_id]["status"] = TaskStatus.RUNNING
+    task = TASKS[task_id]
+    task["status"] = TaskStatus.RUNNING
+    progress = TASK_PROGRESS.setdefault(task_id, {loc: new_location_progress() for loc in task["locations"]})
     
     try:
-        total_locations = len(request.locations)
-        for i, loc in enumerate(request.locations):
-            if TASKS[task_id]["stop"]:
-                TASKS[task_id]["status"] = TaskStatus.STOPPED
-                print(f"🛑 Automation {task_id} stopped by user.")
-                break
-                
-            print(f"📍 [{i+1}/{total_locations}] Processing location: {loc} (ID: {task_id})")
+        locations = [loc for loc, entry in task["locations"].items() if entry["status"] != TaskStatus.COMPLETED]
+        workers = max(1, min(request.max_parallel_locations, settings.max_parallel_locations))
+        
+        # Searches still running per location
+        remaining = {loc: 0 for loc in locations}
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"task-{task_id[:8]}") as executor:
+            running = {}
             
-            should_stop = lambda: TASKS[task_id]["stop"]
+            def submit(loc, tile):
+                remaining[loc] += 1
+                future = executor.submit(scrape_unit, task_id, request, loc, tile)
+                running[future] = (loc, tile)
             
-            scrape_google_maps(
-                industry=request.industry, 
-                location=loc, 
-                total=request.limit_per_location,
-                stop_signal=should_stop
-            )
+            for loc in locations:
+                if request.max_age is not None and serve_from_cache(task, request, loc):
+                    continue
+                for tile in plan_location(task, request, loc, progress[loc]):
+                    submit(loc, tile)
+                # Every tile of a resumed location was already searched
+                if remaining[loc] == 0:
+                    finish_location(task, request, loc, progress[loc])
+            
+            write_checkpoint(task_id, request)
+            last_checkpoint = time.monotonic()
             
-            if not TASKS[task_id]["stop"]:
-                print(f"✅ Finished location: {loc}. Checking next...")
+            while running:
+                done, _ = wait(running, timeout=settings.checkpoint_interval_seconds, return_when=FIRST_COMPLETED)
+                for future in done:
+                    loc, tile = running.pop(future)
+                    stats = future.result()
+                    tiles = task["locations"][loc]["tiles"]
+                    
+                    if tile is not None:
+                        # Only tiles searched to the end; skipped or stopped ones stay pending
+                        with STATS_LOCK:
+                            tiles["done"] = len(progress[loc]["tiles_done"])
+                        # A full feed means the tile had more places than Maps would list
+                        if (stats and not task["stop"] and tile["depth"] < settings.tile_max_depth
+                                and is_saturated(stats["feed_cards"])):
+                            children = subdivide(tile)
+                            tiles["subdivided"] += 1
+                            tiles["planned"] += len(children)
+                            for child in children:
+                                submit(loc, child)
+                    
+                    remaining[loc] -= 1
+                    if remaining[loc] == 0:
+                        finish_location(task, request, loc, progress[loc])
+                
+                if time.monotonic() - last_checkpoint >= settings.checkpoint_interval_seconds:
+                    write_checkpoint(task_id, request)
+                    last_checkpoint = time.monotonic()
+        
+        failed = [(loc, entry["error"]) for loc, entry in task["locations"].items() if entry["status"] == TaskStatus.ERROR]
+        if task.get("interrupted"):
+            task["status"] = TaskStatus.INTERRUPTED
+            print(f"⏸️ Automation {task_id} interrupted by shutdown. Progress checkpointed.")
+        elif task["stop"]:
+            task["status"] = TaskStatus.STOPPED
+            print(f"🛑 Automation {task_id} stopped by user.")
+        elif failed:
+            task["status"] = TaskStatus.ERROR
+            task["error"] = "; ".join(f"{loc}: {error}" for loc, error in failed)
+        else:
+            task["status"] = TaskStatus.COMPLETED
         
-        # If we finished the loop and weren't stopped
-        if not TASKS[task_id]["stop"]:
-             TASKS[task_id]["status"] = TaskStatus.COMPLETED
+        if request.skip_known_leads:
+            task["known_leads"] = known_leads_report(task["stats"])
 
     except Exception as e:
-        TASKS[task_id]["status"] = TaskStatus.ERROR
-        TASKS[task_id]["error"] = str(e)
+        task["status"] = TaskStatus.ERROR
+        task["error"] = str(e)
         print(f"❌ Automation {task_id} Error: {e}")
     finally:
-        TASKS[task_id]["running"] = False
-        print(f"🏁 Automation {task_id} Finished. Status: {TASKS[task_id]['status']}")
+        # Leads still queued on the writer land before the final checkpoint
+        lead_writer.flush(timeout=30)
+        write_checkpoint(task_id, request)
+        task["running"] = False
+        print(f"🏁 Automation {task_id} Finished. Status: {task['status']}")
+
+
+def interrupt_running_tasks() -> int:
+    """
+    Stop every running task because the server is shutting down. Each task
+    writes a final checkpoint marked interrupted as it winds down.
+    """
+    count = 0
+    for task in TASKS.values():
+        if task["running"]:
+            task["interrupted"] = True
+            task["stop"] = True
+            count += 1
+    if count:
+        print(f"⏸️ Shutting down: checkpointing {count} running automation task(s).")
+    return count
+
+
+def recover_checkpoints():
+    """
+    At startup, mark the checkpoints of tasks the last server process never
+    finished (it crashed or was killed) as interrupted, so they can be resumed.
+    Checkpoints rewritten within `checkpoint_stale_seconds` are skipped: their
+    task may still be running on another server sharing the database.
+    """
+    try:
+        count = mark_interrupted(
+            [TaskStatus.IDLE.value, TaskStatus.RUNNING.value],
+            TaskStatus.INTERRUPTED.value,
+            settings.checkpoint_stale_seconds
+        )
+        if count:
+            print(f"⏸️ {count} automation task(s) were interrupted. Resume with POST /automation/tasks/{{task_id}}/resume.")
+    except Exception as e:
+        print(f"❌ Checkpoint Error: {e}")
 
 
 @router.post(
@@ -97,17 +501,10 @@ def start_automation(
     api_key: APIKeyData = Depends(get_api_key)
 ):
     """Start a new lead scraping automation task."""
-    log_usage(api_key.id, "/automation/start", 0)
+    usage_writer.record(api_key.id, "/automation/start", 0)
     
     task_id = str(uuid.uuid4())
-    TASKS[task_id] = {
-        "id": task_id,
-        "config": request.model_dump(),
-        "running": True,
-        "stop": False,
-        "status": TaskStatus.IDLE,
-        "error": None
-    }
+    TASKS[task_id] = new_task_entry(task_id, request)
     
     background_tasks.add_task(background_task_scraper, task_id, request)
     return api_success("Automation task started", {"task_id": task_id}, status_code=201)
@@ -128,7 +525,7 @@ This is useful when you want to halt all scraping activity at once.
 )
 def stop_all_automation(api_key: APIKeyData = Depends(get_api_key)):
     """Stop all currently running automation tasks."""
-    log_usage(api_key.id, "/automation/stop", 0)
+    usage_writer.record(api_key.id, "/automation/stop", 0)
     
     count_stopped = 0
     for tid, task in TASKS.items():
@@ -178,6 +575,7 @@ Retrieve the current status and details of a specific automation task.
 - `completed` - Task finished successfully
 - `stopped` - Task was stopped by user
 - `error` - Task encountered an error
+- `interrupted` - The server shut down mid-run; the task can be resumed
     """,
     response_description="Task details including status, config, and any errors",
     response_model=APIResponse,
@@ -202,6 +600,8 @@ Retrieve a list of all automation tasks (running and completed).
 
 This returns the full task history for the current session.
 Note: Tasks are stored in memory and will be cleared on server restart.
+Unfinished tasks keep a checkpoint and can be resumed after a restart
+(see `/automation/checkpoints`).
     """,
     response_description="Dictionary of all tasks keyed by task ID",
     response_model=APIResponse,
@@ -212,6 +612,79 @@ def get_all_tasks(api_key: APIKeyData = Depends(get_api_key)):
     return api_success("All tasks retrieved", {"tasks": TASKS, "count": len(TASKS)})
 
 
+@router.post(
+    "/tasks/{task_id}/resume",
+    summary="Resume a task from its checkpoint",
+    description="""
+Resume an automation task that was interrupted (server restart, crash),
+stopped, or failed, from its last checkpoint.
+
+Completed locations and already searched tiles are skipped, and businesses
+the earlier runs already processed are not opened again. The feed is
+scrolled back to the depth the last run reached before new places are
+opened. The task keeps its ID.
+    """,
+    response_description="The resumed task ID and how much was already done",
+    response_model=APIResponse,
+    responses=STANDARD_RESPONSES,
+)
+def resume_task(
+    background_tasks: BackgroundTasks,
+    task_id: str = Path(..., description="The unique task ID to resume"),
+    api_key: APIKeyData = Depends(get_api_key)
+):
+    """Resume an automation task from its checkpoint."""
+    usage_writer.record(api_key.id, "/automation/resume", 0)
+    
+    task = TASKS.get(task_id)
+    if task and task["running"]:
+        return api_error("Task is already running", status_code=409)
+    
+    checkpoint = load_checkpoint(task_id)
+    if not checkpoint:
+        return api_error("No checkpoint found for this task", status_code=404)
+    
+    request = ScrapeRequest(**checkpoint["request"])
+    task = new_task_entry(task_id, request)
+    progress = {}
+    for loc, entry in task["locations"].items():
+        saved = checkpoint["locations"].get(loc, {})
+        progress[loc] = new_location_progress(saved)
+        entry["leads"] = entry["stats"]["leads_saved"] = saved.get("leads", 0)
+        if saved.get("status") == TaskStatus.COMPLETED:
+            entry["status"] = TaskStatus.COMPLETED
+    task["stats"]["leads_saved"] = sum(entry["leads"] for entry in task["locations"].values())
+    
+    TASK_PROGRESS[task_id] = progress
+    TASKS[task_id] = task
+    background_tasks.add_task(background_task_scraper, task_id, request)
+    
+    return api_success("Automation task resumed", {
+        "task_id": task_id,
+        "locations_completed": sum(1 for entry in task["locations"].values() if entry["status"] == TaskStatus.COMPLETED),
+        "locations_remaining": sum(1 for entry in task["locations"].values() if entry["status"] != TaskStatus.COMPLETED),
+        "places_done": sum(len(p["done_keys"]) for p in progress.values()),
+    })
+
+
+@router.get(
+    "/checkpoints",
+    summary="List resumable tasks",
+    description="""
+List the checkpoints of automation tasks that did not complete: tasks
+interrupted by a server restart, stopped, or failed. Any of them can be
+continued with `/automation/tasks/{task_id}/resume`.
+    """,
+    response_description="Checkpoint summaries, newest first",
+    response_model=APIResponse,
+    responses=STANDARD_RESPONSES,
+)
+def get_checkpoints(api_key: APIKeyData = Depends(get_api_key)):
+    """List the checkpoints of unfinished automation tasks."""
+    checkpoints = list_checkpoints()
+    return api_success("Checkpoints retrieved", {"checkpoints": checkpoints, "count": len(checkpoints)})
+
+
 @router.get(
     "/export",
     summary="Export leads to CSV",
@@ -225,7 +698,7 @@ The CSV includes all lead data: business name, address, phone, website, etc.
 )
 def export_leads(api_key: APIKeyData = Depends(get_api_key)):
     """Export all leads from the database to a CSV file."""
-    log_usage(api_key.id, "/automation/export", 0)
+    usage_writer.record(api_key.id, "/automation/export", 0)
     
     leads = get_all_leads()
     if not leads:
@@ -5,17 +5,21 @@ This module provides endpoints for managing API keys:
 - Admin endpoints: Create, list, revoke, and delete API keys
 - User endpoints: View your own key info and usage statistics
 """
-from fastapi import APIRouter, Depends, Path
+from fastapi import APIRouter, Depends, Path, Query
+from typing import Optional
 
 from app.middleware.auth import get_api_key, require_admin
 from app.models.api_key import APIKeyCreate, APIKeyData
 from app.db import (
-    create_api_key,
-    get_api_key_by_id,
-    list_api_keys,
-    revoke_api_key,
-    delete_api_key,
-    get_usage_stats
+    create_api_key_async,
+    get_api_key_by_id_async,
+    list_api_keys_async,
+    revoke_api_key_async,
+    delete_api_key_async,
+    get_usage_stats_async,
+    rebuild_usage_counters,
+    maintain_usage_partitions,
+    list_usage_partitions
 )
 from app.helpers import api_success, api_error
 from app.helpers.response import APIResponse, STANDARD_RESPONSES
@@ -49,7 +53,7 @@ async def create_key(
     _: bool = Depends(require_admin)
 ):
     """Create a new API key. Admin only."""
-    result = create_api_key(
+    result = await create_api_key_async(
         name=request.name,
         tier=request.tier,
         expires_in_days=request.expires_in_days
@@ -71,7 +75,7 @@ Keys are returned with masked values (showing only the prefix) for security.
 )
 async def list_keys(_: bool = Depends(require_admin)):
     """List all API keys (masked). Admin only."""
-    keys = list_api_keys()
+    keys = await list_api_keys_async()
     return api_success("API keys retrieved", keys)
 
 
@@ -88,7 +92,7 @@ async def get_key(
     _: bool = Depends(require_admin)
 ):
     """Get details of a specific API key. Admin only."""
-    key = get_api_key_by_id(key_id)
+    key = await get_api_key_by_id_async(key_id)
     if not key:
         return api_error("API key not found", status_code=404)
     return api_success("API key retrieved", key)
@@ -115,11 +119,11 @@ async def get_key_usage(
     _: bool = Depends(require_admin)
 ):
     """Get usage statistics for a specific API key. Admin only."""
-    key = get_api_key_by_id(key_id)
+    key = await get_api_key_by_id_async(key_id)
     if not key:
         return api_error("API key not found", status_code=404)
     
-    stats = get_usage_stats(key_id)
+    stats = await get_usage_stats_async(key_id)
     return api_success("Usage stats retrieved", stats)
 
 
@@ -141,7 +145,7 @@ async def delete_key(
     _: bool = Depends(require_admin)
 ):
     """Permanently delete an API key. Admin only."""
-    success = delete_api_key(key_id)
+    success = await delete_api_key_async(key_id)
     if not success:
         return api_error("API key not found", status_code=404)
     return api_success(f"API key {key_id} deleted")
@@ -165,12 +169,81 @@ async def revoke_key(
     _: bool = Depends(require_admin)
 ):
     """Revoke (deactivate) an API key. Admin only."""
-    success = revoke_api_key(key_id)
+    success = await revoke_api_key_async(key_id)
     if not success:
         return api_error("API key not found", status_code=404)
     return api_success(f"API key {key_id} revoked")
 
 
+@router.post(
+    "/admin/usage/reconcile",
+    summary="Rebuild usage counters from the usage logs",
+    description="""
+Recompute the per-key monthly usage counters, which quota checks and usage
+stats read, from the raw usage logs.
+
+Counters are updated with every logged request, so this is only needed
+after logs were edited or imported by hand. Pass `key_id` to rebuild a
+single key. Requests logged during the rebuild wait for it to finish.
+
+Returns:
+- Counters rebuilt
+- How many of them differed from the logs
+    """,
+    response_description="Rebuilt and drifted counter counts",
+    response_model=APIResponse,
+    responses=STANDARD_RESPONSES,
+)
+def reconcile_usage(
+    key_id: Optional[int] = Query(None, description="Only rebuild this API key's counters"),
+    _: bool = Depends(require_admin)
+):
+    """Rebuild usage counters from the usage logs. Admin only."""
+    result = rebuild_usage_counters(key_id)
+    return api_success("Usage counters rebuilt", result)
+
+
+@router.get(
+    "/admin/usage/partitions",
+    summary="List usage log partitions",
+    description="""
+List the monthly partitions of the usage logs, oldest first.
+
+Returns, per partition:
+- Table name and the month it holds
+- Estimated row count (from the last ANALYZE)
+    """,
+    response_description="Usage log partitions",
+    response_model=APIResponse,
+    responses=STANDARD_RESPONSES,
+)
+def get_usage_partitions(_: bool = Depends(require_admin)):
+    """List usage log partitions. Admin only."""
+    return api_success("Usage log partitions retrieved", list_usage_partitions())
+
+
+@router.post(
+    "/admin/usage/partitions/maintain",
+    summary="Create upcoming and retire old usage log partitions",
+    description="""
+Run the partition maintenance that also runs at startup: create the
+partitions of this month and the next `USAGE_PARTITION_MONTHS_AHEAD` months,
+move logs out of the default partition, and detach or drop the months older
+than `USAGE_LOG_RETENTION_MONTHS` (`USAGE_LOG_RETENTION_ACTION`).
+
+Returns:
+- Partitions created
+- Partitions detached or dropped, and which of the two
+    """,
+    response_description="Created and removed partitions",
+    response_model=APIResponse,
+    responses=STANDARD_RESPONSES,
+)
+def maintain_partitions(_: bool = Depends(require_admin)):
+    """Create and retire usage log partitions. Admin only."""
+    return api_success("Usage log partitions maintained", maintain_usage_partitions())
+
+
 # ============== User Self-Service Endpoints ==============
 
 @router.get(
@@ -187,7 +260,7 @@ Returns your key's name, tier, limits, and expiration date.
 )
 async def get_my_info(api_key: APIKeyData = Depends(get_api_key)):
     """Get your own API key info."""
-    key = get_api_key_by_id(api_key.id)
+    key = await get_api_key_by_id_async(api_key.id)
     if not key:
         return api_error("API key not found", status_code=404)
     return api_success("Your API key info", key)
@@ -211,5 +284,5 @@ Returns:
 )
 async def get_my_usage(api_key: APIKeyData = Depends(get_api_key)):
     """Get your own usage statistics."""
-    stats = get_usage_stats(api_key.id)
+    stats = await get_usage_stats_async(api_key.id)
     return api_success("Your usage stats", stats)
@@ -0,0 +1,217 @@
+"""
+Dedicated-thread batching shared by the write-behind writers.
+
+A writer owns a thread that drains a bounded queue and hands what it finds
+there to a batch function, once `batch_size` items are waiting or the
+first of them has waited `flush_ms`. When the queue is full, submitting
+blocks until the writer has caught up, so a slow database slows callers
+down instead of growing an unbounded buffer. `flush()` waits until
+everything submitted so far is written and `stop()` writes whatever is
+still queued.
+
+Writers whose callers need each item's result (the lead writer) hand out
+a Future per item; the others are fire-and-forget.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+# Queued by stop() after the last item
+_STOP = object()
+
+
+class BatchWriter:
+    """
+    Dedicated thread writing queued items in batches.
+
+    :param write: Batch function, called with a list of items.
+    :param queue_size: Items waiting to be written before submitting blocks.
+    :param batch_size: Most items written in one call of `write`.
+    :param flush_ms: How long the first item of a batch waits for others to join it.
+    """
+
+    # Used in log lines, thread names and stats keys
+    name = "Batch writer"
+    thread_name = "batch-writer"
+    item_name = "items"
+    # Whether submitting returns a Future resolving to the item's result
+    returns_futures = False
+
+    def __init__(
+        self,
+        write: Callable[[List], Any],
+        queue_size: int = 1000,
+        batch_size: int = 100,
+        flush_ms: int = 50,
+    ):
+        self.write = write
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_ms = flush_ms
+
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._idle = threading.Condition()
+        self._pending = 0
+
+        # Counters
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.batch_seconds_total = 0.0
+        self.last_batch_seconds = 0.0
+        self.failed_batches = 0
+        self.backpressure_waits = 0
+        self.backpressure_seconds_total = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the writer thread."""
+        if self.running:
+            return
+        self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+        self._thread.start()
+        print(f"✅ {self.name} started (queue {self.queue_size}, batches of {self.batch_size}).")
+
+    def stop(self, timeout: float = 30):
+        """
+        Write what is still queued, then stop the writer thread. A thread
+        still busy after `timeout` is left to finish the queue on its own.
+        """
+        if not self.running:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout=timeout)
+        if self._thread.is_alive():
+            # Still writing: draining here would write its batches twice
+            print(f"⚠️ {self.name} still busy after {timeout}s; leaving {self._queue.qsize()} queued {self.item_name} to its thread.")
+            return
+        self._thread = None
+
+        # Items submitted while the thread was winding down
+        leftover = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                leftover.append(item)
+        if leftover:
+            self._write_batch(leftover)
+        print(f"🛑 {self.name} stopped after {self.written} {self.item_name} in {self.batches} batches.")
+
+    def _submit(self, item) -> Optional[Future]:
+        """
+        Queue an item, blocking while the queue is full. When the writer
+        isn't running the item is written right away.
+        """
+        future = Future() if self.returns_futures else None
+        if not self.running:
+            self._write_batch([(item, future)], queued=False)
+            return future
+
+        with self._idle:
+            self._pending += 1
+            self.submitted += 1
+        try:
+            self._queue.put_nowait((item, future))
+        except queue.Full:
+            start = time.perf_counter()
+            self._queue.put((item, future))
+            with self._idle:
+                self.backpressure_waits += 1
+                self.backpressure_seconds_total += time.perf_counter() - start
+        return future
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every item submitted so far is written. False on timeout."""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout=timeout)
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.flush_ms / 1000
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._write_batch(batch)
+
+    def _written(self, items: List, result) -> int:
+        """How many items a successful batch wrote. Called with the stats lock held."""
+        return len(items)
+
+    def _write_batch(self, batch: List, queued: bool = True):
+        items = [item for item, _ in batch]
+        start = time.perf_counter()
+        try:
+            result = self.write(items)
+            error = None
+        except Exception as e:
+            print(f"❌ {self.name} batch of {len(items)} failed: {e}")
+            result, error = None, e
+        elapsed = time.perf_counter() - start
+
+        for i, (_, future) in enumerate(batch):
+            if future is None:
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result[i])
+
+        with self._idle:
+            self.batches += 1
+            self.batch_seconds_total += elapsed
+            self.last_batch_seconds = elapsed
+            written = 0
+            if error is not None:
+                self.failed_batches += 1
+            else:
+                written = self._written(items, result)
+            self.written += written
+            self.dropped += len(items) - written
+            if queued:
+                self._pending -= len(batch)
+            else:
+                self.submitted += len(batch)
+            self._idle.notify_all()
+
+    def get_stats(self) -> Dict:
+        """Queue depth, batch sizes and latency, and time callers spent blocked."""
+        with self._idle:
+            return {
+                "running": self.running,
+                "queued": self._queue.qsize(),
+                "pending": self._pending,
+                "queue_size": self.queue_size,
+                "batch_size": self.batch_size,
+                "flush_ms": self.flush_ms,
+                "submitted": self.submitted,
+                "written": self.written,
+                "dropped": self.dropped,
+                "batches": self.batches,
+                "failed_batches": self.failed_batches,
+                f"avg_batch_{self.item_name}": round(self.written / self.batches, 1) if self.batches else None,
+                "avg_batch_ms": round(self.batch_seconds_total / self.batches * 1000, 1) if self.batches else None,
+                "last_batch_ms": round(self.last_batch_seconds * 1000, 1) if self.batches else None,
+                "backpressure_waits": self.backpressure_waits,
+                "backpressure_seconds_total": round(self.backpressure_seconds_total, 3),
+            }
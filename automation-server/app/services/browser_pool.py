@@ -0,0 +1,319 @@
+"""
+Process-wide pool of long-lived Chromium browsers.
+
+Browsers are launched once and shared by every scrape. Each location gets
+its own isolated BrowserContext, which is closed when the location is done.
+Browsers are recycled once they reach a maximum age or a maximum number of
+opened pages, and dropped if they disconnect.
+
+All Playwright objects are bound to the event loop that created them, so the
+pool owns a dedicated event loop thread. Sync callers (background task
+threads) submit coroutines to it with `BrowserPool.run()`.
+"""
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+from playwright.async_api import async_playwright
+from config import settings
+
+
+class _PooledBrowser:
+    """A launched browser plus the bookkeeping used by the recycling policy."""
+
+    def __init__(self, browser, launch_seconds: float):
+        self.browser = browser
+        self.launch_seconds = launch_seconds
+        self.launched_at = time.time()
+        self.contexts_in_use = 0
+        self.contexts_served = 0
+        self.pages_opened = 0
+        self.retiring = False
+
+    def age_seconds(self) -> float:
+        return time.time() - self.launched_at
+
+    def is_healthy(self) -> bool:
+        return self.browser.is_connected()
+
+    def is_expired(self, max_age_seconds: int, max_pages: int) -> bool:
+        if max_age_seconds > 0 and self.age_seconds() >= max_age_seconds:
+            return True
+        if max_pages > 0 and self.pages_opened >= max_pages:
+            return True
+        return False
+
+    def to_dict(self) -> Dict:
+        return {
+            "age_seconds": round(self.age_seconds(), 1),
+            "launch_ms": round(self.launch_seconds * 1000, 1),
+            "contexts_in_use": self.contexts_in_use,
+            "contexts_served": self.contexts_served,
+            "pages_opened": self.pages_opened,
+            "retiring": self.retiring,
+            "connected": self.is_healthy(),
+        }
+
+
+class BrowserPool:
+    """
+    Shared Chromium browsers handing out one BrowserContext per location.
+
+    :param size: Maximum number of browsers kept alive.
+    :param contexts_per_browser: Contexts a browser hosts before another one is launched.
+    :param max_age_seconds: Recycle a browser after this many seconds (0 = never).
+    :param max_pages: Recycle a browser after it has opened this many pages (0 = never).
+    :param health_check_seconds: Interval of the background health check.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        contexts_per_browser: int = 4,
+        max_age_seconds: int = 1800,
+        max_pages: int = 500,
+        health_check_seconds: int = 30,
+    ):
+        self.size = size
+        self.contexts_per_browser = contexts_per_browser
+        self.max_age_seconds = max_age_seconds
+        self.max_pages = max_pages
+        self.health_check_seconds = health_check_seconds
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._playwright = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._health_task: Optional[asyncio.Task] = None
+        self._browsers: List[_PooledBrowser] = []
+
+        self.hits = 0
+        self.misses = 0
+        self.launches = 0
+        self.launch_failures = 0
+        self.launch_seconds_total = 0.0
+        self.last_launch_seconds = None
+        self.recycled = 0
+        self.unhealthy = 0
+
+    # ============== Lifecycle (called from sync code) ==============
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None and self._loop.is_running()
+
+    def start(self, warm: bool = True):
+        """Start the pool's event loop thread and optionally pre-launch one browser."""
+        if self.running:
+            return
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="browser-pool", daemon=True)
+        self._thread.start()
+        self.run(self._start(warm))
+        print(f"✅ Browser pool started (size={self.size}).")
+
+    def stop(self):
+        """Close all browsers and stop the event loop thread."""
+        if not self.running:
+            return
+
+        try:
+            self.run(self._shutdown())
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=10)
+            self._loop.close()
+            self._loop = None
+            self._thread = None
+        print("🛑 Browser pool stopped.")
+
+    def run(self, coro):
+        """Run a coroutine on the pool's event loop and block until it finishes."""
+        return self.submit(coro).result()
+
+    def submit(self, coro):
+        """Schedule a coroutine on the pool's event loop. Returns a concurrent Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def owns_current_loop(self) -> bool:
+        """True when called from a coroutine running on the pool's event loop."""
+        if not self.running:
+            return False
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    # ============== Contexts ==============
+
+    @asynccontextmanager
+    async def context(self, **options):
+        """Yield a fresh, isolated BrowserContext on a pooled browser."""
+        pooled = await self._acquire()
+        try:
+            context = await pooled.browser.new_context(**options)
+        except Exception:
+            await self._release(pooled)
+            raise
+
+        def on_page(_page):
+            pooled.pages_opened += 1
+
+        context.on("page", on_page)
+        try:
+            yield context
+        finally:
+            try:
+                await context.close()
+            except Exception as e:
+                print(f"⚠️ Failed to close pooled context: {e}")
+            await self._release(pooled)
+
+    async def _acquire(self) -> _PooledBrowser:
+        async with self._lock:
+            self._drop_unhealthy()
+
+            candidates = [
+                b for b in self._browsers
+                if not b.retiring and not b.is_expired(self.max_age_seconds, self.max_pages)
+            ]
+            for b in self._browsers:
+                if b not in candidates and not b.retiring:
+                    b.retiring = True
+
+            available = [b for b in candidates if b.contexts_in_use < self.contexts_per_browser]
+            if available:
+                pooled = min(available, key=lambda b: b.contexts_in_use)
+                self.hits += 1
+            elif len(candidates) < self.size or not candidates:
+                pooled = await self._launch()
+                self.misses += 1
+            else:
+                # Pool is full: share the least loaded browser rather than wait
+                pooled = min(candidates, key=lambda b: b.contexts_in_use)
+                self.hits += 1
+
+            pooled.contexts_in_use += 1
+            pooled.contexts_served += 1
+            return pooled
+
+    async def _release(self, pooled: _PooledBrowser):
+        async with self._lock:
+            pooled.contexts_in_use -= 1
+            if pooled.is_expired(self.max_age_seconds, self.max_pages):
+                pooled.retiring = True
+            await self._close_retired()
+
+    async def _launch(self) -> _PooledBrowser:
+        start = time.perf_counter()
+        try:
+            browser = await self._playwright.chromium.launch(headless=True)
+        except Exception:
+            self.launch_failures += 1
+            raise
+        elapsed = time.perf_counter() - start
+
+        self.launches += 1
+        self.launch_seconds_total += elapsed
+        self.last_launch_seconds = elapsed
+        print(f"🚀 Browser pool launched Chromium in {elapsed * 1000:.0f}ms.")
+
+        pooled = _PooledBrowser(browser, elapsed)
+        self._browsers.append(pooled)
+        return pooled
+
+    def _drop_unhealthy(self):
+        for b in list(self._browsers):
+            if not b.is_healthy():
+                print("⚠️ Pooled browser disconnected. Dropping it.")
+                self._browsers.remove(b)
+                self.unhealthy += 1
+
+    async def _close_retired(self):
+        for b in list(self._browsers):
+            if b.retiring and b.contexts_in_use == 0:
+                self._browsers.remove(b)
+                self.recycled += 1
+                try:
+                    await b.browser.close()
+                except Exception as e:
+                    print(f"⚠️ Failed to close retired browser: {e}")
+
+    # ============== Loop-side lifecycle ==============
+
+    async def _start(self, warm: bool):
+        self._lock = asyncio.Lock()
+        self._playwright = await async_playwright().start()
+        self._health_task = asyncio.create_task(self._health_loop())
+
+        if warm:
+            try:
+                async with self._lock:
+                    await self._launch()
+            except Exception as e:
+                # Keep the API up; the next scrape retries the launch
+                print(f"⚠️ Browser pool warm-up failed: {e}")
+
+    async def _shutdown(self):
+        if self._health_task:
+            self._health_task.cancel()
+        for b in self._browsers:
+            try:
+                await b.browser.close()
+            except Exception:
+                pass
+        self._browsers = []
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_check_seconds)
+            try:
+                async with self._lock:
+                    self._drop_unhealthy()
+                    for b in self._browsers:
+                        if b.is_expired(self.max_age_seconds, self.max_pages):
+                            b.retiring = True
+                    await self._close_retired()
+            except Exception as e:
+                print(f"⚠️ Browser pool health check failed: {e}")
+
+    # ============== Metrics ==============
+
+    def get_stats(self) -> Dict:
+        """Snapshot of pool size, hit/miss counts and launch latency."""
+        requests = self.hits + self.misses
+        browsers = list(self._browsers)
+        return {
+            "running": self.running,
+            "size": len(browsers),
+            "max_size": self.size,
+            "contexts_per_browser": self.contexts_per_browser,
+            "contexts_in_use": sum(b.contexts_in_use for b in browsers),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / requests, 3) if requests else None,
+            "launches": self.launches,
+            "launch_failures": self.launch_failures,
+            "avg_launch_ms": round(self.launch_seconds_total / self.launches * 1000, 1) if self.launches else None,
+            "last_launch_ms": round(self.last_launch_seconds * 1000, 1) if self.last_launch_seconds is not None else None,
+            "recycled": self.recycled,
+            "unhealthy": self.unhealthy,
+            "max_age_seconds": self.max_age_seconds,
+            "max_pages": self.max_pages,
+            "browsers": [b.to_dict() for b in browsers],
+        }
+
+
+# Singleton instance, started in the FastAPI lifespan
+browser_pool = BrowserPool(
+    size=settings.browser_pool_size,
+    contexts_per_browser=settings.browser_contexts_per_browser,
+    max_age_seconds=settings.browser_max_age_seconds,
+    max_pages=settings.browser_max_pages,
+    health_check_seconds=settings.browser_health_check_seconds,
+)
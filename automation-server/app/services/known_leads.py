@@ -0,0 +1,84 @@
+"""
+In-memory membership of the leads already in the database.
+
+`insert_lead` only recognizes a duplicate after its place page was opened,
+verified and extracted. The scraper checks each feed card against this set
+first and skips businesses that are already stored.
+
+A card is known if its place id is stored. Leads saved before place ids
+were recorded are matched on normalized name + searched location instead,
+which can mistake another branch of a chain for a stored one. To measure
+that, a small share of known cards (`known_leads_audit_rate`) is opened
+anyway: one that turns out to be new is a false positive.
+
+The set is loaded from the leads table on first use and topped up from the
+rows inserted since (by id) before every scrape, so inserts made by other
+processes are picked up too. Leads this process saves are added directly.
+"""
+import re
+import threading
+import time
+from typing import Dict, Optional
+from app.db import get_lead_identities
+
+
+def name_key(name: str, location: str) -> str:
+    """Identity of a business by name within a searched location."""
+    return "|".join(re.sub(r"[\W_]+", " ", part or "").strip().lower() for part in (name, location))
+
+
+class KnownLeads:
+    """Place ids and legacy name keys of the stored leads."""
+
+    def __init__(self):
+        self._place_ids = set()
+        self._names = set()
+        self._last_id = 0
+        self._lock = threading.Lock()
+        self.refreshed_at: Optional[float] = None
+
+    def refresh(self):
+        """Load the leads inserted since the last refresh."""
+        with self._lock:
+            for row in get_lead_identities(self._last_id):
+                if row["place_id"]:
+                    self._place_ids.add(row["place_id"])
+                else:
+                    self._names.add(name_key(row["business_name"], row["location"]))
+                self._last_id = row["id"]
+            self.refreshed_at = time.time()
+
+    def add(self, place_id: Optional[str], name: str, location: str):
+        """Record a lead that was just saved (or found already stored)."""
+        if place_id:
+            self._place_ids.add(place_id)
+        else:
+            self._names.add(name_key(name, location))
+
+    def contains(self, place_id: Optional[str], name: str, location: str) -> bool:
+        if place_id and place_id in self._place_ids:
+            return True
+        return bool(self._names) and name_key(name, location) in self._names
+
+    def get_stats(self) -> Dict:
+        return {
+            "place_ids": len(self._place_ids),
+            "legacy_names": len(self._names),
+            "last_lead_id": self._last_id,
+            "refreshed_at": self.refreshed_at,
+        }
+
+
+def known_leads_report(stats: Dict) -> Dict:
+    """Skip counts and the audited false-positive rate of a task or run."""
+    audited = stats.get("known_audited", 0)
+    return {
+        "skipped": stats.get("cards_skipped_known", 0),
+        "audited": audited,
+        "false_positives": stats.get("known_false_positives", 0),
+        "false_positive_rate": round(stats.get("known_false_positives", 0) / audited, 3) if audited else None,
+    }
+
+
+# Singleton instance (one per process; every worker process loads its own)
+known_leads = KnownLeads()
@@ -0,0 +1,71 @@
+"""
+Write-behind pipeline between the scraper and PostgreSQL.
+
+Without it every verified lead opens its own connection, runs one INSERT and
+commits before the scraper moves on. The writer saves queued leads in
+batches with `insert_leads` (one COPY and one merge per batch) on its own
+thread; see `BatchWriter`.
+
+`submit()` returns a Future resolving to True if the lead was new, which the
+scraper awaits to count the lead towards its limit while its browser pages
+keep working. Tasks call `flush()` when they stop and the lifespan stops
+the writer on shutdown.
+"""
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
+from app.db import insert_leads
+from app.services.batch_writer import BatchWriter
+from config import settings
+
+
+class LeadWriter(BatchWriter):
+    """
+    Dedicated thread saving queued leads in batches.
+
+    :param queue_size: Leads waiting to be written before `submit()` blocks.
+    :param batch_size: Most leads written in one transaction.
+    :param flush_ms: How long the first lead of a batch waits for others to join it.
+    :param write: Batch writer returning one "is new" flag per lead (default `insert_leads`).
+    """
+
+    name = "Lead writer"
+    thread_name = "lead-writer"
+    item_name = "leads"
+    returns_futures = True
+
+    def __init__(
+        self,
+        queue_size: int = 1000,
+        batch_size: int = 100,
+        flush_ms: int = 50,
+        write: Optional[Callable[[List[Dict]], List[bool]]] = None,
+    ):
+        super().__init__(write or insert_leads, queue_size, batch_size, flush_ms)
+        self.new_leads = 0
+
+    def submit(self, lead: Dict) -> Future:
+        """
+        Queue a lead and return a Future resolving to True if it was new.
+        Blocks while the queue is full. When the writer isn't running the
+        lead is written right away.
+        """
+        return self._submit(lead)
+
+    def _written(self, leads: List[Dict], results: List[bool]) -> int:
+        self.new_leads += sum(results)
+        return len(leads)
+
+    def get_stats(self) -> Dict:
+        """Queue depth, batch sizes and latency, new leads, and time callers spent blocked."""
+        stats = super().get_stats()
+        with self._idle:
+            stats["new_leads"] = self.new_leads
+        return stats
+
+
+# Singleton instance, started in the FastAPI lifespan (and in every worker process)
+lead_writer = LeadWriter(
+    queue_size=settings.lead_writer_queue_size,
+    batch_size=settings.lead_writer_batch_size,
+    flush_ms=settings.lead_writer_flush_ms,
+)
@@ -0,0 +1,192 @@
+"""
+Decoders for the JSON payloads Google Maps fetches while the results feed scrolls.
+
+Search (`/search?tbm=map`) and place-detail (`/maps/preview/place`) responses
+are positional arrays prefixed with the `)]}'` XSSI guard. Place records are
+found structurally (a long list whose data-id slot holds a `0x..:0x..` feature
+id), so changes to the wrapper arrays don't break decoding. The offsets inside
+a record are reverse-engineered; `PLACE_FIELDS` is the one place to update
+when Google reshuffles them.
+"""
+import json
+import re
+from typing import Any, Dict, Iterator, List, Optional
+
+XSSI_PREFIX = ")]}'"
+
+# URL fragments of the XHRs that carry place records
+PAYLOAD_URL_MARKERS = ("/search?tbm=map", "/maps/preview/place", "/maps/preview/search")
+
+FEATURE_ID_PATTERN = re.compile(r"^0x[0-9a-f]+:0x[0-9a-f]+$")
+
+# Place URLs carry the feature id as a `!1s0x..:0x..` data segment
+URL_FEATURE_ID_PATTERN = re.compile(r"!1s(0x[0-9a-f]+:0x[0-9a-f]+)")
+
+# ...and, in newer links, the `ChIJ..` place id as a `!19s` segment
+URL_PLACE_ID_PATTERN = re.compile(r"!19s([A-Za-z0-9_-]+)")
+
+# Candidate paths per field inside a place record, tried in order
+PLACE_FIELDS = {
+    "feature_id": [(10,)],
+    "place_id": [(78,)],
+    "name": [(11,)],
+    "address": [(39,), (18,)],
+    "website_url": [(7, 0)],
+    "phone": [(178, 0, 0)],
+    "rating": [(4, 7)],
+    "review_count": [(4, 8)],
+    "category": [(13, 0)],
+}
+
+# Strings only present on unclaimed profiles ("Claim this business" link)
+CLAIM_MARKERS = ("/local/business/setup", "business.google.com/create", "Claim this business")
+
+# A place record is a long flat list; shorter lists are wrappers or sub-fields
+MIN_RECORD_LENGTH = 80
+
+
+def is_payload_url(url: str) -> bool:
+    """True if the response at `url` may carry place records."""
+    return any(marker in url for marker in PAYLOAD_URL_MARKERS)
+
+
+def feature_id_from_url(url: Optional[str]) -> Optional[str]:
+    """Extract the `0x..:0x..` feature id from a /maps/place/ URL."""
+    if not url:
+        return None
+    match = URL_FEATURE_ID_PATTERN.search(url)
+    return match.group(1) if match else None
+
+
+def place_key(url: Optional[str]) -> Optional[str]:
+    """
+    Stable identity of a place card, independent of its feed position.
+    Feature id when the URL has one, else the place id, else the URL
+    without its query string.
+    """
+    if not url:
+        return None
+    feature_id = feature_id_from_url(url)
+    if feature_id:
+        return feature_id
+    match = URL_PLACE_ID_PATTERN.search(url)
+    if match:
+        return match.group(1)
+    return url.split("?", 1)[0]
+
+
+def parse_payload(body: str) -> Optional[Any]:
+    """Strip the XSSI guard and parse a payload. Returns None if it isn't JSON."""
+    text = body.lstrip()
+    if text.startswith(XSSI_PREFIX):
+        text = text[len(XSSI_PREFIX):]
+    try:
+        return json.loads(text)
+    except (ValueError, TypeError):
+        return None
+
+
+def decode_places(body: str) -> List[Dict]:
+    """Decode every place record found in a raw response body."""
+    data = parse_payload(body)
+    if data is None:
+        return []
+    return list(iter_places(data))
+
+
+def iter_places(data: Any) -> Iterator[Dict]:
+    """Walk a parsed payload and yield decoded place records."""
+    seen = set()
+    stack = [data]
+    while stack:
+        node = stack.pop()
+
+        # Payloads embed further payloads as XSSI-prefixed strings
+        if isinstance(node, str):
+            if node.startswith(XSSI_PREFIX):
+                nested = parse_payload(node)
+                if nested is not None:
+                    stack.append(nested)
+            continue
+
+        if not isinstance(node, list):
+            continue
+
+        if _is_place_record(node):
+            place = decode_place(node)
+            if place["feature_id"] not in seen:
+                seen.add(place["feature_id"])
+                yield place
+            continue
+
+        stack.extend(reversed(node))
+
+
+def decode_place(record: List) -> Dict:
+    """Map a place record onto the lead fields used by the scraper."""
+    values = {field: _first(record, paths) for field, paths in PLACE_FIELDS.items()}
+
+    name = values["name"] if isinstance(values["name"], str) else None
+    address = values["address"] if isinstance(values["address"], str) else None
+    if address and name and address.startswith(f"{name}, "):
+        address = address[len(name) + 2:]
+
+    website_url = values["website_url"] if isinstance(values["website_url"], str) else None
+    phone = values["phone"] if isinstance(values["phone"], str) else None
+
+    rating = values["rating"]
+    rating = float(rating) if isinstance(rating, (int, float)) else None
+
+    review_count = values["review_count"]
+    review_count = int(review_count) if isinstance(review_count, (int, float)) else 0
+
+    category = values["category"] if isinstance(values["category"], str) else "N/A"
+
+    return {
+        "feature_id": values["feature_id"],
+        "place_id": values["place_id"] if isinstance(values["place_id"], str) else None,
+        "business_name": name,
+        "address": address or "N/A",
+        "website_url": website_url,
+        "has_website": bool(website_url),
+        "phone": phone,
+        "rating": rating,
+        "review_count": review_count,
+        "category": category,
+        "is_claimed": not _contains_marker(record, CLAIM_MARKERS),
+    }
+
+
+def _is_place_record(node: List) -> bool:
+    if len(node) < MIN_RECORD_LENGTH:
+        return False
+    feature_id = node[10]
+    return isinstance(feature_id, str) and bool(FEATURE_ID_PATTERN.match(feature_id)) and isinstance(node[11], str)
+
+
+def _dig(node: Any, path: tuple) -> Any:
+    for index in path:
+        if not isinstance(node, list) or index >= len(node):
+            return None
+        node = node[index]
+    return node
+
+
+def _first(record: List, paths: List[tuple]) -> Any:
+    for path in paths:
+        value = _dig(record, path)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _contains_marker(node: Any, markers: tuple) -> bool:
+    stack = [node]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            if any(marker in item for marker in markers):
+                return True
+        elif isinstance(item, list):
+            stack.extend(item)
+    return False
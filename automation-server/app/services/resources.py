@@ -0,0 +1,104 @@
+"""
+Request routing and resource accounting for scraper browser contexts.
+
+Lean mode aborts everything the scraper never reads (images, fonts, media,
+map tiles, photos) while an allowlist keeps the Maps app code, the feed and
+the place/search XHRs flowing. Transfer size and per-page CPU time are
+recorded in the run stats in lean mode and when a run asks to be measured,
+so lean and full runs can be compared.
+"""
+from typing import List
+
+# Resource types the scraper never reads
+LEAN_BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+
+# Tile imagery, satellite, street view and photo hosts/paths
+LEAN_BLOCKED_URL_MARKERS = (
+    "/maps/vt",
+    "/kh/v=",
+    "khms",
+    "streetviewpixels",
+    "googleusercontent.com",
+    "ggpht.com",
+    "/maps/preview/photo",
+    "/maps/rpc/photo",
+    "/gen_204",
+    "/log?",
+)
+
+# Always let these through so extraction keeps working
+LEAN_ALLOWED_URL_MARKERS = (
+    "/maps/search/",
+    "/maps/place/",
+    "/maps/preview/place",
+    "/maps/preview/search",
+    "/search?tbm=map",
+    "/maps/_/js/",
+    "/maps/_/ss/",
+    "consent.google.com",
+)
+
+
+def should_block(url: str, resource_type: str) -> bool:
+    """Decide whether lean mode aborts a request."""
+    if any(marker in url for marker in LEAN_ALLOWED_URL_MARKERS):
+        return False
+    if resource_type in LEAN_BLOCKED_RESOURCE_TYPES:
+        return True
+    return any(marker in url for marker in LEAN_BLOCKED_URL_MARKERS)
+
+
+async def install_lean_routing(context, stats: dict):
+    """Abort non-essential requests on every page of the context."""
+
+    async def handle(route):
+        request = route.request
+        if should_block(request.url, request.resource_type):
+            stats["requests_blocked"] += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    await context.route("**/*", handle)
+
+
+def track_transfer(context, stats: dict):
+    """Add the wire size of every finished request in the context to the stats."""
+
+    async def on_finished(request):
+        try:
+            sizes = await request.sizes()
+        except Exception:
+            return
+        stats["requests"] += 1
+        stats["bytes_transferred"] += sizes["responseBodySize"] + sizes["responseHeadersSize"]
+
+    context.on("requestfinished", on_finished)
+
+
+class PageCpuMeter:
+    """Reads main-thread task time of pages through the Chrome DevTools Protocol."""
+
+    def __init__(self, context):
+        self.context = context
+        self.sessions: List = []
+
+    async def watch(self, page):
+        """Start measuring a page. Non-Chromium browsers are silently skipped."""
+        try:
+            session = await self.context.new_cdp_session(page)
+            await session.send("Performance.enable")
+            self.sessions.append(session)
+        except Exception as e:
+            print(f"⚠️ CPU metering unavailable: {e}")
+
+    async def collect(self, stats: dict):
+        """Add the CPU seconds of all watched pages to the stats."""
+        for session in self.sessions:
+            try:
+                result = await session.send("Performance.getMetrics")
+            except Exception:
+                continue
+            metrics = {m["name"]: m["value"] for m in result.get("metrics", [])}
+            stats["cpu_seconds"] = round(stats["cpu_seconds"] + metrics.get("TaskDuration", 0.0), 3)
+            stats["pages_metered"] += 1
@@ -1,67 +1,832 @@
-from playwright.sync_api import sync_playwright
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+from contextlib import asynccontextmanager
+import contextlib
+import asyncio
+import concurrent.futures
+import os
+import queue
+import random
+import threading
 import time
 from app.db import insert_lead
+from app.models.automation import ExtractionMode
+from app.services.browser_pool import browser_pool
+from app.services.known_leads import known_leads, known_leads_report
+from app.services.lead_writer import lead_writer
+from app.services.maps_payload import is_payload_url, decode_places, place_key
+from app.services.resources import install_lean_routing, track_transfer, PageCpuMeter
+from app.services.tiling import tile_search_url, tile_label
+from config import settings
 
-def scrape_google_maps(industry: str, location: str, total: int = -1, stop_signal=None):
+# How many place detail pages are worked in parallel per location by default
+DEFAULT_CONCURRENCY = 3
+
+# Leads buffered for a slow consumer before the scraper waits for it
+LEAD_QUEUE_SIZE = 50
+
+# HAR modes: save the session's traffic, or serve it back with no network
+HAR_RECORD = "record"
+HAR_REPLAY = "replay"
+
+# Feed grew past `n` cards, or the end-of-list marker showed up
+FEED_GROWTH_JS = """
+(n) => document.querySelectorAll('div[role="article"]').length > n
+    || !!document.querySelector('div.HlvSq')
+"""
+
+# Feed grew past `n` cards, its last card changed (virtualized feeds recycle
+# card nodes instead of growing), or the end-of-list marker showed up
+FEED_CHANGED_JS = """
+([n, lastUrl]) => {
+    const cards = document.querySelectorAll('div[role="article"]');
+    if (cards.length > n || document.querySelector('div.HlvSq')) return true;
+    const last = cards.length ? cards[cards.length - 1].querySelector('a[href*="/maps/place/"]') : null;
+    return !!last && last.getAttribute('href') !== lastUrl;
+}
+"""
+
+# Every card in the feed has rendered its name and place link
+FEED_HYDRATED_JS = """
+() => {
+    const cards = Array.from(document.querySelectorAll('div[role="article"]'));
+    return cards.length > 0 && cards.every(card => {
+        const name = card.querySelector('div.qBF1Pd');
+        return name && name.innerText.trim() && card.querySelector('a[href*="/maps/place/"]');
+    });
+}
+"""
+
+# Reads name, place link, rating, review count, category and the Website
+# action button from every result card in the feed
+READ_CARDS_JS = """
+() => Array.from(document.querySelectorAll('div[role="article"]')).map(card => {
+    const nameEl = card.querySelector('div.qBF1Pd');
+    const link = card.querySelector('a[href*="/maps/place/"]');
+    const ratingEl = card.querySelector('span.MW4etd');
+    const reviewsEl = card.querySelector('span.UY7F9');
+    const website = card.querySelector('a[data-value="Website"], a[aria-label*="Website"]');
+
+    const rating = ratingEl ? Number(ratingEl.innerText.trim().replace(',', '.')) : NaN;
+    const reviews = reviewsEl ? Number(reviewsEl.innerText.replace(/[^0-9]/g, '')) : NaN;
+
+    // Category is the first plain text span of the info lines, e.g. "Bakery"
+    let category = null;
+    for (const span of card.querySelectorAll('div.W4Efsd span')) {
+        const text = span.children.length ? '' : span.innerText.trim();
+        if (text && text !== '·' && !/^[\\d.,()]+$/.test(text)) {
+            category = text;
+            break;
+        }
+    }
+
+    return {
+        name: nameEl ? nameEl.innerText.trim() : null,
+        place_url: link ? link.getAttribute('href') : null,
+        rating: Number.isNaN(rating) ? null : rating,
+        review_count: Number.isNaN(reviews) ? 0 : reviews,
+        category: category,
+        has_website: !!website
+    };
+})
+"""
+
+# The place page title matches the expected name (same fuzzy rule as _names_match)
+NAME_MATCH_JS = """
+(expected) => {
+    const clean = (t) => t.toLowerCase().replace(/'/g, "").replace(/\\./g, "");
+    let text = "";
+    for (const selector of ['h1.DUwDvf', 'div.fontHeadlineSmall', 'h1']) {
+        const el = document.querySelector(selector);
+        text = el ? el.innerText.trim() : "";
+        if (text) break;
+    }
+    if (!text) return false;
+    const exp = clean(expected), curr = clean(text);
+    return exp.includes(curr) || curr.includes(exp);
+}
+"""
+
+# The detail panel has rendered text for at least one of address, rating or phone
+DETAILS_HYDRATED_JS = """
+() => {
+    const address = document.querySelector('button[data-item-id="address"] div.Io6YTe');
+    const rating = document.querySelector('div.fontDisplayLarge');
+    const phone = document.querySelector('button[data-item-id^="phone:tel:"]');
+    return !!((address && address.innerText.trim())
+        || (rating && rating.innerText.trim())
+        || (phone && phone.getAttribute('aria-label')));
+}
+"""
+
+
+# Reads every lead field from a place page in one round trip, resolving the
+# per-field selector fallbacks in the browser
+EXTRACT_DETAILS_JS = """
+(expectedName) => {
+    const q = (selector) => document.querySelector(selector);
+
+    // Address
+    let address = "N/A";
+    const addressBtn = q('button[data-item-id="address"]');
+    if (addressBtn) {
+        const addressText = addressBtn.querySelector('div.Io6YTe');
+        if (addressText) {
+            address = addressText.innerText;
+        } else {
+            const rawAddr = addressBtn.getAttribute('aria-label');
+            if (rawAddr) address = rawAddr.replace('Address:', '').trim();
+        }
+    }
+
+    // Website
+    const websiteBtn = q('a[data-item-id="authority"]') || q('a[aria-label*="Website"]');
+    const websiteUrl = websiteBtn ? websiteBtn.getAttribute('href') : null;
+
+    // Phone, falling back to a scan of the place's main panel text
+    let phone = null;
+    const phoneBtn = q('button[data-item-id^="phone:tel:"]');
+    if (phoneBtn) {
+        const label = phoneBtn.getAttribute('aria-label');
+        if (label) phone = label.replace('Phone:', '').trim();
+    }
+    if (!phone) {
+        const mains = Array.from(document.querySelectorAll('div[role="main"]'));
+        const label = (m) => m.getAttribute('aria-label') || '';
+        const main = (expectedName && mains.find(m => label(m).includes(expectedName)))
+            || mains.find(m => !label(m).includes('Search result'));
+        if (main) {
+            for (const line of main.innerText.split('\\n')) {
+                if (/\\d/.test(line) && line.length > 8 && (line.includes('+') || line.includes('-'))) {
+                    phone = line;
+                    break;
+                }
+            }
+        }
+    }
+
+    // Rating
+    let rating = null;
+    const ratingEl = q('div.jANrlb > div.fontDisplayLarge') || q('div.fontDisplayLarge');
+    if (ratingEl && ratingEl.innerText.trim()) {
+        const value = Number(ratingEl.innerText.trim());
+        rating = Number.isNaN(value) ? null : value;
+    }
+
+    // Reviews ("61 reviews", "1.2K reviews")
+    let reviews = 0;
+    const reviewsEl = q('button[jsaction*="reviewChart.moreReviews"] span');
+    if (reviewsEl) {
+        const reviewsStr = reviewsEl.innerText.split(' ')[0].replace(/,/g, '').toUpperCase();
+        let value = NaN;
+        if (reviewsStr.includes('K')) value = Number(reviewsStr.replace('K', '')) * 1000;
+        else if (reviewsStr.includes('M')) value = Number(reviewsStr.replace('M', '')) * 1000000;
+        else if (/^\\d+$/.test(reviewsStr)) value = Number(reviewsStr);
+        reviews = Number.isNaN(value) ? 0 : Math.trunc(value);
+    }
+
+    // If a "Claim this business" link exists, the profile is UNCLAIMED (High Value Lead)
+    const claimLink = q('a[aria-label*="Claim this business"]') || document.evaluate(
+        "//*[contains(text(), 'Claim this business')]", document, null,
+        XPathResult.FIRST_ORDERED_NODE_TYPE, null
+    ).singleNodeValue;
+
+    // Category usually appears right under the title, e.g., "Interior Designer"
+    const categoryBtn = q('button[jsaction*="category"]');
+
+    return {
+        category: categoryBtn ? categoryBtn.innerText : "N/A",
+        address: address,
+        rating: rating,
+        review_count: reviews,
+        is_claimed: !claimLink,
+        has_website: !!websiteBtn,
+        website_url: websiteUrl,
+        phone: phone
+    };
+}
+"""
+
+
+def new_scrape_stats() -> dict:
+    """
+    Counters filled in by a scrape run.
+    idle_seconds is time spent waiting on the page; idle_saved_seconds is how
+    much less that was than the fixed sleeps the waits replaced.
     """
-    Scrapes Google Maps for leads.
+    return {
+        "idle_seconds": 0.0,
+        "idle_saved_seconds": 0.0,
+        "waits": 0,
+        "wait_timeouts": 0,
+        "extract_count": 0,
+        "extract_seconds": 0.0,
+        "requests": 0,
+        "requests_blocked": 0,
+        "bytes_transferred": 0,
+        "cpu_seconds": 0.0,
+        "pages_metered": 0,
+        "feed_cards": 0,
+        "cards_seen": 0,
+        "cards_skipped_prefilter": 0,
+        "cards_skipped_known": 0,
+        "known_audited": 0,
+        "known_false_positives": 0,
+        "cards_repeated": 0,
+        "cards_shifted": 0,
+        "leads_saved": 0
+    }
+
+
+def merge_scrape_stats(into: dict, stats: dict) -> dict:
+    """Add the counters of one run's stats to another stats dict."""
+    for key, value in stats.items():
+        total = into.get(key, 0) + value
+        into[key] = round(total, 3) if isinstance(total, float) else total
+    return into
+
+
+def scrape_google_maps(
+    industry: str,
+    location: str,
+    total: int = -1,
+    stop_signal=None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    extraction_mode: str = ExtractionMode.DOM,
+    lean_mode: bool = False,
+    measure_resources: bool = False,
+    prefilter: dict = None,
+    skip_known: bool = False,
+    stats: dict = None,
+    viewport: dict = None,
+    seen_keys: set = None,
+    done_keys: set = None,
+    resume_depth: int = 0,
+    har_mode: str = None,
+    har_path: str = None
+):
+    """
+    Scrapes Google Maps for leads and returns how many new leads were saved.
+    Blocking wrapper around `scrape_google_maps_async` for use from worker threads.
+    Runs on the shared browser pool when it is started, otherwise on a private browser.
+    Use `iter_google_maps` to receive the leads as they are found.
     :param total: Number of leads to scrape. -1 for unlimited.
     :param stop_signal: A callable that returns True if the scraper should stop.
+    :param concurrency: Number of detail pages opened in parallel.
+    :param extraction_mode: "dom" opens every place page, "network" decodes the
+        Maps XHR payloads and only opens pages the payloads didn't cover.
+    :param lean_mode: Abort images, fonts, media, map tiles and photos.
+    :param measure_resources: Record bytes transferred and page CPU time in
+        `stats` (always on in lean mode, or with SCRAPER_MEASURE_RESOURCES).
+    :param prefilter: Fast path. Only cards passing these checks (see
+        `passes_prefilter`) get their place page opened. None opens every card.
+    :param skip_known: Skip cards of businesses already in the leads table
+        (see `app.services.known_leads`) instead of opening them.
+    :param stats: Optional dict from `new_scrape_stats()` updated in place.
+    :param viewport: Optional tile (see `app.services.tiling`). Searches just
+        the industry inside that map viewport instead of "industry in location".
+    :param seen_keys: Optional set of place keys shared between searches of
+        the same location; places already in it are not opened again.
+    :param done_keys: Optional set the keys of places are added to once they
+        are saved or skipped, so a checkpoint only records finished places.
+    :param resume_depth: Feed length a previous run of this search reached.
+        The feed keeps being scrolled back to it even though its cards are
+        all in `seen_keys` already.
+    :param har_mode: "record" saves the session's network traffic to `har_path`,
+        "replay" serves it back from `har_path` and aborts anything not in it.
+    :param har_path: HAR file (`.har`, or `.har.zip` to keep bodies as attachments).
+    """
+    coro = scrape_google_maps_async(
+        industry=industry,
+        location=location,
+        total=total,
+        stop_signal=stop_signal,
+        concurrency=concurrency,
+        extraction_mode=extraction_mode,
+        lean_mode=lean_mode,
+        measure_resources=measure_resources,
+        prefilter=prefilter,
+        skip_known=skip_known,
+        stats=stats,
+        viewport=viewport,
+        seen_keys=seen_keys,
+        done_keys=done_keys,
+        resume_depth=resume_depth,
+        har_mode=har_mode,
+        har_path=har_path
+    )
+    if browser_pool.running:
+        return browser_pool.run(coro)
+    return asyncio.run(coro)
+
+
+_END = object()
+
+
+def iter_google_maps(stop_signal=None, **kwargs):
+    """
+    Blocking iterator over `iter_google_maps_async` for use from worker
+    threads; takes the arguments of `scrape_google_maps`. Leads are handed
+    over through a bounded queue, so the scrape waits for a slow consumer
+    instead of buffering. Closing the iterator early stops the scrape.
     """
+    leads = queue.Queue(maxsize=LEAD_QUEUE_SIZE)
+    closed = threading.Event()
+    finished = threading.Event()
+    errors = []
+
+    def should_stop():
+        return closed.is_set() or bool(stop_signal and stop_signal())
+
+    def put(item):
+        # Give up once the consumer is gone instead of blocking on a full queue
+        while not closed.is_set():
+            try:
+                leads.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                pass
+
+    async def pump():
+        try:
+            async for lead in iter_google_maps_async(stop_signal=should_stop, **kwargs):
+                await asyncio.to_thread(put, lead)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            # Off the loop: a pooled loop serves other scrapes meanwhile
+            try:
+                await asyncio.to_thread(put, _END)
+            finally:
+                finished.set()
+
+    if browser_pool.running:
+        browser_pool.submit(pump())
+    else:
+        threading.Thread(target=asyncio.run, args=(pump(),), name="scraper", daemon=True).start()
+
+    try:
+        while (lead := leads.get()) is not _END:
+            yield lead
+    finally:
+        closed.set()
+        finished.wait()
+    if errors:
+        raise errors[0]
+
+
+# 🟢 FIX 1: Set Timezone to reduce "Near Me" bias (using Toronto/NY as generic NA)
+CONTEXT_OPTIONS = {
+    "locale": "en-US",
+    "timezone_id": "America/Toronto",
+    "permissions": [],  # Deny location permissions
+    "geolocation": None
+}
+
+
+@asynccontextmanager
+async def _browser_context(**options):
+    """Yield an isolated BrowserContext, from the shared pool when we run on its loop."""
+    options = {**CONTEXT_OPTIONS, **options}
+    if browser_pool.owns_current_loop():
+        async with browser_pool.context(**options) as context:
+            yield context
+        return
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        try:
+            context = await browser.new_context(**options)
+            try:
+                yield context
+            finally:
+                # A recorded HAR is only written when its context closes
+                await context.close()
+        finally:
+            await browser.close()
+
+
+def _har_options(har_mode: str, har_path: str) -> dict:
+    """Validate the HAR arguments and return the context options recording needs."""
+    if har_mode is None:
+        return {}
+    if har_mode not in (HAR_RECORD, HAR_REPLAY):
+        raise ValueError(f"Unknown HAR mode: {har_mode}")
+    if not har_path:
+        raise ValueError(f"HAR mode '{har_mode}' needs a har_path")
+    if har_mode == HAR_REPLAY:
+        if not os.path.exists(har_path):
+            raise FileNotFoundError(f"No HAR recording at {har_path}")
+        return {}
+
+    os.makedirs(os.path.dirname(os.path.abspath(har_path)), exist_ok=True)
+    return {
+        "record_har_path": har_path,
+        "record_har_content": "attach" if har_path.endswith(".zip") else "embed",
+    }
+
+
+async def scrape_google_maps_async(
+    industry: str,
+    location: str,
+    total: int = -1,
+    stop_signal=None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    extraction_mode: str = ExtractionMode.DOM,
+    lean_mode: bool = False,
+    measure_resources: bool = False,
+    prefilter: dict = None,
+    skip_known: bool = False,
+    stats: dict = None,
+    viewport: dict = None,
+    seen_keys: set = None,
+    done_keys: set = None,
+    resume_depth: int = 0,
+    har_mode: str = None,
+    har_path: str = None
+):
+    """
+    Scrapes Google Maps for leads using the async Playwright API and returns
+    how many new leads were saved. See `iter_google_maps_async`.
+    """
+    new_leads = 0
+    async for lead in iter_google_maps_async(
+        industry=industry,
+        location=location,
+        total=total,
+        stop_signal=stop_signal,
+        concurrency=concurrency,
+        extraction_mode=extraction_mode,
+        lean_mode=lean_mode,
+        measure_resources=measure_resources,
+        prefilter=prefilter,
+        skip_known=skip_known,
+        stats=stats,
+        viewport=viewport,
+        seen_keys=seen_keys,
+        done_keys=done_keys,
+        resume_depth=resume_depth,
+        har_mode=har_mode,
+        har_path=har_path
+    ):
+        new_leads += lead["is_new"]
+    return new_leads
+
+
+def default_sink():
+    """Queue leads on the lead writer when it runs, else insert them one by one."""
+    return lead_writer.submit if lead_writer.running else insert_lead
+
+
+async def iter_google_maps_async(
+    industry: str,
+    location: str,
+    total: int = -1,
+    stop_signal=None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    extraction_mode: str = ExtractionMode.DOM,
+    lean_mode: bool = False,
+    measure_resources: bool = False,
+    prefilter: dict = None,
+    skip_known: bool = False,
+    stats: dict = None,
+    viewport: dict = None,
+    seen_keys: set = None,
+    done_keys: set = None,
+    resume_depth: int = 0,
+    har_mode: str = None,
+    har_path: str = None,
+    sink=None
+):
+    """
+    Scrapes Google Maps and yields each lead as soon as it is verified.
+
+    Every lead is first passed to `sink` (default `default_sink()`), which
+    returns True if the lead is new, or a Future of that; only new leads
+    count towards `total`.
+    Yielded records carry `is_new`, and businesses skipped as already known
+    are yielded with `known` set and only the card's fields. Nothing is
+    accumulated: the scrape waits while `LEAD_QUEUE_SIZE` leads are waiting
+    on the consumer, and closing the iterator early stops it.
+    """
+    leads = asyncio.Queue(maxsize=LEAD_QUEUE_SIZE)
+    closing = False
+
+    async def produce():
+        try:
+            await _scrape_google_maps(
+                industry=industry,
+                location=location,
+                total=total,
+                stop_signal=stop_signal,
+                concurrency=concurrency,
+                extraction_mode=extraction_mode,
+                lean_mode=lean_mode,
+                measure_resources=measure_resources,
+                prefilter=prefilter,
+                skip_known=skip_known,
+                stats=stats,
+                viewport=viewport,
+                seen_keys=seen_keys,
+                done_keys=done_keys,
+                resume_depth=resume_depth,
+                har_mode=har_mode,
+                har_path=har_path,
+                sink=sink or default_sink(),
+                emit=leads.put
+            )
+        finally:
+            if not closing:
+                await leads.put(_END)
+
+    task = asyncio.create_task(produce())
+    try:
+        while (lead := await leads.get()) is not _END:
+            yield lead
+        # Re-raise anything the scrape raised
+        await task
+    finally:
+        if not task.done():
+            closing = True
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+
+async def _scrape_google_maps(
+    industry: str,
+    location: str,
+    total: int = -1,
+    stop_signal=None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    extraction_mode: str = ExtractionMode.DOM,
+    lean_mode: bool = False,
+    measure_resources: bool = False,
+    prefilter: dict = None,
+    skip_known: bool = False,
+    stats: dict = None,
+    viewport: dict = None,
+    seen_keys: set = None,
+    done_keys: set = None,
+    resume_depth: int = 0,
+    har_mode: str = None,
+    har_path: str = None,
+    sink=None,
+    emit=None
+):
+    """
+    Scrapes Google Maps for leads using the async Playwright API, passing
+    each lead to `sink` and then `emit`.
+
+    The results feed is scrolled on one page while the place links it yields
+    are opened in a bounded set of `concurrency` detail pages (tabs) sharing
+    the same browser context.
+
+    In network mode the search/place XHR responses the feed page already
+    fetches are decoded instead, so cards covered by a payload need no page
+    visit at all. Cards the payloads miss fall back to the detail page path.
+
+    Lean mode routes the context so only the requests extraction needs are
+    made. Bytes transferred and per-page CPU time are recorded in `stats` in
+    lean mode or when measuring; metering costs an extra round trip per
+    request and a CDP session per page, so plain runs skip it.
+
+    With a `prefilter` (fast path) cards are screened on the fields the feed
+    already shows, so businesses that already have a website are never opened.
+    With `skip_known`, cards of businesses already in the leads table are
+    not opened either; they are emitted as `known` leads instead.
+
+    With a `viewport` the search covers one tile of a tiled location, and a
+    `seen_keys` set shared by the tiles skips places overlapping tiles found.
+
+    A resumed search starts with the finished places of the interrupted run
+    in `seen_keys` and scrolls down to its `resume_depth` without opening
+    them again. Places are added to `done_keys` as they are finished.
+
+    `har_mode` records the run's traffic to `har_path`, or replays a recording
+    through Playwright routing so the run needs no network and is repeatable.
+    """
+    har_context_options = _har_options(har_mode, har_path)
+    network_mode = extraction_mode == ExtractionMode.NETWORK
     search_query = f"{industry} in {location}"
-    print(f"🚀 [Sync] Searching: {search_query}...")
-    
-    results = []
-    
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        
-        # 🟢 FIX 1: Set Timezone to reduce "Near Me" bias (using Toronto/NY as generic NA)
-        context = browser.new_context(
-            locale="en-US",
-            timezone_id="America/Toronto",
-            permissions=[],  # Deny location permissions
-            geolocation=None
-        )
-        page = context.new_page()
+    if viewport:
+        search_query = f"{search_query} [{tile_label(viewport)}]"
+    print(f"🚀 [Async x{concurrency}, {ExtractionMode(extraction_mode).value}{', lean' if lean_mode else ''}{', har ' + har_mode if har_mode else ''}] Searching: {search_query}...")
+
+    if stats is None:
+        stats = new_scrape_stats()
+
+    valid_leads_count = 0
+    from_payload_count = 0
+    from_page_count = 0
+
+    # Place records decoded from network responses, keyed by feature id
+    places_by_feature_id = {}
+
+    # Known cards opened anyway to measure false positives of the known-lead check
+    audited_keys = set()
+    if skip_known:
+        await asyncio.to_thread(known_leads.refresh)
+
+    def should_stop():
+        if stop_signal and stop_signal():
+            return True
+        return total != -1 and valid_leads_count >= total
+
+    def mark_done(key: str):
+        if done_keys is not None:
+            done_keys.add(key)
+
+    # Leads being written right now. Each holds one of the slots left under
+    # the limit, so concurrent detail pages can't save past `total`.
+    saving = 0
+    slots = asyncio.Condition()
+
+    async def reserve_slot() -> bool:
+        """Wait for a slot under the limit. False once the scrape should stop."""
+        nonlocal saving
+        async with slots:
+            await slots.wait_for(lambda: should_stop() or total == -1 or valid_leads_count + saving < total)
+            if should_stop():
+                return False
+            saving += 1
+            return True
+
+    async def save_lead(key: str, name: str, details: dict):
+        """Persist one verified lead and count it towards the limit if it is new."""
+        nonlocal valid_leads_count, saving
+
+        if not await reserve_slot():
+            return
+
+        print(f"      ✅ Found: {name} | ⭐ {details['rating']} ({details['review_count']}) | Claimed: {details['is_claimed']}")
+
+        lead_data = {
+            **details,
+            "business_name": name,
+            "industry": industry,
+            "location": location,
+            "place_id": key
+        }
+
+        try:
+            # --- INSERT TO DB (off the event loop so other tabs keep working) ---
+            is_new = await asyncio.to_thread(sink, lead_data)
+            if isinstance(is_new, concurrent.futures.Future):
+                # Queued on the lead writer; wait for its batch to be written
+                is_new = await asyncio.wrap_future(is_new)
+
+            if is_new:
+                print(f"      ✅ Saved: {name} | {details['address'][:20]}...")
+                valid_leads_count += 1
+                stats["leads_saved"] += 1
+                if key in audited_keys:
+                    stats["known_false_positives"] += 1
+        finally:
+            # A duplicate hands its slot to the next lead waiting for one
+            async with slots:
+                saving -= 1
+                slots.notify_all()
+
+        if skip_known:
+            known_leads.add(key, name, location)
+        mark_done(key)
+        await emit({**lead_data, "is_new": is_new})
+
+    async def process_place(detail_pages: asyncio.Queue, key: str, expected_name: str, place_url: str):
+        """Open one place in a free detail page, verify its name, extract and save it."""
+        nonlocal from_page_count
+
+        if should_stop():
+            return
+
+        detail_page = await detail_pages.get()
+        try:
+            name = await _open_place(detail_page, expected_name, place_url, stats)
+            if not name:
+                return
+
+            if should_stop():
+                return
+
+            details = await _extract_details(detail_page, expected_name, stats)
+            from_page_count += 1
+        except Exception as e:
+            print(f"      ❌ Failed item '{expected_name}': {e}")
+            return
+        finally:
+            detail_pages.put_nowait(detail_page)
+
+        # The page already serves the next place while the lead is written
+        try:
+            await save_lead(key, name, details)
+        except Exception as e:
+            print(f"      ❌ Failed item '{expected_name}': {e}")
+
+    async def process_payload_place(key: str, expected_name: str, place: dict):
+        """Save a lead straight from a decoded payload record, no page visit."""
+        nonlocal from_payload_count
+
+        if should_stop():
+            return
+
+        try:
+            from_payload_count += 1
+            await save_lead(key, place["business_name"], place)
+        except Exception as e:
+            print(f"      ❌ Failed item '{expected_name}': {e}")
+
+    async def capture_payload(response):
+        """Decode place records from the search/place XHRs the feed page makes."""
+        if not is_payload_url(response.url):
+            return
+        try:
+            body = await response.text()
+        except Exception:
+            return
+        for place in decode_places(body):
+            places_by_feature_id[place["feature_id"]] = place
+
+    async with _browser_context(**har_context_options) as context:
+        if har_mode == HAR_REPLAY:
+            # Requests missing from the recording fail instead of reaching the network
+            await context.route_from_har(har_path, not_found="abort")
+            print(f"📼 Replaying {har_path}")
+        elif lean_mode:
+            await install_lean_routing(context, stats)
+        cpu_meter = None
+        if lean_mode or measure_resources or settings.scraper_measure_resources:
+            track_transfer(context, stats)
+            cpu_meter = PageCpuMeter(context)
+
+        page = await context.new_page()
+        if cpu_meter:
+            await cpu_meter.watch(page)
+        if network_mode:
+            page.on("response", capture_payload)
 
         try:
             # 🟢 FIX: Go directly to the search URL to bypass "Near Me" autocomplete bias
             # This forces Google to search exactly what we want (e.g., "Bakery in USA")
-            encoded_query = search_query.replace(" ", "+")
-            search_url = f"https://www.google.com/maps/search/{encoded_query}?hl=en"
-            
+            if viewport:
+                # The viewport pins the area; naming the city would re-center the map
+                search_url = tile_search_url(industry, viewport)
+            else:
+                encoded_query = search_query.replace(" ", "+")
+                search_url = f"{settings.maps_base_url}/maps/search/{encoded_query}?hl=en"
+
             print(f"🌍 Navigating directly to: {search_url}")
-            page.goto(search_url, timeout=60000)
+            await page.goto(search_url, timeout=60000)
 
             # Handle Cookies (Sometimes they appear on search results page too)
             try:
-                page.wait_for_selector("button[aria-label='Accept all']", timeout=3000)
-                page.click("button[aria-label='Accept all']")
+                await page.wait_for_selector("button[aria-label='Accept all']", timeout=3000)
+                await page.click("button[aria-label='Accept all']")
             except:
                 pass
 
-            # We skipped the typing part, so we go straight to waiting for results
-            
             # Wait for results feed
             try:
-                page.wait_for_selector('div[role="feed"]', timeout=15000)
+                await page.wait_for_selector('div[role="feed"]', timeout=15000)
             except:
                 print("⚠️ Could not find feed. Search might have failed or zero results.")
-                return results
+                return
+
+            # The first page of results is inlined in the document, not fetched by XHR
+            if network_mode:
+                try:
+                    initial_state = await page.evaluate("() => JSON.stringify(window.APP_INITIALIZATION_STATE || null)")
+                    for place in decode_places(initial_state or ""):
+                        places_by_feature_id[place["feature_id"]] = place
+                except Exception as e:
+                    print(f"⚠️ Could not decode initial state: {e}")
+
+            # Detail pages share the context (and its cookies) with the feed page
+            detail_pages = asyncio.Queue()
+            for _ in range(concurrency):
+                detail_page = await context.new_page()
+                if cpu_meter:
+                    await cpu_meter.watch(detail_page)
+                detail_pages.put_nowait(detail_page)
 
             # Initial scroll to load some data
             print("📜 Initial Scroll...")
-            page.hover('div[role="feed"]')
-            page.mouse.wheel(0, 2000)
-            page.wait_for_timeout(2000)
-
-            print("🔍 Clicking & Verifying...")
-            
-            valid_leads_count = 0
-            processed_indices = set()
+            initial_count = len(await page.query_selector_all('div[role="article"]'))
+            await page.hover('div[role="feed"]')
+            await page.mouse.wheel(0, 2000)
+            await _waited(
+                stats,
+                _wait_for(page, FEED_GROWTH_JS, initial_count, timeout_ms=settings.scraper_initial_scroll_timeout_ms),
+                fixed_seconds=2
+            )
+
+            print("🔍 Opening & Verifying...")
+
+            # Cards are tracked by place id, not by their position in the feed
+            if seen_keys is None:
+                seen_keys = set()
+            positional_seen = 0
             consecutive_no_new_leads = 0
-            
+
             # Infinite scrolling loop for "Unlimited" mode
             while True:
                 # Check Global Stop Signal
@@ -72,359 +837,110 @@ def scrape_google_maps(industry: str, location: str, total: int = -1, stop_signa
                 # Stop if we hit the limit (and limit is not -1)
                 if total != -1 and valid_leads_count >= total:
                     break
-                
+
                 # Check for "End of list" message (Class based)
-                if page.query_selector("div.HlvSq"):
+                if await page.query_selector("div.HlvSq"):
                     print("🏁 Reached end of the list (Marker Found).")
                     break
-                
+
                 # Check for "End of list" message (Text based - More reliable)
                 try:
-                    # check if the element is visible without throwing error if not found immediately
-                    if page.get_by_text("You've reached the end of the list").is_visible():
+                    if await page.get_by_text("You've reached the end of the list").is_visible():
                         print("🏁 Reached end of the list (Text Detected).")
                         break
                 except:
                     pass
 
-                listings = page.query_selector_all('div[role="article"]')
-                
-                # Check if we have processed everything visible
-                if len(listings) == len(processed_indices):
+                # One round trip reads every card in the feed
+                listings = await page.evaluate(READ_CARDS_JS)
+                stats["feed_cards"] = max(stats["feed_cards"], len(listings))
+                new_cards = select_new_cards(listings, seen_keys, positional_seen, stats)
+                positional_seen = max(positional_seen, len(listings))
+
+                # Everything visible has been processed
+                if not new_cards:
+                    consecutive_no_new_leads += 1
+                    if consecutive_no_new_leads > 3:
+                        print("⚠️ No new items loading after 3 scrolls. Ending.")
+                        break
+
                     # No new items loaded yet, scroll more
                     print("📜 Scrolling for more...")
-                    page.hover('div[role="feed"]')
-                    page.mouse.wheel(0, 3000)
-                    page.wait_for_timeout(5000) # Give it time to load (Increased to 5s)
-                    
-                    # If count didn't change after scroll, maybe we are stuck or at end
-                    new_listings_count = len(page.query_selector_all('div[role="article"]'))
-                    if new_listings_count == len(listings):
-                        consecutive_no_new_leads += 1
-                        if consecutive_no_new_leads > 3:
-                            print("⚠️ No new items loading after 3 scrolls. Ending.")
-                            break
-                    else:
+                    await page.hover('div[role="feed"]')
+                    await page.mouse.wheel(0, 3000)
+
+                    # Wait for the feed to change instead of sleeping a fixed 5s
+                    last_url = listings[-1]["place_url"] if listings else None
+                    changed = await _waited(
+                        stats,
+                        _wait_for(page, FEED_CHANGED_JS, [len(listings), last_url], timeout_ms=settings.scraper_scroll_timeout_ms),
+                        fixed_seconds=5
+                    )
+
+                    # Scrolling back down to where an interrupted run stopped
+                    if changed and len(listings) < resume_depth:
                         consecutive_no_new_leads = 0
-                        # --- FIX: Give new items time to 'hydrate' after scroll ---
-                        print("... letting new items settle (15s)...")
-                        page.wait_for_timeout(15000) # Increased to 15s per user request for reliability 
+
+                    if changed:
+                        # --- Give new items time to 'hydrate': until every card has a name and link ---
+                        await _waited(
+                            stats,
+                            _wait_for(page, FEED_HYDRATED_JS, timeout_ms=settings.scraper_hydration_timeout_ms),
+                            fixed_seconds=15
+                        )
                     continue
 
-                # Process new items only
-                for i, card in enumerate(listings):
-                    if i in processed_indices:
+                consecutive_no_new_leads = 0
+
+                # Collect the place links of new cards, then fan them out to the detail pages
+                batch = []
+                payload_batch = []
+                for key, card in new_cards:
+                    stats["cards_seen"] += 1
+
+                    expected_name = card["name"]
+                    place_url = card["place_url"]
+
+                    # Fast path: the card already tells us whether this is a candidate
+                    if prefilter is not None and not passes_prefilter(card, prefilter):
+                        stats["cards_skipped_prefilter"] += 1
+                        mark_done(key)
                         continue
-                    
-                    processed_indices.add(i)
 
-                    if stop_signal and stop_signal():
-                        break
-                    
-                    if total != -1 and valid_leads_count >= total:
-                        break
+                    # Already stored: opening it would only end in a duplicate insert
+                    if skip_known and known_leads.contains(key, expected_name, location):
+                        if random.random() >= settings.known_leads_audit_rate:
+                            stats["cards_skipped_known"] += 1
+                            mark_done(key)
+                            await emit({
+                                "business_name": expected_name,
+                                "industry": industry,
+                                "location": location,
+                                "place_id": key,
+                                "is_new": False,
+                                "known": True
+                            })
+                            continue
+                        audited_keys.add(key)
+                        stats["known_audited"] += 1
 
-                    try:
-                        # --- SLOW AND STEADY APPROACH ---
-                        
-                        # 1. Get the expected name from the card itself before clicking
-                        expected_name_el = card.query_selector('div.qBF1Pd')
-                        expected_name = expected_name_el.inner_text().strip() if expected_name_el else None
-                        
-                        if not expected_name:
-                            print("      ⚠️ Could not find name on card. Skipping.")
+                    # Network mode: use the decoded record when it matches the card
+                    if network_mode:
+                        place = places_by_feature_id.get(key)
+                        if place and place["business_name"] and _names_match(expected_name, place["business_name"]):
+                            payload_batch.append((key, expected_name, place))
                             continue
 
-                        # 2. Smart Click & Verify
-                        # Sometimes a click doesn't "take" (missed click, UI shift). 
-                        # We retry the click if the name doesn't appear.
-                        
-                        max_click_attempts = 10 # Increased to 10 per user request
-                        click_success = False
-                        
-                        for attempt in range(max_click_attempts):
-                            try:
-                                card.scroll_into_view_if_needed()
-                                if attempt > 0:
-                                    print(f"      🔄 Retry click attempt {attempt+1} for '{expected_name}'...")
-                                    page.wait_for_timeout(1000)
-                                else:
-                                    page.wait_for_timeout(500)
-                                
-                                card.click(force=True)
-                                print(f"  ... Clicked '{expected_name}' (Attempt {attempt+1}), verifying...")
-
-                                # Short wait to see if it worked
-                                quick_check_start = time.time()
-                                matched = False
-                                while time.time() - quick_check_start < 3: # 3s quick check
-                                    # Check for Global H1 match
-                                    name_el = page.query_selector('h1.DUwDvf')
-                                    curr = name_el.inner_text() if name_el else ""
-                                    
-                                    if not curr:
-                                         div_el = page.query_selector('div.fontHeadlineSmall')
-                                         curr = div_el.inner_text() if div_el else ""
-                                    
-                                    if expected_name.lower().replace("'", "") in curr.lower().replace("'", ""):
-                                        matched = True
-                                        break
-                                    page.wait_for_timeout(500)
-                                
-                                if matched:
-                                    click_success = True
-                                    break
-                                # If not matched, loop continues -> clicks again
-                                
-                            except Exception as e:
-                                print(f"      ⚠️ Click error: {e}")
-                        
-                        if not click_success:
-                             print(f"      ❌ Failed to open details for '{expected_name}' after {max_click_attempts} clicks. Skipping.")
-                             continue
-                             
-                        
-                        print(f"      ✅ Details loaded for '{expected_name}'. Scraping...")
-                        
-                        # --- ENHANCED RELIABILITY: Wait for Name Sync ---
-                        # We must ensure the Detail Panel matches the Clicked Item.
-                        
-                        found_name = False
-                        name = "Unknown"
-                        
-                        try:
-                            # Retry loop: Wait for valid Name to appear
-                            start_time = time.time()
-                            while time.time() - start_time < 10: # Wait up to 10 seconds for the CORRECT name
-                                # 1. Try Global H1
-                                name_el = page.query_selector('h1.DUwDvf')
-                                current_text = ""
-                                if name_el:
-                                    current_text = name_el.inner_text().strip()
-                                
-                                # 2. Fallback: Title Div
-                                if not current_text:
-                                    name_div = page.query_selector('div.fontHeadlineSmall')
-                                    if name_div:
-                                         current_text = name_div.inner_text().strip()
-                                
-                                # 3. Fallback: Main H1
-                                if not current_text:
-                                    main_h1 = page.query_selector('h1')
-                                    if main_h1:
-                                        current_text = main_h1.inner_text().strip()
-
-                                # CHECK MATCH
-                                if current_text:
-                                    # Fuzzy match: check if expected name is roughly in current text or vice versa
-                                    exp_clean = expected_name.lower().replace("'", "").replace(".", "")
-                                    curr_clean = current_text.lower().replace("'", "").replace(".", "")
-                                    
-                                    if exp_clean in curr_clean or curr_clean in exp_clean:
-                                        name = current_text
-                                        found_name = True
-                                        break
-                                
-                                page.wait_for_timeout(1000)
-                            
-                        except Exception as e:
-                            # If browser is closed, re-raise to exit the main loop safely
-                            if "closed" in str(e) or "Target page" in str(e):
-                                raise e 
-                            print(f"      ⚠️ Error waiting for name sync: {e}")
-
-                        if not found_name:
-                            print(f"      ❌ Name Mismatch/Timeout. Scraper saw '{name}' but expected '{expected_name}'. Skipping to ensure quality.")
-                            # Close panel if possible and continue
-                            try:
-                                close_btn = page.query_selector('button[aria-label="Close"]')
-                                if close_btn: close_btn.click()
-                            except: pass
-                            continue # SKIP THIS ITEM to avoid saving false data
-                            
-                        # 3. After waiting for NAME, ensure other DETAILS are loaded (Address/Rating)
-                        # This fixes the "First Item Empty" issue where name loads but details lag behind.
-                        try:
-                            page.wait_for_selector(
-                                'button[data-item-id="address"], div.fontDisplayLarge, button[data-item-id^="phone:tel:"]', 
-                                timeout=5000
-                            )
-                            # Small buffer strictly for rendering
-                            page.wait_for_timeout(1000) 
-                        except:
-                            # It's possible some legit businesses don't have address/phone/rating.
-                            # We just proceed if the NAME was verified.
-                            pass
-                        panel_selector = 'div.m6QErb'
-                        panel = page.query_selector(panel_selector)
-                        
-                        # Fallback: if popup not found, check if main panel updated
-                        if not panel:
-                             main_h1 = page.query_selector('h1.DUwDvf')
-                             if main_h1 and expected_name in main_h1.inner_text():
-                                 print("      ... Using main page as panel.")
-                                 panel = page
-                             else:
-                                 print(f"      ⚠️ Panel not found for '{expected_name}' after wait. Skipping.")
-                                 continue
-                        
-                        # --- SCRAPE DETAILS (Name is already found above) ---
-                        # We use 'name' from the sync block above.
-
-                        # Get Address
-                        address = "N/A"
-                        # Use page instead of panel to avoid scoping issues with wrong m6QErb container
-                        address_btn = page.query_selector('button[data-item-id="address"]')
-                        if address_btn:
-                            address_text_div = address_btn.query_selector('div.Io6YTe')
-                            if address_text_div:
-                                address = address_text_div.inner_text()
-                            else:
-                                raw_addr = address_btn.get_attribute("aria-label")
-                                if raw_addr: address = raw_addr.replace("Address:", "").strip()
-
-                        # Get Website
-                        website_btn = page.query_selector('a[data-item-id="authority"]')
-                        if not website_btn:
-                            website_btn = page.query_selector('a[aria-label*="Website"]')
-                        has_website = True if website_btn else False
-                        website_url = website_btn.get_attribute("href") if website_btn else None
-
-                        # Get Phone
-                        phone = None
-                        phone_btn = page.query_selector('button[data-item-id^="phone:tel:"]')
-                        if phone_btn:
-                            phone = phone_btn.get_attribute("aria-label")
-                            if phone: phone = phone.replace("Phone:", "").strip()
-                        if not phone:
-                            # Fallback scan of main text (still needs a valid container, try page locator?)
-                            # This specific fallback is risky globally. Let's try a specific role=main if possible.
-                            main_element = page.query_selector('div[role="main"][aria-label*="' + (expected_name or "") + '"]')
-                            if not main_element:
-                                 # Fallback: Just look for any div[role="main"] that IS NOT the feed
-                                 mains = page.query_selector_all('div[role="main"]')
-                                 for m in mains:
-                                     if "Search result" not in (m.get_attribute("aria-label") or ""):
-                                         main_element = m
-                                         break
-                            
-                            if main_element:
-                                main_content = main_element.inner_text()
-                                for line in main_content.split('\n'):
-                                    if any(c.isdigit() for c in line) and len(line) > 8 and ("+" in line or "-" in line):
-                                        phone = line
-                                        break
-                        # --- 5. NEW: Reviews & Rating ---
-                        rating = None
-                        reviews = 0
-
-                        # --- RATING ---
-                        # Try selector for detailed review summary block
-                        rating_el = page.query_selector('div.jANrlb > div.fontDisplayLarge')
-                        if not rating_el:
-                             rating_el = page.query_selector('div.fontDisplayLarge')
-                        
-                        if rating_el:
-                            try:
-                                rating = float(rating_el.inner_text())
-                            except (ValueError, TypeError):
-                                rating = None # Explicitly set to None on failure
-                        
-                        # --- REVIEWS ---
-                        # Try selector for detailed review summary block
-                        reviews_el = page.query_selector('button[jsaction*="reviewChart.moreReviews"] span')
-                        if reviews_el:
-                            try:
-                                reviews_text = reviews_el.inner_text() # "61 reviews"
-                                reviews_str = reviews_text.split(" ")[0].replace(",", "")
-                                if 'K' in reviews_str.upper():
-                                    reviews = int(float(reviews_str.upper().replace('K', '')) * 1000)
-                                elif 'M' in reviews_str.upper():
-                                    reviews = int(float(reviews_str.upper().replace('M', '')) * 1000000)
-                                else:
-                                    reviews = int(reviews_str)
-                            except (ValueError, IndexError):
-                                reviews = 0
-                        
-                        # --- 6. NEW: "Claim this Business" Status ---
-                        # If this link exists, the profile is UNCLAIMED (High Value Lead)
-                        is_claimed = True
-                        # Look for the specific "Claim this business" text or link
-                        claim_btn = page.query_selector('a[aria-label*="Claim this business"]')
-                        if not claim_btn:
-                            claim_text_el = page.query_selector("text=Claim this business")
-                            if claim_text_el: is_claimed = False # Button exists, so it's NOT claimed
-                        else:
-                            is_claimed = False # Button found
-
-                        # --- 7. NEW: Business Category ---
-                        # Usually appears right under the title, e.g., "Interior Designer"
-                        category = "N/A"
-                        # It's usually the button with the specific class for category
-                        cat_btn = page.query_selector('button[jsaction*="category"]')
-                        if cat_btn:
-                            category = cat_btn.inner_text()
-
-                        # -----------------------------------
-
-                        print(f"      ✅ Found: {name} | ⭐ {rating} ({reviews}) | Claimed: {is_claimed}")
-
-                        results.append({
-                            "business_name": name,
-                            "industry": industry,
-                            "category": category,      # NEW
-                            "location": location,
-                            "address": address,
-                            "rating": rating,          # NEW
-                            "review_count": reviews,   # NEW
-                            "is_claimed": is_claimed,  # NEW
-                            "has_website": has_website,
-                            "website_url": website_url,
-                            "phone": phone
-                        })
-
-                        lead_data = {
-                            "business_name": name,
-                            "industry": industry,
-                            "location": location,
-                            "address": address,
-                            "has_website": has_website,
-                            "website_url": website_url,
-                            "phone": phone,
-                            "rating": rating,          # NEW
-                            "review_count": reviews,   # NEW
-                            "is_claimed": is_claimed,  # NEW
-                            "category": category       # NEW
-                        }
-                        
-                        # --- INSERT TO DB ---
-                        is_new = insert_lead(lead_data)
-                        
-                        if is_new:
-                            print(f"      ✅ Saved: {name} | {address[:20]}...")
-                            results.append(lead_data)
-                            valid_leads_count += 1
-                        else:
-                            # print(f"      Duplicate skipped: {name}")
-                            pass
-
-                        # --- NEW: Close the pop-up if it was used ---
-                        if panel != page: # Only close if we used the pop-up panel
-                            try:
-                                close_button = panel.query_selector('button[aria-label="Close"]')
-                                if close_button:
-                                    close_button.click()
-                                    page.wait_for_timeout(500) # Give it a moment to close
-                                    # Optional: Wait for the panel to be hidden/removed
-                                    # panel.wait_for_selector_state("detached", timeout=2000)
-                            except Exception as close_e:
-                                print(f"      ⚠️ Failed to close pop-up: {close_e}")
-                                # Don't re-raise, continue with next item
-
-                    except Exception as e:
-                        print(f"      ❌ Failed item: {e}")
-                        continue
-                
+                    batch.append((key, expected_name, place_url))
+
+                for key, expected_name, place in payload_batch:
+                    await process_payload_place(key, expected_name, place)
+
+                await asyncio.gather(*(
+                    process_place(detail_pages, key, expected_name, place_url)
+                    for key, expected_name, place_url in batch
+                ))
+
                 # Check constraints
                 if total != -1 and valid_leads_count >= total:
                     break
@@ -432,6 +948,186 @@ def scrape_google_maps(industry: str, location: str, total: int = -1, stop_signa
         except Exception as e:
             print(f"❌ Critical Error: {e}")
         finally:
-            browser.close()
-            
-    return results
\ No newline at end of file
+            if cpu_meter:
+                await cpu_meter.collect(stats)
+
+    if har_mode == HAR_RECORD:
+        print(f"📼 Recorded traffic to {har_path}")
+    if network_mode:
+        print(f"📦 {from_payload_count} leads decoded from network payloads, {from_page_count} from place pages.")
+    print(f"⏱️ Idle {stats['idle_seconds']:.1f}s waiting on the page ({stats['idle_saved_seconds']:.1f}s saved vs fixed sleeps).")
+    if stats["extract_count"]:
+        print(f"⏱️ Extraction {stats['extract_seconds'] / stats['extract_count'] * 1000:.1f}ms per lead over {stats['extract_count']} place pages.")
+    if stats["cards_repeated"] or stats["cards_shifted"]:
+        print(f"🔁 Feed reordered: {stats['cards_repeated']} repeated cards not re-opened, {stats['cards_shifted']} shifted cards not missed.")
+    if skip_known:
+        report = known_leads_report(stats)
+        print(f"🧠 Skipped {report['skipped']} known businesses; {report['false_positives']} of {report['audited']} audited were new.")
+    if prefilter is not None:
+        print(f"⚡ Fast path skipped {stats['cards_skipped_prefilter']} of {stats['cards_seen']} cards without opening them.")
+    if cpu_meter:
+        print(f"📶 {stats['bytes_transferred'] / 1_000_000:.1f}MB over {stats['requests']} requests ({stats['requests_blocked']} blocked), {stats['cpu_seconds']:.1f}s page CPU.")
+
+
+async def _wait_for(page, expression: str, arg=None, timeout_ms: int = 5000) -> bool:
+    """Wait until a JS condition holds. Returns False on timeout instead of raising."""
+    try:
+        await page.wait_for_function(expression, arg=arg, timeout=timeout_ms)
+        return True
+    except PlaywrightTimeoutError:
+        return False
+
+
+async def _waited(stats: dict, waiter, fixed_seconds: float = 0):
+    """Await a wait, charging its duration to the run's idle time."""
+    start = time.perf_counter()
+    result = None
+    try:
+        result = await waiter
+        return result
+    finally:
+        elapsed = time.perf_counter() - start
+        stats["waits"] += 1
+        if result is False:
+            stats["wait_timeouts"] += 1
+        stats["idle_seconds"] = round(stats["idle_seconds"] + elapsed, 3)
+        stats["idle_saved_seconds"] = round(stats["idle_saved_seconds"] + max(0.0, fixed_seconds - elapsed), 3)
+
+
+def select_new_cards(listings: list, seen_keys: set, positional_seen: int, stats: dict) -> list:
+    """
+    Pick the cards not processed yet, keyed by `place_key` of their link.
+    Marks them in `seen_keys` and returns `(key, card)` pairs.
+
+    Cards still hydrating (no name or link) are left for a later read.
+    `positional_seen` is how many feed positions index-based tracking would
+    have consumed; cards it would have re-opened or skipped are counted as
+    `cards_repeated` / `cards_shifted`.
+    """
+    new_cards = []
+    for i, card in enumerate(listings):
+        key = place_key(card.get("place_url"))
+        if not key or not card.get("name"):
+            continue
+
+        by_position = i >= positional_seen
+        if key in seen_keys:
+            if by_position:
+                stats["cards_repeated"] += 1
+            continue
+
+        if not by_position:
+            stats["cards_shifted"] += 1
+        seen_keys.add(key)
+        new_cards.append((key, card))
+    return new_cards
+
+
+def passes_prefilter(card: dict, prefilter: dict) -> bool:
+    """Check a feed card against the fast-path prefilter before opening its place page."""
+    if prefilter.get("skip_with_website") and card.get("has_website"):
+        return False
+
+    reviews = card.get("review_count") or 0
+    if reviews < prefilter.get("min_reviews", 0):
+        return False
+    max_reviews = prefilter.get("max_reviews")
+    if max_reviews is not None and reviews > max_reviews:
+        return False
+
+    min_rating = prefilter.get("min_rating")
+    if min_rating is not None and (card.get("rating") is None or card["rating"] < min_rating):
+        return False
+
+    return True
+
+
+async def _read_detail_name(page) -> str:
+    """Read the business name currently shown on a place page."""
+    # 1. Try Global H1
+    name_el = await page.query_selector('h1.DUwDvf')
+    if name_el:
+        current_text = (await name_el.inner_text()).strip()
+        if current_text:
+            return current_text
+
+    # 2. Fallback: Title Div
+    name_div = await page.query_selector('div.fontHeadlineSmall')
+    if name_div:
+        current_text = (await name_div.inner_text()).strip()
+        if current_text:
+            return current_text
+
+    # 3. Fallback: Main H1
+    main_h1 = await page.query_selector('h1')
+    if main_h1:
+        return (await main_h1.inner_text()).strip()
+
+    return ""
+
+
+def _names_match(expected_name: str, current_text: str) -> bool:
+    """Fuzzy match: check if expected name is roughly in current text or vice versa."""
+    exp_clean = expected_name.lower().replace("'", "").replace(".", "")
+    curr_clean = current_text.lower().replace("'", "").replace(".", "")
+    return exp_clean in curr_clean or curr_clean in exp_clean
+
+
+async def _open_place(page, expected_name: str, place_url: str, stats: dict, max_open_attempts: int = 3):
+    """
+    Navigate a detail page to a place and verify it shows the expected business.
+    Returns the verified name, or None if the page never matched the card.
+    """
+    name = "Unknown"
+
+    for attempt in range(max_open_attempts):
+        try:
+            if attempt > 0:
+                print(f"      🔄 Retry attempt {attempt+1} for '{expected_name}'...")
+            await page.goto(place_url, timeout=30000)
+
+            # --- ENHANCED RELIABILITY: Wait for Name Sync ---
+            # We must ensure the detail page matches the card we read the link from.
+            matched = await _waited(
+                stats,
+                _wait_for(page, NAME_MATCH_JS, expected_name, timeout_ms=settings.scraper_detail_timeout_ms)
+            )
+            current_text = await _read_detail_name(page)
+            if current_text:
+                name = current_text
+            if matched and current_text and _names_match(expected_name, current_text):
+                print(f"      ✅ Details loaded for '{expected_name}'. Scraping...")
+                return current_text
+
+        except Exception as e:
+            # If browser is closed, re-raise to exit safely
+            if "closed" in str(e) or "Target page" in str(e):
+                raise e
+            print(f"      ⚠️ Error opening '{expected_name}': {e}")
+
+    print(f"      ❌ Name Mismatch/Timeout. Scraper saw '{name}' but expected '{expected_name}'. Skipping to ensure quality.")
+    return None
+
+
+async def _extract_details(page, expected_name: str, stats: dict) -> dict:
+    """
+    Scrape address, website, phone, rating, reviews, claim status and category from a place page.
+    All fields are read by one in-page script, so a lead costs a single round trip.
+    """
+    # After verifying the NAME, ensure other DETAILS are rendered (Address/Rating/Phone)
+    # This fixes the "First Item Empty" issue where name loads but details lag behind.
+    # It's possible some legit businesses don't have address/phone/rating, so a
+    # timeout just means we proceed with what the verified page has.
+    await _waited(
+        stats,
+        _wait_for(page, DETAILS_HYDRATED_JS, timeout_ms=settings.scraper_panel_timeout_ms),
+        fixed_seconds=1
+    )
+
+    start = time.perf_counter()
+    details = await page.evaluate(EXTRACT_DETAILS_JS, expected_name or "")
+    elapsed = time.perf_counter() - start
+
+    stats["extract_count"] += 1
+    stats["extract_seconds"] = round(stats["extract_seconds"] + elapsed, 4)
+    return details
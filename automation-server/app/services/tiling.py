@@ -0,0 +1,127 @@
+"""
+Geographic tiling of a location into viewport searches.
+
+The Maps results feed stops after roughly 120 places, so one search for a
+large city only sees a fraction of its businesses. The planner looks the
+location up in a bundled offline gazetteer, splits its bounding box into a
+grid of tiles of about `tile_size_km`, and each tile becomes its own
+`/maps/search/{industry}/@lat,lng,zoomz` search. Tiles whose feed comes back
+(nearly) full are subdivided into four and searched again. Places found by
+overlapping tiles are deduplicated by place id.
+
+A tile is a dict: `{"south", "west", "north", "east", "depth"}`.
+"""
+import json
+import math
+import os
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from config import settings
+
+GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "gazetteer.json")
+
+# Results Maps shows in one feed before it stops loading more
+FEED_RESULT_CAP = 120
+
+# Never plan more than this many tiles up front; the grid gets coarser instead
+MAX_INITIAL_TILES = 64
+
+# Default browser viewport (Playwright's 1280x720) and Web Mercator tile size
+VIEWPORT_WIDTH_PX = 1280
+VIEWPORT_HEIGHT_PX = 720
+MAP_TILE_PX = 256
+
+MIN_ZOOM = 11
+MAX_ZOOM = 18
+
+KM_PER_DEGREE_LAT = 110.574
+KM_PER_DEGREE_LNG_EQUATOR = 111.320
+
+
+@lru_cache(maxsize=1)
+def load_gazetteer() -> Dict:
+    """Read the bundled gazetteer once."""
+    with open(GAZETTEER_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def lookup_bounds(location: str) -> Optional[Tuple[float, float, float, float]]:
+    """
+    Bounding box `(south, west, north, east)` of a location, or None if unknown.
+    "Mumbai", "mumbai, India" and "Bombay" all resolve to the same entry.
+    """
+    gazetteer = load_gazetteer()
+    name = location.split(",")[0].strip().lower()
+    name = gazetteer["aliases"].get(name, name)
+    bounds = gazetteer["places"].get(name)
+    return tuple(bounds) if bounds else None
+
+
+def plan_tiles(bounds: Tuple[float, float, float, float], tile_size_km: float) -> List[Dict]:
+    """Split a bounding box into a grid of tiles about `tile_size_km` wide."""
+    south, west, north, east = bounds
+    mid_lat = (south + north) / 2
+    height_km = (north - south) * KM_PER_DEGREE_LAT
+    width_km = (east - west) * KM_PER_DEGREE_LNG_EQUATOR * math.cos(math.radians(mid_lat))
+
+    rows = max(1, math.ceil(height_km / tile_size_km))
+    cols = max(1, math.ceil(width_km / tile_size_km))
+    while rows * cols > MAX_INITIAL_TILES:
+        rows, cols = max(1, math.ceil(rows / 2)), max(1, math.ceil(cols / 2))
+
+    return _grid(south, west, north, east, rows, cols, depth=0)
+
+
+def subdivide(tile: Dict) -> List[Dict]:
+    """Split a tile into four quadrants one level deeper."""
+    return _grid(tile["south"], tile["west"], tile["north"], tile["east"], 2, 2, depth=tile["depth"] + 1)
+
+
+def is_saturated(cards_seen: int, threshold: int = FEED_RESULT_CAP - 20) -> bool:
+    """True if a tile's feed was close enough to the cap that places were likely cut off."""
+    return cards_seen >= threshold
+
+
+def tile_center(tile: Dict) -> Tuple[float, float]:
+    return (tile["south"] + tile["north"]) / 2, (tile["west"] + tile["east"]) / 2
+
+
+def tile_zoom(tile: Dict) -> int:
+    """Largest zoom whose viewport still shows the whole tile."""
+    lat, _ = tile_center(tile)
+    width_deg = max(tile["east"] - tile["west"], 1e-6)
+    height_deg = max(tile["north"] - tile["south"], 1e-6)
+
+    # Degrees the viewport spans at zoom 0, latitude shrinking with Mercator scale
+    lng_span = VIEWPORT_WIDTH_PX * 360 / MAP_TILE_PX
+    lat_span = VIEWPORT_HEIGHT_PX * 360 / MAP_TILE_PX * math.cos(math.radians(lat))
+
+    zoom = math.floor(min(math.log2(lng_span / width_deg), math.log2(lat_span / height_deg)))
+    return max(MIN_ZOOM, min(MAX_ZOOM, zoom))
+
+
+def tile_search_url(query: str, tile: Dict) -> str:
+    """Maps search URL restricted to the tile's viewport."""
+    lat, lng = tile_center(tile)
+    return f"{settings.maps_base_url}/maps/search/{query.replace(' ', '+')}/@{lat:.6f},{lng:.6f},{tile_zoom(tile)}z?hl=en"
+
+
+def tile_label(tile: Dict) -> str:
+    lat, lng = tile_center(tile)
+    return f"@{lat:.4f},{lng:.4f} z{tile_zoom(tile)} d{tile['depth']}"
+
+
+def _grid(south: float, west: float, north: float, east: float, rows: int, cols: int, depth: int) -> List[Dict]:
+    lat_step = (north - south) / rows
+    lng_step = (east - west) / cols
+    return [
+        {
+            "south": round(south + r * lat_step, 6),
+            "west": round(west + c * lng_step, 6),
+            "north": round(south + (r + 1) * lat_step, 6),
+            "east": round(west + (c + 1) * lng_step, 6),
+            "depth": depth,
+        }
+        for r in range(rows)
+        for c in range(cols)
+    ]
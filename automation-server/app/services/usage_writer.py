@@ -0,0 +1,68 @@
+"""
+Write-behind buffer for API usage events.
+
+Without it every `/automation/*` call opens a connection, inserts one
+usage_logs row, updates its counter and commits before the route does its
+actual work. The writer logs queued events in batches with
+`insert_usage_events` (one COPY and one counter update per batch) on its
+own thread; see `BatchWriter`.
+
+`record()` only queues the event, stamped with the time it happened so it
+counts towards the right month however late it is written. The lifespan
+stops the writer on shutdown, which writes whatever is still queued.
+
+Quota checks read the usage counters, so they see an event once its batch
+is written, at most `flush_ms` (plus one write) later.
+"""
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+from app.db import insert_usage_events
+from app.services.batch_writer import BatchWriter
+from config import settings
+
+
+class UsageWriter(BatchWriter):
+    """
+    Dedicated thread logging queued usage events in batches.
+
+    :param queue_size: Events waiting to be written before `record()` blocks.
+    :param batch_size: Most events written in one transaction.
+    :param flush_ms: Longest an event waits for others to join its batch.
+    :param write: Batch writer returning how many events it logged (default `insert_usage_events`).
+    """
+
+    name = "Usage writer"
+    thread_name = "usage-writer"
+    item_name = "events"
+
+    def __init__(
+        self,
+        queue_size: int = 10000,
+        batch_size: int = 500,
+        flush_ms: int = 1000,
+        write: Optional[Callable[[List[Dict]], int]] = None,
+    ):
+        super().__init__(write or insert_usage_events, queue_size, batch_size, flush_ms)
+
+    def record(self, api_key_id: int, endpoint: str, leads_scraped: int = 0):
+        """
+        Queue a usage event. Blocks while the queue is full. When the writer
+        isn't running the event is written right away.
+        """
+        self._submit({
+            "api_key_id": api_key_id,
+            "endpoint": endpoint,
+            "leads_scraped": leads_scraped,
+            "timestamp": datetime.now(timezone.utc),
+        })
+
+    def _written(self, events: List[Dict], logged: int) -> int:
+        return logged
+
+
+# Singleton instance, started in the FastAPI lifespan
+usage_writer = UsageWriter(
+    queue_size=settings.usage_writer_queue_size,
+    batch_size=settings.usage_writer_batch_size,
+    flush_ms=settings.usage_writer_flush_ms,
+)
@@ -0,0 +1,469 @@
+"""
+Supervised process pool for scraping jobs.
+
+Each worker is a separate (spawned) Python process with its own browser pool,
+so a hung Chromium page or a crash only takes down one worker, and scraping
+no longer competes with request handling for the API process's GIL.
+
+One job is one location. While a job runs, the worker sends heartbeats
+carrying a snapshot of the run stats; the supervisor thread in the API
+process forwards stop signals, and its watchdog kills and restarts workers
+that miss heartbeats for `hang_timeout_seconds` or exit unexpectedly. The
+interrupted job is re-queued until it has used `max_attempts`. Leads are
+streamed back over the worker's pipe as they are found, followed by the
+final stats and whatever the job added to the sets it was passed.
+"""
+import importlib
+import itertools
+import multiprocessing
+import queue
+import signal
+import threading
+import time
+from collections import deque
+from multiprocessing.connection import wait
+from typing import Callable, Dict, Iterator, List, Optional
+from config import settings
+
+# Function run for each job inside a worker, as "module:function". It
+# returns (or yields) the leads it finds.
+DEFAULT_TARGET = "app.services.scraper:iter_google_maps"
+
+# Queued after a job's last lead
+_JOB_END = object()
+
+
+class _Job:
+    """A scrape submitted by an API thread, waiting on its result."""
+
+    def __init__(self, job_id: int, kwargs: Dict, stop_signal: Optional[Callable], stats: Optional[Dict]):
+        self.id = job_id
+        self.kwargs = kwargs
+        self.stop_signal = stop_signal
+        self.stats = stats
+        self.attempts = 0
+        self.stop_sent = False
+        self.cancelled = False
+        self.leads = queue.Queue()
+        self.error: Optional[str] = None
+        self.done = threading.Event()
+
+    def should_stop(self) -> bool:
+        return self.cancelled or bool(self.stop_signal and self.stop_signal())
+
+    def finish(self, error: Optional[str] = None):
+        self.error = error
+        self.done.set()
+        self.leads.put(_JOB_END)
+
+
+class _Worker:
+    """Handle on one worker process and the job it is running."""
+
+    def __init__(self, slot: int, process, jobs_conn, events_conn):
+        self.slot = slot
+        self.process = process
+        self.jobs_conn = jobs_conn
+        self.events_conn = events_conn
+        self.job: Optional[_Job] = None
+        self.last_heartbeat = time.monotonic()
+        self.jobs_done = 0
+
+    def to_dict(self) -> Dict:
+        return {
+            "slot": self.slot,
+            "pid": self.process.pid,
+            "alive": self.process.is_alive(),
+            "busy": self.job is not None,
+            "location": self.job.kwargs.get("location") if self.job else None,
+            "heartbeat_age_seconds": round(time.monotonic() - self.last_heartbeat, 1) if self.job else None,
+            "jobs_done": self.jobs_done,
+        }
+
+
+class WorkerSupervisor:
+    """
+    Runs scrape jobs in a pool of worker processes.
+
+    :param workers: Number of worker processes (0 = scrape in-process).
+    :param hang_timeout_seconds: Restart a busy worker after this long without a heartbeat.
+    :param heartbeat_seconds: Minimum interval between heartbeats from a worker.
+    :param max_attempts: Times a job is tried before a hang or crash fails it.
+    :param target: "module:function" each job calls in the worker.
+    :param use_browser_pool: Start a browser pool inside every worker.
+    """
+
+    def __init__(
+        self,
+        workers: int = 0,
+        hang_timeout_seconds: int = 120,
+        heartbeat_seconds: int = 5,
+        max_attempts: int = 2,
+        target: str = DEFAULT_TARGET,
+        use_browser_pool: bool = True,
+    ):
+        self.workers = workers
+        self.hang_timeout_seconds = hang_timeout_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.max_attempts = max_attempts
+        self.target = target
+        self.use_browser_pool = use_browser_pool
+
+        self._context = multiprocessing.get_context("spawn")
+        self._workers: List[_Worker] = []
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._job_ids = itertools.count(1)
+
+        self.jobs_submitted = 0
+        self.jobs_completed = 0
+        self.jobs_failed = 0
+        self.jobs_requeued = 0
+        self.hangs = 0
+        self.crashes = 0
+        self.restarts = 0
+
+    # ============== Lifecycle ==============
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Spawn the worker processes and the supervisor thread."""
+        if self.running or self.workers <= 0:
+            return
+
+        self._stopping.clear()
+        self._workers = [self._spawn(slot) for slot in range(self.workers)]
+        self._thread = threading.Thread(target=self._supervise, name="worker-supervisor", daemon=True)
+        self._thread.start()
+        print(f"✅ Scraper workers started ({self.workers} processes).")
+
+    def stop(self, timeout: float = 10):
+        """Ask workers to finish, kill the ones that don't, and fail queued jobs."""
+        if not self.running:
+            return
+
+        self._stopping.set()
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+        with self._lock:
+            for worker in self._workers:
+                if worker.job:
+                    self._send(worker, ("stop", worker.job.id, None))
+                self._send(worker, ("shutdown", None, None))
+            for worker in self._workers:
+                worker.process.join(timeout=timeout)
+                if worker.process.is_alive():
+                    worker.process.kill()
+                    worker.process.join()
+                if worker.job:
+                    worker.job.finish(error="Worker pool stopped")
+            while self._pending:
+                self._pending.popleft().finish(error="Worker pool stopped")
+            self._workers = []
+        print("🛑 Scraper workers stopped.")
+
+    # ============== Jobs ==============
+
+    def iter_scrape(self, stop_signal: Optional[Callable] = None, stats: Optional[Dict] = None, **kwargs) -> Iterator[Dict]:
+        """
+        Run one scrape in a worker and yield its leads as the worker finds them.
+        Same call shape as `iter_google_maps`: `stats` is updated in place
+        from the worker's heartbeats. Set arguments (`seen_keys`, `done_keys`)
+        are copied into the worker, and what the job added to them is merged
+        back once it is done; another job running meanwhile doesn't see it.
+        Closing the iterator early stops the job. A job retried after a hang
+        or crash may yield some leads twice.
+        """
+        job = _Job(next(self._job_ids), kwargs, stop_signal, stats)
+        with self._lock:
+            self._pending.append(job)
+            self.jobs_submitted += 1
+
+        try:
+            while (lead := job.leads.get()) is not _JOB_END:
+                yield lead
+        finally:
+            job.cancelled = not job.done.is_set()
+        if job.error:
+            raise RuntimeError(job.error)
+
+    def scrape(self, stop_signal: Optional[Callable] = None, stats: Optional[Dict] = None, **kwargs) -> List:
+        """Run one scrape in a worker, block until it finishes and return all its leads."""
+        return list(self.iter_scrape(stop_signal=stop_signal, stats=stats, **kwargs))
+
+    # ============== Supervisor thread ==============
+
+    def _supervise(self):
+        while not self._stopping.is_set():
+            with self._lock:
+                conns = [w.events_conn for w in self._workers]
+            for conn in wait(conns, timeout=0.5):
+                self._receive(conn)
+
+            with self._lock:
+                self._forward_stops()
+                failed = self._watchdog()
+            # Spawning is slow: submit() and get_stats() shouldn't wait on it
+            for worker in failed:
+                self._replace(worker)
+            with self._lock:
+                self._dispatch()
+
+    def _receive(self, conn):
+        with self._lock:
+            worker = next((w for w in self._workers if w.events_conn is conn), None)
+            if worker is None:
+                return
+            try:
+                kind, job_id, payload = conn.recv()
+            except (EOFError, OSError):
+                # Pipe closed: the watchdog sees the dead process and restarts it
+                return
+
+            job = worker.job
+            if job is None or job.id != job_id:
+                return
+
+            worker.last_heartbeat = time.monotonic()
+            if kind == "heartbeat":
+                self._update_stats(job, payload)
+            elif kind == "lead":
+                job.leads.put(payload)
+            elif kind == "done":
+                self._update_stats(job, payload["stats"])
+                self._update_sets(job, payload.get("sets"))
+                worker.job = None
+                worker.jobs_done += 1
+                self.jobs_completed += 1
+                job.finish()
+            elif kind == "error":
+                worker.job = None
+                worker.jobs_done += 1
+                self.jobs_failed += 1
+                job.finish(error=payload)
+
+    def _forward_stops(self):
+        for worker in self._workers:
+            job = worker.job
+            if job and not job.stop_sent and job.should_stop():
+                job.stop_sent = True
+                self._send(worker, ("stop", job.id, None))
+
+        # Jobs stopped before they reached a worker never start
+        for job in [j for j in self._pending if j.should_stop()]:
+            self._pending.remove(job)
+            self.jobs_completed += 1
+            job.finish()
+
+    def _watchdog(self) -> List[_Worker]:
+        """Release the jobs of dead and hung workers. Returns the workers to replace."""
+        now = time.monotonic()
+        failed = []
+        for worker in self._workers:
+            if not worker.process.is_alive():
+                self.crashes += 1
+                print(f"⚠️ Scraper worker {worker.slot} (pid {worker.process.pid}) exited. Restarting.")
+                self._release(worker, "crashed")
+                failed.append(worker)
+            elif worker.job and now - worker.last_heartbeat > self.hang_timeout_seconds:
+                self.hangs += 1
+                print(f"⚠️ Scraper worker {worker.slot} (pid {worker.process.pid}) sent no heartbeat for {self.hang_timeout_seconds}s. Killing it.")
+                self._release(worker, "hung")
+                failed.append(worker)
+        return failed
+
+    def _dispatch(self):
+        for worker in self._workers:
+            if not self._pending:
+                return
+            if worker.job is None:
+                job = self._pending.popleft()
+                job.attempts += 1
+                worker.job = job
+                worker.last_heartbeat = time.monotonic()
+                if not self._send(worker, ("run", job.id, job.kwargs)):
+                    worker.job = None
+                    job.attempts -= 1
+                    self._pending.appendleft(job)
+
+    def _release(self, worker: _Worker, reason: str):
+        """Re-queue or fail the job of a worker about to be replaced. Called with the lock held."""
+        job = worker.job
+        worker.job = None
+        if job:
+            if job.attempts < self.max_attempts and not job.should_stop():
+                self.jobs_requeued += 1
+                job.stop_sent = False
+                self._pending.appendleft(job)
+            else:
+                self.jobs_failed += 1
+                job.finish(error=f"Scraper worker {reason} after {job.attempts} attempt(s)")
+
+    def _replace(self, worker: _Worker):
+        """Kill a released worker and swap in a new process. Called without the lock."""
+        if worker.process.is_alive():
+            worker.process.kill()
+        worker.process.join(timeout=5)
+        for conn in (worker.jobs_conn, worker.events_conn):
+            conn.close()
+
+        replacement = self._spawn(worker.slot)
+        with self._lock:
+            self._workers[self._workers.index(worker)] = replacement
+            self.restarts += 1
+
+    def _spawn(self, slot: int) -> _Worker:
+        jobs_reader, jobs_writer = self._context.Pipe(duplex=False)
+        events_reader, events_writer = self._context.Pipe(duplex=False)
+        process = self._context.Process(
+            target=_worker_main,
+            args=(jobs_reader, events_writer, self.target, self.heartbeat_seconds, self.use_browser_pool),
+            name=f"scraper-worker-{slot}",
+            daemon=True,
+        )
+        process.start()
+        # The child holds its own copies of these ends
+        jobs_reader.close()
+        events_writer.close()
+        return _Worker(slot, process, jobs_writer, events_reader)
+
+    @staticmethod
+    def _send(worker: _Worker, message) -> bool:
+        try:
+            worker.jobs_conn.send(message)
+            return True
+        except (BrokenPipeError, OSError):
+            return False
+
+    @staticmethod
+    def _update_stats(job: _Job, snapshot: Dict):
+        if job.stats is not None and snapshot:
+            job.stats.update(snapshot)
+
+    @staticmethod
+    def _update_sets(job: _Job, sets: Optional[Dict]):
+        for name, values in (sets or {}).items():
+            if isinstance(job.kwargs.get(name), set):
+                job.kwargs[name].update(values)
+
+    # ============== Metrics ==============
+
+    def get_stats(self) -> Dict:
+        """Snapshot of workers, queue length and failure counters."""
+        with self._lock:
+            workers = [w.to_dict() for w in self._workers]
+            pending = len(self._pending)
+        return {
+            "running": self.running,
+            "workers": self.workers,
+            "busy": sum(1 for w in workers if w["busy"]),
+            "pending": pending,
+            "jobs_submitted": self.jobs_submitted,
+            "jobs_completed": self.jobs_completed,
+            "jobs_failed": self.jobs_failed,
+            "jobs_requeued": self.jobs_requeued,
+            "hangs": self.hangs,
+            "crashes": self.crashes,
+            "restarts": self.restarts,
+            "hang_timeout_seconds": self.hang_timeout_seconds,
+            "processes": workers,
+        }
+
+
+def _worker_main(jobs_conn, events_conn, target: str, heartbeat_seconds: float, use_browser_pool: bool):
+    """Entry point of a worker process: run jobs until told to shut down."""
+    # Ctrl+C reaches the whole process group; the supervisor decides when we exit
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    module_name, function_name = target.split(":")
+    run = getattr(importlib.import_module(module_name), function_name)
+    from app.services.scraper import new_scrape_stats
+    from app.services.browser_pool import browser_pool
+    from app.services.lead_writer import lead_writer
+    from app.db import open_pool, close_pool
+
+    if settings.db_pool_enabled:
+        open_pool()
+    if use_browser_pool:
+        browser_pool.start()
+    if settings.lead_writer_enabled:
+        lead_writer.start()
+
+    jobs = queue.Queue()
+    stop_events: Dict[int, threading.Event] = {}
+    send_lock = threading.Lock()
+
+    def send(message):
+        with send_lock:
+            events_conn.send(message)
+
+    def read_commands():
+        while True:
+            try:
+                kind, job_id, payload = jobs_conn.recv()
+            except (EOFError, OSError):
+                jobs.put(None)
+                return
+            if kind == "run":
+                stop_events[job_id] = threading.Event()
+                jobs.put((job_id, payload))
+            elif kind == "stop" and job_id in stop_events:
+                stop_events[job_id].set()
+            elif kind == "shutdown":
+                jobs.put(None)
+                return
+
+    threading.Thread(target=read_commands, name="worker-commands", daemon=True).start()
+
+    try:
+        while True:
+            item = jobs.get()
+            if item is None:
+                break
+
+            job_id, kwargs = item
+            stop_event = stop_events[job_id]
+            stats = new_scrape_stats()
+            last_beat = [time.monotonic()]
+
+            # The scraper polls its stop signal throughout the run, which makes
+            # it the natural place to report that the run is still moving
+            def stop_signal():
+                now = time.monotonic()
+                if now - last_beat[0] >= heartbeat_seconds:
+                    last_beat[0] = now
+                    send(("heartbeat", job_id, dict(stats)))
+                return stop_event.is_set()
+
+            send(("heartbeat", job_id, dict(stats)))
+            try:
+                for lead in run(stop_signal=stop_signal, stats=stats, **kwargs):
+                    send(("lead", job_id, lead))
+                # The caller's sets were pickled; send back what this copy gained
+                sets = {name: list(value) for name, value in kwargs.items() if isinstance(value, set)}
+                send(("done", job_id, {"stats": stats, "sets": sets}))
+            except Exception as e:
+                send(("error", job_id, str(e)))
+            finally:
+                stop_events.pop(job_id, None)
+    finally:
+        lead_writer.stop()
+        if use_browser_pool:
+            browser_pool.stop()
+        close_pool()
+
+
+# Singleton instance, started in the FastAPI lifespan when SCRAPER_WORKERS > 0
+worker_supervisor = WorkerSupervisor(
+    workers=settings.scraper_workers,
+    hang_timeout_seconds=settings.scraper_hang_timeout_seconds,
+    heartbeat_seconds=settings.scraper_heartbeat_seconds,
+    max_attempts=settings.scraper_job_attempts,
+    use_browser_pool=settings.browser_pool_enabled,
+)
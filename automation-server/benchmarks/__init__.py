@@ -0,0 +1,3 @@
+"""
+Offline benchmarks for the scraper (synthetic Maps server + runner).
+"""
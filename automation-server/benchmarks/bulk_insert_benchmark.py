@@ -0,0 +1,127 @@
+"""
+Lead ingestion benchmark: per-row `insert_lead` vs `bulk_insert_leads`.
+
+Generates synthetic leads and writes them into the configured database
+through both paths, first as new rows and then again as duplicates, and
+reports rows/s of each. Use a scratch DB_NAME; the generated leads are
+deleted afterwards.
+
+Usage (from automation-server/):
+
+    DB_NAME=lead_scraper_bench uv run python -m benchmarks.bulk_insert_benchmark --rows 5000
+    DB_NAME=lead_scraper_bench uv run python -m benchmarks.bulk_insert_benchmark --rows 50000 --batch-size 1000 --skip-per-row
+"""
+import argparse
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+from app.db.database import init_db, get_connection, insert_lead, bulk_insert_leads
+from benchmarks.run_benchmark import RESULTS_DIR, git_commit
+
+
+def synthetic_leads(count: int, run_id: str) -> List[Dict]:
+    """Leads shaped like the scraper's, tagged with the run id for cleanup."""
+    return [
+        {
+            "business_name": f"Bench Bakery {i}",
+            "industry": "bakery",
+            "category": "Bakery",
+            "location": "Benchville",
+            "address": f"{i} Bench St [{run_id}]",
+            "rating": round(3 + (i % 20) / 10, 1),
+            "review_count": i % 500,
+            "is_claimed": i % 3 == 0,
+            "has_website": False,
+            "website_url": None,
+            "phone": f"+1 555 {i:07d}",
+            "place_id": f"0x{run_id[:8]}:0x{i:x}",
+        }
+        for i in range(count)
+    ]
+
+
+def per_row(leads: List[Dict]) -> List[bool]:
+    return [insert_lead(lead) for lead in leads]
+
+
+def in_batches(batch_size: int) -> Callable[[List[Dict]], List[bool]]:
+    def write(leads: List[Dict]) -> List[bool]:
+        added = []
+        for start in range(0, len(leads), batch_size):
+            added.extend(bulk_insert_leads(leads[start:start + batch_size]))
+        return added
+    return write
+
+
+def timed(write: Callable[[List[Dict]], List[bool]], leads: List[Dict]) -> Dict:
+    start = time.perf_counter()
+    added = write(leads)
+    elapsed = time.perf_counter() - start
+    return {
+        "rows": len(leads),
+        "new": sum(added),
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_second": round(len(leads) / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def delete_run(run_id: str):
+    with get_connection() as conn:
+        conn.execute("DELETE FROM leads WHERE address LIKE %s", (f"% [{run_id}]",))
+
+
+def run(rows: int, batch_size: int, skip_per_row: bool = False) -> Dict:
+    """Time each path on fresh rows, then on the same rows again (all duplicates)."""
+    paths = {"bulk": in_batches(batch_size)}
+    if not skip_per_row:
+        paths = {"per_row": per_row, **paths}
+
+    results = {}
+    for name, write in paths.items():
+        run_id = uuid.uuid4().hex
+        leads = synthetic_leads(rows, run_id)
+        try:
+            results[name] = {"insert": timed(write, leads), "duplicates": timed(write, leads)}
+        finally:
+            delete_run(run_id)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-row and bulk lead inserts.")
+    parser.add_argument("--rows", type=int, default=5000, help="Leads written by each path")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Leads per bulk_insert_leads call")
+    parser.add_argument("--skip-per-row", action="store_true", help="Only time the bulk path (large --rows)")
+    parser.add_argument("--output", default=RESULTS_DIR, help="Directory for the JSON result")
+    args = parser.parse_args()
+
+    init_db()
+    results = run(args.rows, args.batch_size, args.skip_per_row)
+
+    print(f"\n🏁 {args.rows} leads per path (bulk batches of {args.batch_size})")
+    for name, phases in results.items():
+        for phase, values in phases.items():
+            print(f"   ⏱️ {name:<8} {phase:<10} {values['elapsed_seconds']:>8}s  {values['rows_per_second']:>10} rows/s  ({values['new']} new)")
+    if "per_row" in results:
+        speedup = results["per_row"]["insert"]["elapsed_seconds"] / max(results["bulk"]["insert"]["elapsed_seconds"], 1e-9)
+        print(f"   🚀 Bulk insert is {speedup:.1f}x faster than per-row")
+
+    now = datetime.now(timezone.utc)
+    record = {
+        "timestamp": now.isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "config": {"rows": args.rows, "batch_size": args.batch_size},
+        "results": results,
+    }
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"{now.strftime('%Y%m%dT%H%M%SZ')}-bulk-insert.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(record, f, indent=2)
+    print(f"💾 Saved {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Quota check latency benchmark: monthly SUM over usage_logs vs usage_counters.
+
+Fills usage_logs with synthetic rows (server-side, spread over the last
+year and over `--keys` API keys), rebuilds the counters, then times the
+quota check both ways. `check_quota` should stay flat as the log grows
+while the SUM grows with it. Use a scratch DB_NAME; the benchmark keys and
+their logs are deleted afterwards.
+
+Usage (from automation-server/):
+
+    DB_NAME=lead_scraper_bench uv run python -m benchmarks.quota_benchmark --rows 1000000
+    DB_NAME=lead_scraper_bench uv run python -m benchmarks.quota_benchmark --rows 10000000 --iterations 200
+"""
+import argparse
+import json
+import os
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+from app.db.database import init_db, get_connection
+from app.db.api_keys import create_api_key, delete_api_key, check_quota, rebuild_usage_counters
+from app.db.usage_partitions import maintain_usage_partitions
+from benchmarks.run_benchmark import RESULTS_DIR, git_commit, percentiles
+
+# The quota check before usage_counters existed
+LEGACY_QUOTA_QUERY = '''
+    SELECT COALESCE(SUM(leads_scraped), 0) as monthly_leads
+    FROM usage_logs
+    WHERE api_key_id = %s
+    AND timestamp >= date_trunc('month', CURRENT_TIMESTAMP)
+'''
+
+
+def fill_logs(key_ids: List[int], rows: int):
+    """Insert `rows` usage logs round-robin over the keys, spread over a year."""
+    with get_connection() as conn:
+        conn.execute('''
+            INSERT INTO usage_logs (api_key_id, endpoint, leads_scraped, timestamp)
+            SELECT
+                (%(keys)s::int[])[1 + i %% cardinality(%(keys)s::int[])],
+                '/automation/start',
+                i %% 7,
+                CURRENT_TIMESTAMP - (i %% 365) * INTERVAL '1 day'
+            FROM generate_series(1, %(rows)s) AS i
+        ''', {"keys": key_ids, "rows": rows})
+
+
+def legacy_check(api_key_id: int, monthly_limit: int) -> bool:
+    with get_connection() as conn:
+        result = conn.execute(LEGACY_QUOTA_QUERY, (api_key_id,)).fetchone()
+        return result["monthly_leads"] < monthly_limit
+
+
+def time_calls(check: Callable, api_key_id: int, iterations: int) -> Dict:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        check(api_key_id, 10 ** 9)
+        samples.append(time.perf_counter() - start)
+    return percentiles(samples)
+
+
+def run(rows: int, keys: int, iterations: int) -> Dict:
+    key_ids = [create_api_key(name=f"Quota Benchmark {i}", tier="free")["id"] for i in range(keys)]
+    try:
+        start = time.perf_counter()
+        fill_logs(key_ids, rows)
+        fill_seconds = time.perf_counter() - start
+
+        # Past months land in the default partition until they get their own
+        maintain_usage_partitions()
+
+        start = time.perf_counter()
+        for key_id in key_ids:
+            rebuild_usage_counters(key_id)
+        rebuild_seconds = time.perf_counter() - start
+
+        with get_connection() as conn:
+            total_rows = conn.execute("SELECT COUNT(*) AS count FROM usage_logs").fetchone()["count"]
+
+        return {
+            "usage_logs_rows": total_rows,
+            "fill_seconds": round(fill_seconds, 2),
+            "rebuild_seconds": round(rebuild_seconds, 2),
+            "legacy_sum": time_calls(legacy_check, key_ids[0], iterations),
+            "counters": time_calls(check_quota, key_ids[0], iterations),
+        }
+    finally:
+        for key_id in key_ids:
+            delete_api_key(key_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare quota checks over usage_logs and usage_counters.")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Usage log rows to insert")
+    parser.add_argument("--keys", type=int, default=10, help="API keys the rows are spread over")
+    parser.add_argument("--iterations", type=int, default=100, help="Quota checks timed per method")
+    parser.add_argument("--output", default=RESULTS_DIR, help="Directory for the JSON result")
+    args = parser.parse_args()
+
+    init_db()
+    results = run(args.rows, args.keys, args.iterations)
+
+    print(f"\n🏁 {results['usage_logs_rows']} usage_logs rows (filled in {results['fill_seconds']}s, counters rebuilt in {results['rebuild_seconds']}s)")
+    for name in ("legacy_sum", "counters"):
+        values = results[name]
+        print(f"   ⏱️ {name:<10} n={values['count']:<5} p50={values['p50_ms']}ms p90={values['p90_ms']}ms p99={values['p99_ms']}ms")
+
+    now = datetime.now(timezone.utc)
+    record = {
+        "timestamp": now.isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "config": {"rows": args.rows, "keys": args.keys, "iterations": args.iterations},
+        "results": results,
+    }
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"{now.strftime('%Y%m%dT%H%M%SZ')}-quota.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(record, f, indent=2)
+    print(f"💾 Saved {path}")
+
+
+if __name__ == "__main__":
+    main()
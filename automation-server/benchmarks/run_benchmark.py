@@ -0,0 +1,312 @@
+"""
+Offline scraper throughput benchmark.
+
+Starts the synthetic Maps server, points the scraper at it through
+`settings.maps_base_url`, and runs `scrape_google_maps_async` against it.
+Reports leads/min, p50/p90/p99 latency of the open-place, extract and save
+stages, the run's own counters, and peak RSS. Results are written as JSON so
+two runs (e.g. two commits) can be compared with `--compare`.
+
+Usage (from automation-server/):
+
+    uv run python -m benchmarks.run_benchmark --feed-size 200 --concurrency 3
+    uv run python -m benchmarks.run_benchmark --mode network --lean --compare benchmarks/results/<previous>.json
+
+Leads are kept in memory unless `--with-db` is given, in which case they go
+through `insert_lead` into the configured database (use a scratch DB_NAME).
+
+Runs can be recorded to a HAR file and replayed with no network, which gives
+repeatable timings of the extraction path against real pages:
+
+    uv run python -m benchmarks.run_benchmark --live --industry bakery --location Toronto \
+        --har recordings/bakery-toronto.har.zip --har-mode record
+    uv run python -m benchmarks.run_benchmark --har recordings/bakery-toronto.har.zip --har-mode replay
+
+A `<har>.meta.json` file next to the recording keeps the origin, search and
+limit, so a replay requests exactly the URLs that were recorded.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from app.models.automation import CardPrefilter, ExtractionMode
+from app.services import scraper
+from benchmarks.synthetic_maps import SyntheticMapsConfig, SyntheticMapsServer
+from config import settings
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+# Scraper module functions timed as stages
+STAGES = {
+    "open_place": "_open_place",
+    "extract": "_extract_details",
+}
+
+# Metrics where a higher value is better, for --compare
+HIGHER_IS_BETTER = {"leads_per_minute"}
+
+
+class StageTimer:
+    """Collects per-call durations of the instrumented scraper stages."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+
+    def record(self, stage: str, seconds: float):
+        self.samples.setdefault(stage, []).append(seconds)
+
+    def wrap_async(self, stage: str, func):
+        async def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                self.record(stage, time.perf_counter() - start)
+        return timed
+
+    def wrap(self, stage: str, func):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(stage, time.perf_counter() - start)
+        return timed
+
+    def summary(self) -> Dict:
+        return {stage: percentiles(values) for stage, values in self.samples.items()}
+
+
+def percentiles(values: List[float]) -> Dict:
+    """Count and nearest-rank p50/p90/p99 of durations, in milliseconds."""
+    ordered = sorted(values)
+
+    def rank(p):
+        return round(ordered[min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))] * 1000, 1)
+
+    return {"count": len(ordered), "p50_ms": rank(50), "p90_ms": rank(90), "p99_ms": rank(99)}
+
+
+def memory_insert(seen: set):
+    """`insert_lead` stand-in that dedupes in memory like the leads table does."""
+    def insert(lead: Dict) -> bool:
+        key = (lead["business_name"], lead["address"])
+        if key in seen:
+            return False
+        seen.add(key)
+        return True
+    return insert
+
+
+def peak_rss_mb() -> Dict:
+    """Peak resident memory of this process and of the largest finished child (Chromium/driver)."""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return {"peak_rss_mb": round(own / scale, 1), "peak_child_rss_mb": round(children / scale, 1)}
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def har_metadata_path(har_path: str) -> str:
+    return f"{har_path}.meta.json"
+
+
+def run_benchmark(
+    server_config: SyntheticMapsConfig,
+    concurrency: int = scraper.DEFAULT_CONCURRENCY,
+    extraction_mode: str = ExtractionMode.DOM,
+    lean_mode: bool = False,
+    fast_path: bool = False,
+    limit: int = -1,
+    with_db: bool = False,
+    industry: str = "bakery",
+    location: str = "Testville",
+    live: bool = False,
+    har_mode: Optional[str] = None,
+    har_path: Optional[str] = None,
+) -> Dict:
+    """
+    Run one scrape and return its measurements. The scrape goes to a fresh
+    synthetic server, to the real Maps site with `live`, or to a HAR
+    recording with `har_mode="replay"`.
+    """
+    metadata = None
+    if har_mode == scraper.HAR_REPLAY:
+        with open(har_metadata_path(har_path), encoding="utf-8") as f:
+            metadata = json.load(f)
+        industry, location, limit = metadata["industry"], metadata["location"], metadata["limit"]
+    timer = StageTimer()
+    originals = {name: getattr(scraper, name) for name in list(STAGES.values()) + ["insert_lead"]}
+
+    for stage, name in STAGES.items():
+        setattr(scraper, name, timer.wrap_async(stage, originals[name]))
+    insert = originals["insert_lead"] if with_db else memory_insert(set())
+    scraper.insert_lead = timer.wrap("save", insert)
+
+    base_url = settings.maps_base_url
+    stats = scraper.new_scrape_stats()
+    use_server = metadata is None and not live
+    try:
+        with SyntheticMapsServer(server_config) if use_server else contextlib.nullcontext() as server:
+            if server:
+                settings.maps_base_url = server.base_url
+            elif metadata:
+                settings.maps_base_url = metadata["base_url"]
+            start = time.perf_counter()
+            asyncio.run(scraper.scrape_google_maps_async(
+                industry=industry,
+                location=location,
+                total=limit,
+                concurrency=concurrency,
+                extraction_mode=extraction_mode,
+                lean_mode=lean_mode,
+                measure_resources=True,
+                prefilter=CardPrefilter().model_dump() if fast_path else None,
+                stats=stats,
+                har_mode=har_mode,
+                har_path=har_path,
+            ))
+            elapsed = time.perf_counter() - start
+            server_requests = server.requests if server else None
+
+            if har_mode == scraper.HAR_RECORD:
+                with open(har_metadata_path(har_path), "w", encoding="utf-8") as f:
+                    json.dump({
+                        "base_url": settings.maps_base_url,
+                        "industry": industry,
+                        "location": location,
+                        "limit": limit,
+                        "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                        "commit": git_commit(),
+                    }, f, indent=2)
+    finally:
+        settings.maps_base_url = base_url
+        for name, func in originals.items():
+            setattr(scraper, name, func)
+
+    leads = stats["leads_saved"]
+    return {
+        "leads": leads,
+        "elapsed_seconds": round(elapsed, 2),
+        "leads_per_minute": round(leads / elapsed * 60, 1) if elapsed else 0.0,
+        "server_requests": server_requests,
+        "stages": timer.summary(),
+        **peak_rss_mb(),
+        "stats": stats,
+    }
+
+
+def compare(current: Dict, previous: Dict):
+    """Print the change of the headline metrics against a previous result file."""
+    print(f"\n📊 Compared with {previous.get('timestamp')} ({previous.get('commit') or 'unknown commit'}):")
+    rows = [("leads_per_minute", current["leads_per_minute"], previous["results"]["leads_per_minute"])]
+    rows.append(("peak_rss_mb", current["peak_rss_mb"], previous["results"]["peak_rss_mb"]))
+    for stage, values in current["stages"].items():
+        before = previous["results"]["stages"].get(stage)
+        if before:
+            rows.append((f"{stage}.p50_ms", values["p50_ms"], before["p50_ms"]))
+            rows.append((f"{stage}.p90_ms", values["p90_ms"], before["p90_ms"]))
+
+    for name, now, before in rows:
+        change = (now - before) / before * 100 if before else 0.0
+        better = change >= 0 if name in HIGHER_IS_BETTER else change <= 0
+        print(f"   {'✅' if better else '⚠️ '} {name:<22} {before:>10} → {now:<10} ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scraper against a local synthetic Maps server.")
+    parser.add_argument("--feed-size", type=int, default=200, help="Places in the synthetic feed")
+    parser.add_argument("--page-size", type=int, default=20, help="Cards per lazy-loaded page")
+    parser.add_argument("--latency-ms", type=int, default=50, help="Server delay per response")
+    parser.add_argument("--hydration-ms", type=int, default=150, help="Delay before cards/panels fill in")
+    parser.add_argument("--concurrency", type=int, default=scraper.DEFAULT_CONCURRENCY)
+    parser.add_argument("--mode", choices=[m.value for m in ExtractionMode], default=ExtractionMode.DOM.value)
+    parser.add_argument("--lean", action="store_true", help="Enable lean mode")
+    parser.add_argument("--fast-path", action="store_true", help="Skip cards with a website")
+    parser.add_argument("--limit", type=int, default=-1, help="Leads to collect (-1 = whole feed)")
+    parser.add_argument("--with-db", action="store_true", help="Save leads through insert_lead")
+    parser.add_argument("--industry", default="bakery", help="Search industry (live/record runs)")
+    parser.add_argument("--location", default="Testville", help="Search location (live/record runs)")
+    parser.add_argument("--live", action="store_true", help="Scrape the real Maps site instead of the synthetic server")
+    parser.add_argument("--har", help="HAR file to record to or replay from (.har or .har.zip)")
+    parser.add_argument("--har-mode", choices=[scraper.HAR_RECORD, scraper.HAR_REPLAY], help="Record or replay --har")
+    parser.add_argument("--output", default=RESULTS_DIR, help="Directory for the JSON result")
+    parser.add_argument("--compare", help="Previous result JSON to compare against")
+    args = parser.parse_args()
+    if bool(args.har) != bool(args.har_mode):
+        parser.error("--har and --har-mode go together")
+
+    server_config = SyntheticMapsConfig(
+        feed_size=args.feed_size,
+        page_size=args.page_size,
+        latency_ms=args.latency_ms,
+        hydration_ms=args.hydration_ms,
+    )
+    results = run_benchmark(
+        server_config,
+        concurrency=args.concurrency,
+        extraction_mode=ExtractionMode(args.mode),
+        lean_mode=args.lean,
+        fast_path=args.fast_path,
+        limit=args.limit,
+        with_db=args.with_db,
+        industry=args.industry,
+        location=args.location,
+        live=args.live,
+        har_mode=args.har_mode,
+        har_path=args.har,
+    )
+
+    print(f"\n🏁 {results['leads']} leads in {results['elapsed_seconds']}s → {results['leads_per_minute']} leads/min")
+    for stage, values in results["stages"].items():
+        print(f"   ⏱️ {stage:<10} n={values['count']:<5} p50={values['p50_ms']}ms p90={values['p90_ms']}ms p99={values['p99_ms']}ms")
+    print(f"   🧠 Peak RSS {results['peak_rss_mb']}MB (largest child {results['peak_child_rss_mb']}MB)")
+
+    now = datetime.now(timezone.utc)
+    record = {
+        "timestamp": now.isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "config": {
+            "server": server_config.to_dict(),
+            "concurrency": args.concurrency,
+            "mode": args.mode,
+            "lean": args.lean,
+            "fast_path": args.fast_path,
+            "limit": args.limit,
+            "with_db": args.with_db,
+            "live": args.live,
+            "har": args.har,
+            "har_mode": args.har_mode,
+        },
+        "results": results,
+    }
+
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"{now.strftime('%Y%m%dT%H%M%SZ')}-{args.mode}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(record, f, indent=2, default=str)
+    print(f"💾 Saved {path}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
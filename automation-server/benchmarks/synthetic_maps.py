@@ -0,0 +1,357 @@
+"""
+Local HTTP server serving a synthetic, Maps-like results feed and place pages.
+
+The markup mirrors what the scraper targets: `div[role="feed"]` holding
+`div[role="article"]` cards (`div.qBF1Pd` name, `/maps/place/` link with a
+`!1s0x..:0x..` feature id, rating, reviews, category, Website button), the
+`div.HlvSq` end-of-list marker, and place pages with `h1.DUwDvf`,
+`button[data-item-id="address"]`, phone, website, rating, reviews, category
+and the "Claim this business" link.
+
+Like Maps, the first page of cards is inlined (with the records in
+`APP_INITIALIZATION_STATE`), further pages are lazy-loaded through
+`/search?tbm=map` XHRs when the feed is scrolled, and both new cards and
+place panels hydrate after a delay. Payloads use the positional record
+layout `app.services.maps_payload` decodes, so network mode works too.
+
+Run standalone with `python -m benchmarks.synthetic_maps --port 8765`.
+"""
+import argparse
+import html
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, quote_plus, unquote_plus, urlparse
+from app.services.maps_payload import XSSI_PREFIX, feature_id_from_url
+
+CATEGORIES = ["Bakery", "Cafe", "Plumber", "Dentist", "Hair salon", "Gym", "Florist", "Locksmith"]
+
+
+class SyntheticMapsConfig:
+    """
+    Shape of the synthetic feed.
+
+    :param feed_size: Places in a search feed before the end-of-list marker.
+    :param page_size: Cards per lazy-loaded page (and inlined up front).
+    :param latency_ms: Server delay before every search/place response.
+    :param hydration_ms: Delay before new cards and place panels fill in.
+    :param website_ratio: Share of places that have a website.
+    :param unclaimed_ratio: Share of places showing "Claim this business".
+    :param seed: Seed for the generated places.
+    """
+
+    def __init__(
+        self,
+        feed_size: int = 200,
+        page_size: int = 20,
+        latency_ms: int = 50,
+        hydration_ms: int = 150,
+        website_ratio: float = 0.5,
+        unclaimed_ratio: float = 0.3,
+        seed: int = 42,
+    ):
+        self.feed_size = feed_size
+        self.page_size = page_size
+        self.latency_ms = latency_ms
+        self.hydration_ms = hydration_ms
+        self.website_ratio = website_ratio
+        self.unclaimed_ratio = unclaimed_ratio
+        self.seed = seed
+
+    def to_dict(self) -> Dict:
+        return dict(vars(self))
+
+
+def generate_places(config: SyntheticMapsConfig) -> List[Dict]:
+    """Deterministic fake businesses for the feed."""
+    rng = random.Random(config.seed)
+    places = []
+    for i in range(config.feed_size):
+        category = CATEGORIES[i % len(CATEGORIES)]
+        name = f"Synthetic {category} {i + 1}"
+        has_website = rng.random() < config.website_ratio
+        places.append({
+            "feature_id": f"0x{i + 1:x}:0x{(i + 1) * 7919:x}",
+            "name": name,
+            "category": category,
+            "address": f"{i + 1} Benchmark St, Testville",
+            "phone": f"+1 555-{i + 1:04d}",
+            "rating": round(3.0 + (i % 21) / 10, 1),
+            "review_count": (i * 37) % 500,
+            "website_url": f"https://{name.lower().replace(' ', '')}.example" if has_website else None,
+            "is_claimed": rng.random() >= config.unclaimed_ratio,
+        })
+    return places
+
+
+def place_record(place: Dict) -> List:
+    """Place record at the offsets `maps_payload.PLACE_FIELDS` reads."""
+    record = [None] * 180
+    record[4] = [None] * 9
+    record[4][7] = place["rating"]
+    record[4][8] = place["review_count"]
+    if place["website_url"]:
+        record[7] = [place["website_url"], place["website_url"].split("//")[1]]
+    record[10] = place["feature_id"]
+    record[11] = place["name"]
+    record[13] = [place["category"]]
+    record[18] = f"{place['name']}, {place['address']}"
+    record[39] = place["address"]
+    record[178] = [[place["phone"]]]
+    if not place["is_claimed"]:
+        record[49] = [f"https://business.google.com/create?fid={place['feature_id']}"]
+    return record
+
+
+class SyntheticMapsServer:
+    """Threaded HTTP server for the synthetic feed, usable as a context manager."""
+
+    def __init__(self, config: Optional[SyntheticMapsConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or SyntheticMapsConfig()
+        self.places = generate_places(self.config)
+        self.places_by_feature_id = {p["feature_id"]: p for p in self.places}
+        self.requests = 0
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def serve_forever(self):
+        self._httpd.serve_forever()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="synthetic-maps", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ============== Pages ==============
+
+    def place_url(self, place: Dict) -> str:
+        return f"{self.base_url}/maps/place/{quote_plus(place['name'])}/data=!4m7!3m6!1s{place['feature_id']}!8m2"
+
+    def card_html(self, place: Dict) -> str:
+        website = '<a data-value="Website" href="{}">Website</a>'.format(html.escape(place["website_url"])) if place["website_url"] else ""
+        return (
+            '<div role="article" class="Nv2PK">'
+            f'<a class="hfpxzc" href="{html.escape(self.place_url(place))}"></a>'
+            f'<div class="qBF1Pd" data-name="{html.escape(place["name"])}"></div>'
+            '<div class="W4Efsd">'
+            f'<span class="MW4etd">{place["rating"]}</span> <span class="UY7F9">({place["review_count"]})</span>'
+            f' <span>·</span> <span>{html.escape(place["category"])}</span>'
+            '</div>'
+            f'{website}'
+            '</div>'
+        )
+
+    def feed_page(self, offset: int) -> Dict:
+        page = self.places[offset:offset + self.config.page_size]
+        return {
+            "html": "".join(self.card_html(p) for p in page),
+            "records": [[None, place_record(p)] for p in page],
+            "next": offset + len(page),
+            "done": offset + len(page) >= len(self.places),
+        }
+
+    def payload(self, offset: int) -> str:
+        page = self.feed_page(offset)
+        return XSSI_PREFIX + "\n" + json.dumps([page["html"], page["records"], page["next"], page["done"]])
+
+    def search_page(self, query: str) -> str:
+        first = self.feed_page(0)
+        initial_state = self.payload(0)[len(XSSI_PREFIX):].strip()
+        return SEARCH_PAGE.format(
+            title=html.escape(query),
+            cards=first["html"],
+            initial_state=initial_state,
+            query=json.dumps(query),
+            next=first["next"],
+            done=json.dumps(first["done"]),
+            hydration_ms=self.config.hydration_ms,
+        ).replace("%%HYDRATE%%", HYDRATE_JS)
+
+    def place_page(self, place: Dict) -> str:
+        website = (
+            f'<a data-item-id="authority" aria-label="Website: {html.escape(place["website_url"])}" '
+            f'href="{html.escape(place["website_url"])}">Website</a>'
+        ) if place["website_url"] else ""
+        claim = '<a aria-label="Claim this business" href="#">Claim this business</a>' if not place["is_claimed"] else ""
+        details = (
+            f'<button jsaction="pane.rating.category">{html.escape(place["category"])}</button>'
+            f'<div class="jANrlb"><div class="fontDisplayLarge">{place["rating"]}</div></div>'
+            f'<button jsaction="pane.reviewChart.moreReviews"><span>{place["review_count"]} reviews</span></button>'
+            f'<button data-item-id="address" aria-label="Address: {html.escape(place["address"])}">'
+            f'<div class="Io6YTe">{html.escape(place["address"])}</div></button>'
+            f'<button data-item-id="phone:tel:{place["phone"].replace(" ", "")}" aria-label="Phone: {place["phone"]}">'
+            f'<div class="Io6YTe">{place["phone"]}</div></button>'
+            f'{website}{claim}'
+        )
+        return PLACE_PAGE.format(
+            name=html.escape(place["name"]),
+            details=json.dumps(details),
+            hydration_ms=self.config.hydration_ms,
+        )
+
+    # ============== HTTP ==============
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests += 1
+                url = urlparse(self.path)
+
+                if url.path.startswith("/maps/search/"):
+                    self._delay()
+                    query = unquote_plus(url.path[len("/maps/search/"):].split("/@")[0])
+                    return self._send(200, "text/html", server.search_page(query))
+
+                if url.path == "/search":
+                    self._delay()
+                    offset = int(parse_qs(url.query).get("offset", ["0"])[0])
+                    return self._send(200, "application/json", server.payload(offset))
+
+                if url.path.startswith("/maps/place/"):
+                    self._delay()
+                    place = server.places_by_feature_id.get(feature_id_from_url(self.path))
+                    if place is None:
+                        return self._send(404, "text/plain", "Unknown place")
+                    return self._send(200, "text/html", server.place_page(place))
+
+                return self._send(404, "text/plain", "Not found")
+
+            def _delay(self):
+                if server.config.latency_ms:
+                    time.sleep(server.config.latency_ms / 1000)
+
+            def _send(self, status: int, content_type: str, body: str):
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+# Names are filled in after the hydration delay, like freshly loaded Maps cards
+HYDRATE_JS = """
+function hydrate(root) {
+    setTimeout(() => {
+        root.querySelectorAll('div.qBF1Pd[data-name]').forEach(el => {
+            el.innerText = el.getAttribute('data-name');
+            el.removeAttribute('data-name');
+        });
+    }, HYDRATION_MS);
+}
+"""
+
+SEARCH_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title} - Synthetic Maps</title>
+<style>div[role=feed] {{ height: 600px; overflow-y: auto; }} div[role=article] {{ height: 120px; }}</style>
+</head><body>
+<div role="main" aria-label="Search results for {title}">
+<div role="feed" aria-label="Results for {title}">{cards}</div>
+</div>
+<script>
+window.APP_INITIALIZATION_STATE = {initial_state};
+const HYDRATION_MS = {hydration_ms};
+%%HYDRATE%%
+const feed = document.querySelector('div[role="feed"]');
+let next = {next}, done = {done}, loading = false;
+hydrate(feed);
+
+function endOfList() {{
+    const marker = document.createElement('div');
+    marker.className = 'HlvSq';
+    marker.innerText = "You've reached the end of the list.";
+    feed.appendChild(marker);
+}}
+if (done) endOfList();
+
+async function loadMore() {{
+    if (loading || done) return;
+    loading = true;
+    const response = await fetch('/search?tbm=map&q=' + encodeURIComponent({query}) + '&offset=' + next);
+    const page = JSON.parse((await response.text()).slice(4));
+    const holder = document.createElement('div');
+    holder.innerHTML = page[0];
+    const cards = Array.from(holder.children);
+    cards.forEach(card => feed.appendChild(card));
+    cards.forEach(card => hydrate(card));
+    next = page[2];
+    done = page[3];
+    if (done) endOfList();
+    loading = false;
+}}
+
+function nearBottom() {{
+    return feed.scrollTop + feed.clientHeight >= feed.scrollHeight - 300;
+}}
+feed.addEventListener('scroll', () => {{ if (nearBottom()) loadMore(); }});
+feed.addEventListener('wheel', () => {{ if (nearBottom()) loadMore(); }});
+</script>
+</body></html>
+"""
+
+PLACE_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{name} - Synthetic Maps</title></head><body>
+<div role="main" aria-label="{name}">
+<h1 class="DUwDvf">{name}</h1>
+<div id="details"></div>
+</div>
+<script>
+setTimeout(() => {{ document.getElementById('details').innerHTML = {details}; }}, {hydration_ms});
+</script>
+</body></html>
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a synthetic Google Maps feed.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--feed-size", type=int, default=200)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--latency-ms", type=int, default=50)
+    parser.add_argument("--hydration-ms", type=int, default=150)
+    args = parser.parse_args()
+
+    config = SyntheticMapsConfig(
+        feed_size=args.feed_size,
+        page_size=args.page_size,
+        latency_ms=args.latency_ms,
+        hydration_ms=args.hydration_ms,
+    )
+    server = SyntheticMapsServer(config, port=args.port)
+    print(f"🧪 Synthetic Maps serving {config.feed_size} places at {server.base_url}/maps/search/bakery")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -22,12 +22,87 @@ class Settings:
     db_port: str = os.getenv("DB_PORT", "5432")
     db_name: str = os.getenv("DB_NAME", "lead_scraper")
     
+    # Database connection pool (opened in the app lifespan)
+    db_pool_enabled: bool = os.getenv("DB_POOL_ENABLED", "true").lower() == "true"
+    db_pool_min_size: int = int(os.getenv("DB_POOL_MIN_SIZE", "2"))
+    db_pool_max_size: int = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+    db_pool_timeout_seconds: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "10"))
+    db_pool_max_idle_seconds: float = float(os.getenv("DB_POOL_MAX_IDLE_SECONDS", "300"))
+    db_pool_max_lifetime_seconds: float = float(os.getenv("DB_POOL_MAX_LIFETIME_SECONDS", "3600"))
+    
     # Admin Authentication
     admin_secret: str = os.getenv("ADMIN_SECRET", "change-me-in-production")
     
     # API Key Settings
     api_key_prefix: str = os.getenv("API_KEY_PREFIX", "anv_")
     
+    # Cache of validated API keys (revoked/deleted keys are evicted at once)
+    auth_cache_ttl_seconds: float = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+    auth_cache_max_entries: int = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+    
+    # Browser Pool (shared Chromium instances for the scraper)
+    browser_pool_enabled: bool = os.getenv("BROWSER_POOL_ENABLED", "true").lower() == "true"
+    browser_pool_size: int = int(os.getenv("BROWSER_POOL_SIZE", "2"))
+    browser_contexts_per_browser: int = int(os.getenv("BROWSER_CONTEXTS_PER_BROWSER", "4"))
+    browser_max_age_seconds: int = int(os.getenv("BROWSER_MAX_AGE_SECONDS", "1800"))
+    browser_max_pages: int = int(os.getenv("BROWSER_MAX_PAGES", "500"))
+    browser_health_check_seconds: int = int(os.getenv("BROWSER_HEALTH_CHECK_SECONDS", "30"))
+    
+    # Origin of the Maps site the scraper opens (point at a synthetic server for benchmarks)
+    maps_base_url: str = os.getenv("MAPS_BASE_URL", "https://www.google.com").rstrip("/")
+    
+    # Locations scraped at the same time, across all tasks
+    max_parallel_locations: int = int(os.getenv("MAX_PARALLEL_LOCATIONS", "4"))
+    
+    # Tiling of large locations into viewport searches
+    tile_size_km: float = float(os.getenv("TILE_SIZE_KM", "5"))
+    tile_max_depth: int = int(os.getenv("TILE_MAX_DEPTH", "2"))
+    
+    # Scraper worker processes (0 = scrape inside the API process)
+    scraper_workers: int = int(os.getenv("SCRAPER_WORKERS", "0"))
+    scraper_hang_timeout_seconds: int = int(os.getenv("SCRAPER_HANG_TIMEOUT_SECONDS", "120"))
+    scraper_heartbeat_seconds: int = int(os.getenv("SCRAPER_HEARTBEAT_SECONDS", "5"))
+    scraper_job_attempts: int = int(os.getenv("SCRAPER_JOB_ATTEMPTS", "2"))
+    
+    # Write-behind lead writer (batches scraper inserts on a dedicated thread)
+    lead_writer_enabled: bool = os.getenv("LEAD_WRITER_ENABLED", "true").lower() == "true"
+    lead_writer_queue_size: int = int(os.getenv("LEAD_WRITER_QUEUE_SIZE", "1000"))
+    lead_writer_batch_size: int = int(os.getenv("LEAD_WRITER_BATCH_SIZE", "100"))
+    lead_writer_flush_ms: int = int(os.getenv("LEAD_WRITER_FLUSH_MS", "50"))
+    
+    # Write-behind usage writer (batches usage log events on a dedicated thread)
+    usage_writer_enabled: bool = os.getenv("USAGE_WRITER_ENABLED", "true").lower() == "true"
+    usage_writer_queue_size: int = int(os.getenv("USAGE_WRITER_QUEUE_SIZE", "10000"))
+    usage_writer_batch_size: int = int(os.getenv("USAGE_WRITER_BATCH_SIZE", "500"))
+    usage_writer_flush_ms: int = int(os.getenv("USAGE_WRITER_FLUSH_MS", "1000"))
+    
+    # Monthly usage_logs partitions (retention 0 = keep every month; action "detach" or "drop")
+    usage_partition_months_ahead: int = int(os.getenv("USAGE_PARTITION_MONTHS_AHEAD", "3"))
+    usage_log_retention_months: int = int(os.getenv("USAGE_LOG_RETENTION_MONTHS", "0"))
+    usage_log_retention_action: str = os.getenv("USAGE_LOG_RETENTION_ACTION", "detach").lower()
+    
+    # Seconds between checkpoints of a running automation task
+    checkpoint_interval_seconds: int = int(os.getenv("CHECKPOINT_INTERVAL_SECONDS", "30"))
+    # A running task's checkpoint not rewritten for this long belongs to a server that is gone
+    checkpoint_stale_seconds: int = int(os.getenv("CHECKPOINT_STALE_SECONDS", "120"))
+    
+    # Share of known-lead skips opened anyway to measure false positives
+    known_leads_audit_rate: float = float(os.getenv("KNOWN_LEADS_AUDIT_RATE", "0.02"))
+    
+    # Search result cache (answers repeat searches with a max_age from the leads table)
+    search_cache_ttl_seconds: int = int(os.getenv("SEARCH_CACHE_TTL_SECONDS", "604800"))
+    search_cache_max_entries: int = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "5000"))
+    
+    # Record bytes transferred and page CPU time on every scrape, not only in lean mode
+    scraper_measure_resources: bool = os.getenv("SCRAPER_MEASURE_RESOURCES", "false").lower() == "true"
+    
+    # Scraper wait upper bounds (waits end as soon as their condition holds)
+    scraper_initial_scroll_timeout_ms: int = int(os.getenv("SCRAPER_INITIAL_SCROLL_TIMEOUT_MS", "2000"))
+    scraper_scroll_timeout_ms: int = int(os.getenv("SCRAPER_SCROLL_TIMEOUT_MS", "5000"))
+    scraper_hydration_timeout_ms: int = int(os.getenv("SCRAPER_HYDRATION_TIMEOUT_MS", "15000"))
+    scraper_detail_timeout_ms: int = int(os.getenv("SCRAPER_DETAIL_TIMEOUT_MS", "10000"))
+    scraper_panel_timeout_ms: int = int(os.getenv("SCRAPER_PANEL_TIMEOUT_MS", "5000"))
+    
     @property
     def db_url(self) -> str:
         return f"postgresql://{self.db_user}:{self.db_password}@{self.db_host}:{self.db_port}/{self.db_name}"
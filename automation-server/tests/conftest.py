@@ -3,6 +3,7 @@ Pytest configuration and fixtures for Anvesh tests.
 """
 import pytest
 import os
+import threading
 from fastapi.testclient import TestClient
 
 # Set test environment variables BEFORE importing the app
@@ -55,3 +56,44 @@ def pro_api_key():
     key_data = create_api_key(name="Pro Test Key", tier="pro")
     yield key_data
     delete_api_key(key_data["id"])
+
+
+class FakeDatabase:
+    """
+    Stand-in batch function for the write-behind writers. `write_leads`
+    dedupes on business name like the leads table does; `write_events`
+    logs every event. A `gate` holds writes back until it is set.
+    """
+
+    def __init__(self, gate: threading.Event = None, fail: bool = False):
+        self.names = set()
+        self.events = []
+        self.batches = []
+        self.gate = gate
+        self.fail = fail
+
+    def _begin(self, items):
+        if self.gate:
+            self.gate.wait(5)
+        if self.fail:
+            raise RuntimeError("database down")
+        self.batches.append(len(items))
+
+    def write_leads(self, leads):
+        self._begin(leads)
+        added = []
+        for lead in leads:
+            added.append(lead["business_name"] not in self.names)
+            self.names.add(lead["business_name"])
+        return added
+
+    def write_events(self, events):
+        self._begin(events)
+        self.events.extend(events)
+        return len(events)
+
+
+@pytest.fixture
+def fake_database():
+    """Factory for fake batch databases: fake_database(gate=..., fail=...)."""
+    return FakeDatabase
@@ -62,7 +62,21 @@ class TestAdminAutomationAuth:
         assert data["success"] == True
         assert "tasks" in data["data"]
         assert "active_scraping" in data["data"]
-
+    
+    @pytest.mark.parametrize("method,path", [
+        ("GET", "/admin/automation/browser-pool"),
+        ("GET", "/admin/automation/workers"),
+        ("GET", "/admin/automation/lead-writer"),
+        ("GET", "/admin/automation/usage-writer"),
+        ("GET", "/admin/automation/db-pool"),
+        ("GET", "/admin/automation/auth-cache"),
+        ("GET", "/admin/automation/cache"),
+    ])
+    def test_admin_endpoint_requires_admin(self, client, method, path):
+        """Admin automation endpoints should require admin secret."""
+        response = client.request(method, path)
+        
+        assert response.status_code in [401, 403, 422]
 
 class TestAdminAutomationResponses:
     """Tests for admin automation response formats."""
@@ -97,6 +111,89 @@ class TestAdminAutomationResponses:
         assert "running" in stats["tasks"]
         assert "industries" in stats["active_scraping"]
         assert "locations" in stats["active_scraping"]
+    
+    def test_browser_pool_structure(self, client, admin_headers):
+        """Browser pool response should expose size, hit/miss and launch latency."""
+        response = client.get("/admin/automation/browser-pool", headers=admin_headers)
+        
+        assert response.status_code == 200
+        pool = response.json()["data"]
+        
+        assert "size" in pool
+        assert "hits" in pool
+        assert "misses" in pool
+        assert "avg_launch_ms" in pool
+        assert "browsers" in pool
+    
+    def test_workers_structure(self, client, admin_headers):
+        """Workers response should expose queue, failure counters and processes."""
+        response = client.get("/admin/automation/workers", headers=admin_headers)
+        
+        assert response.status_code == 200
+        workers = response.json()["data"]
+        
+        assert "running" in workers
+        assert "pending" in workers
+        assert "hangs" in workers
+        assert "restarts" in workers
+        assert "processes" in workers
+    
+    def test_lead_writer_structure(self, client, admin_headers):
+        """Lead writer response should expose queue depth, batches and backpressure."""
+        response = client.get("/admin/automation/lead-writer", headers=admin_headers)
+        
+        assert response.status_code == 200
+        writer = response.json()["data"]
+        
+        assert "running" in writer
+        assert "queued" in writer
+        assert "batches" in writer
+        assert "avg_batch_ms" in writer
+        assert "backpressure_waits" in writer
+    
+    def test_usage_writer_structure(self, client, admin_headers):
+        """Usage writer response should expose queue depth, batches and dropped events."""
+        response = client.get("/admin/automation/usage-writer", headers=admin_headers)
+        
+        assert response.status_code == 200
+        writer = response.json()["data"]
+        
+        assert "running" in writer
+        assert "queued" in writer
+        assert "batches" in writer
+        assert "dropped" in writer
+        assert "backpressure_waits" in writer
+    
+    def test_db_pool_structure(self, client, admin_headers):
+        """Database pool response should say whether the pool is in use."""
+        response = client.get("/admin/automation/db-pool", headers=admin_headers)
+        
+        assert response.status_code == 200
+        assert "enabled" in response.json()["data"]
+    
+    def test_auth_cache_structure(self, client, admin_headers):
+        """API key cache response should expose size and hit ratio."""
+        response = client.get("/admin/automation/auth-cache", headers=admin_headers)
+        
+        assert response.status_code == 200
+        cache = response.json()["data"]
+        
+        assert "entries" in cache
+        assert "hits" in cache
+        assert "misses" in cache
+        assert "hit_ratio" in cache
+    
+    def test_cache_structure(self, client, admin_headers):
+        """Cache response should expose size and hit ratio."""
+        response = client.get("/admin/automation/cache", headers=admin_headers)
+        
+        assert response.status_code == 200
+        cache = response.json()["data"]
+        
+        assert "entries" in cache
+        assert "lookups" in cache
+        assert "hits" in cache
+        assert "hit_ratio" in cache
 
 
 class TestAdminAutomationWorkflow:
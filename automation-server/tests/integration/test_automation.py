@@ -2,6 +2,7 @@
 Tests for automation routes with authentication.
 """
 import pytest
+import uuid
 
 
 class TestAutomationAuth:
@@ -146,3 +147,47 @@ class TestAutomationWorkflow:
         data = status_response.json()
         assert data["success"] == True
         assert data["data"]["id"] == task_id
+
+
+class TestAutomationResume:
+    """Tests for resuming a task from its checkpoint."""
+    
+    def test_resume_without_checkpoint(self, client, user_headers):
+        """Resuming a task with no checkpoint should return 404."""
+        response = client.post("/automation/tasks/non-existent-task-id/resume", headers=user_headers)
+        
+        assert response.status_code == 404
+        assert response.json()["success"] == False
+    
+    def test_resume_skips_completed_locations(self, client, user_headers, monkeypatch):
+        """Only unfinished locations should run again, without reopening finished places."""
+        from app.db import save_checkpoint, load_checkpoint
+        from app.routers import automation
+        
+        calls = []
+        def fake_scrape(location, seen_keys, resume_depth, stats, **kwargs):
+            calls.append((location, set(seen_keys), resume_depth))
+            stats["leads_saved"] += 1
+            yield from ()
+        monkeypatch.setattr(automation, "iter_google_maps", fake_scrape)
+        
+        task_id = str(uuid.uuid4())
+        save_checkpoint(task_id, "interrupted", {"industry": "gyms", "locations": ["A", "B"]}, {
+            "A": {"status": "completed", "leads": 4, "done_keys": ["a1"]},
+            "B": {"status": "stopped", "leads": 2, "done_keys": ["b1", "b2"], "feed_depth": 30},
+        })
+        
+        listed = client.get("/automation/checkpoints", headers=user_headers).json()["data"]["checkpoints"]
+        assert task_id in [c["task_id"] for c in listed]
+        
+        response = client.post(f"/automation/tasks/{task_id}/resume", headers=user_headers)
+        
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert (data["locations_completed"], data["locations_remaining"], data["places_done"]) == (1, 1, 3)
+        assert calls == [("B", {"b1", "b2"}, 30)]
+        
+        task = client.get(f"/automation/tasks/{task_id}", headers=user_headers).json()["data"]
+        assert task["status"] == "completed"
+        assert task["locations"]["B"]["leads"] == 3
+        assert load_checkpoint(task_id) is None
@@ -83,6 +83,48 @@ class TestAdminKeyRoutes:
         assert "total_requests" in data["data"]
         assert "monthly_leads" in data["data"]
     
+    def test_reconcile_usage_for_key(self, client, admin_headers, test_api_key):
+        """Admin should be able to rebuild a key's usage counters."""
+        response = client.post(
+            f"/admin/usage/reconcile?key_id={test_api_key['id']}",
+            headers=admin_headers
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["success"] == True
+        assert "counters" in data["data"]
+        assert data["data"]["drifted"] == 0
+    
+    def test_reconcile_usage_requires_admin(self, client):
+        """Rebuilding usage counters should require admin secret."""
+        response = client.post("/admin/usage/reconcile")
+        
+        assert response.status_code in [401, 403, 422]
+    
+    def test_list_usage_partitions(self, client, admin_headers):
+        """Admin should see a usage log partition for this month."""
+        response = client.get("/admin/usage/partitions", headers=admin_headers)
+        
+        assert response.status_code == 200
+        partitions = response.json()["data"]
+        assert len(partitions) >= 1
+        assert "estimated_rows" in partitions[0]
+    
+    def test_maintain_usage_partitions(self, client, admin_headers):
+        """Admin should be able to run partition maintenance."""
+        response = client.post("/admin/usage/partitions/maintain", headers=admin_headers)
+        
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert "created" in data
+        assert "removed" in data
+    
+    def test_usage_partitions_require_admin(self, client):
+        """Partition endpoints should require admin secret."""
+        assert client.get("/admin/usage/partitions").status_code in [401, 403, 422]
+        assert client.post("/admin/usage/partitions/maintain").status_code in [401, 403, 422]
+    
     def test_delete_api_key(self, client, admin_headers):
         """Admin should be able to delete API keys."""
         # Create a key to delete
@@ -1,15 +1,27 @@
 """
 Tests for API key database operations.
 """
+import asyncio
+import time
 import pytest
+from app.db.database import get_async_connection
 from app.db.api_keys import (
     generate_api_key,
     create_api_key,
+    create_api_key_async,
     validate_api_key,
+    validate_api_key_async,
     get_api_key_by_id,
+    get_api_key_by_id_async,
+    list_api_keys_async,
+    revoke_api_key_async,
     delete_api_key,
+    delete_api_key_async,
     log_usage,
-    get_usage_stats
+    get_usage_stats,
+    get_usage_stats_async,
+    check_quota,
+    check_quota_async
 )
 from config import settings
 
@@ -89,3 +101,71 @@ class TestUsageLogging:
         
         # Cleanup
         delete_api_key(key_data["id"])
+
+
+class TestAsyncAPIKeys:
+    """Tests for the async twins used by async route handlers."""
+    
+    def test_async_matches_sync(self):
+        """Async functions should return what their sync versions return."""
+        key_data = create_api_key(name="Async Test", tier="free")
+        log_usage(key_data["id"], "/test-endpoint", 4)
+        
+        async def read():
+            return (
+                await validate_api_key_async(key_data["key"]),
+                await get_api_key_by_id_async(key_data["id"]),
+                await get_usage_stats_async(key_data["id"]),
+                await check_quota_async(key_data["id"], 4),
+                await list_api_keys_async(),
+            )
+        
+        validated, by_id, usage, quota, keys = asyncio.run(read())
+        
+        assert validated == validate_api_key(key_data["key"])
+        assert by_id == get_api_key_by_id(key_data["id"])
+        assert usage == get_usage_stats(key_data["id"])
+        assert quota is check_quota(key_data["id"], 4) is False
+        assert key_data["id"] in [key["id"] for key in keys]
+        
+        delete_api_key(key_data["id"])
+    
+    def test_async_create_revoke_delete(self):
+        """Keys created and revoked through the async layer should behave like sync ones."""
+        async def lifecycle():
+            key_data = await create_api_key_async(name="Async Lifecycle", tier="pro")
+            valid = await validate_api_key_async(key_data["key"])
+            revoked = await revoke_api_key_async(key_data["id"])
+            after_revoke = await validate_api_key_async(key_data["key"])
+            deleted = await delete_api_key_async(key_data["id"])
+            return key_data, valid, revoked, after_revoke, deleted
+        
+        key_data, valid, revoked, after_revoke, deleted = asyncio.run(lifecycle())
+        
+        assert key_data["key"].startswith(settings.api_key_prefix)
+        assert valid["id"] == key_data["id"]
+        assert revoked is True
+        assert after_revoke is None
+        assert deleted is True
+        assert get_api_key_by_id(key_data["id"]) is None
+    
+    def test_slow_query_does_not_block_event_loop(self):
+        """A slow query should not hold up other coroutines on the same loop."""
+        key_data = create_api_key(name="Async Concurrency", tier="free")
+        
+        async def slow_query():
+            async with get_async_connection() as conn:
+                await conn.execute("SELECT pg_sleep(1)")
+        
+        async def run():
+            slow = asyncio.create_task(slow_query())
+            await asyncio.sleep(0.1)
+            start = time.perf_counter()
+            await validate_api_key_async(key_data["key"])
+            fast_seconds = time.perf_counter() - start
+            await slow
+            return fast_seconds
+        
+        assert asyncio.run(run()) < 0.8
+        
+        delete_api_key(key_data["id"])
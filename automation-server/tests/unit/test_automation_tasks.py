@@ -0,0 +1,317 @@
+"""
+Tests for running the locations of an automation task.
+"""
+import signal
+import threading
+import time
+import uuid
+import pytest
+from app.db import load_checkpoint, delete_checkpoint
+from app.models.automation import ScrapeRequest, TaskStatus
+from app import main
+from app.routers import automation
+from app.routers.automation import TASKS, TASK_PROGRESS, background_task_scraper, new_location_entry
+from app.services.scraper import new_scrape_stats
+
+# Tasks made by the current test, whose checkpoints are removed afterwards
+MADE_TASKS = []
+
+
+@pytest.fixture(autouse=True)
+def cleanup_checkpoints():
+    yield
+    while MADE_TASKS:
+        task_id = MADE_TASKS.pop()
+        TASK_PROGRESS.pop(task_id, None)
+        delete_checkpoint(task_id)
+
+
+def make_task(**overrides):
+    request = ScrapeRequest(**{"industry": "bakery", "locations": ["A", "B", "C", "D"], **overrides})
+    task_id = str(uuid.uuid4())
+    TASKS[task_id] = {
+        "id": task_id,
+        "config": request.model_dump(),
+        "running": True,
+        "stop": False,
+        "status": TaskStatus.IDLE,
+        "error": None,
+        "stats": new_scrape_stats(),
+        "locations": {loc: new_location_entry() for loc in request.locations}
+    }
+    MADE_TASKS.append(task_id)
+    return task_id, request
+
+
+class TestParallelLocations:
+    """Tests for location-level parallelism."""
+
+    def test_locations_run_in_parallel(self, monkeypatch):
+        """Locations should overlap up to max_parallel_locations."""
+        active, peak, lock = [0], [0], threading.Lock()
+
+        def fake_scrape(location, stats, **kwargs):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            stats["leads_saved"] += len(location)
+            with lock:
+                active[0] -= 1
+            yield from ()
+
+        monkeypatch.setattr(automation, "iter_google_maps", fake_scrape)
+        task_id, request = make_task(max_parallel_locations=2)
+
+        background_task_scraper(task_id, request)
+
+        task = TASKS.pop(task_id)
+        assert peak[0] == 2
+        assert task["status"] == TaskStatus.COMPLETED
+        assert all(entry["status"] == TaskStatus.COMPLETED for entry in task["locations"].values())
+        assert all(entry["leads"] == 1 for entry in task["locations"].values())
+        assert task["stats"]["leads_saved"] == 4
+
+    def test_stop_reaches_all_locations(self, monkeypatch):
+        """A stop should end in-flight locations and skip queued ones."""
+        started = threading.Barrier(2)
+
+        def fake_scrape(stop_signal, **kwargs):
+            started.wait(timeout=5)
+            TASKS[task_id]["stop"] = True
+            while not stop_signal():
+                time.sleep(0.01)
+            yield from ()
+
+        monkeypatch.setattr(automation, "iter_google_maps", fake_scrape)
+        task_id, request = make_task(max_parallel_locations=2)
+
+        background_task_scraper(task_id, request)
+
+        task = TASKS.pop(task_id)
+        assert task["status"] == TaskStatus.STOPPED
+        assert all(entry["status"] == TaskStatus.STOPPED for entry in task["locations"].values())
+
+    def test_failed_location_does_not_stop_others(self, monkeypatch):
+        """One failing location should be reported while the rest complete."""
+        def fake_scrape(location, **kwargs):
+            if location == "B":
+                raise RuntimeError("browser crashed")
+            yield from ()
+
+        monkeypatch.setattr(automation, "iter_google_maps", fake_scrape)
+        task_id, request = make_task(max_parallel_locations=4)
+
+        background_task_scraper(task_id, request)
+
+        task = TASKS.pop(task_id)
+        assert task["status"] == TaskStatus.ERROR
+        assert task["error"] == "B: browser crashed"
+        assert task["locations"]["B"]["status"] == TaskStatus.ERROR
+        assert task["locations"]["A"]["status"] == TaskStatus.COMPLETED
+
+
+class TestTiledLocations:
+    """Tests for fanning a location out into tiles."""
+
+    def test_saturated_tiles_are_subdivided(self, monkeypatch):
+        """Tiles with a full feed should be searched again as four smaller tiles."""
+        viewports = []
+
+        def fake_scrape(viewport, seen_keys, stats, **kwargs):
+            viewports.append(viewport)
+            seen_keys.add(len(viewports))
+            stats["feed_cards"] = 120 if viewport["depth"] == 0 and len(viewports) == 1 else 30
+            yield from ()
+
+        monkeypatch.setattr(automation, "iter_google_maps", fake_scrape)
+        monkeypatch.setattr(automation.settings, "tile_size_km", 100)
+        task_id, request = make_task(tiling=True, locations=["Toronto"])
+
+        background_task_scraper(task_id, request)
+
+        entry = TASKS.pop(task_id)["locations"]["Toronto"]
+        assert entry["status"] == TaskStatus.COMPLETED
+        assert entry["tiles"] == {"planned": 5, "done": 5, "subdivided": 1}
+        assert [v["depth"] for v in viewports] == [0, 1, 1, 1, 1]
+
+    def test_unknown_location_is_one_search(self, monkeypatch):
+        """Locations missing from the gazetteer should fall back to one untiled search."""
+        viewports = []
+
+        def fake_scrape(viewport, **kwargs):
+            viewports.append(viewport)
+            yield from ()
+
+        monkeypatch.setattr(automation, "iter_google_maps", fake_scrape)
+        task_id, request = make_task(tiling=True, locations=["Atlantis"])
+
+        background_task_scraper(task_id, request)
+
+        assert TASKS.pop(task_id)["locations"]["Atlantis"]["tiles"] is None
+        assert viewports == [None]
+
+
+class TestCheckpoints:
+    """Tests for checkpointing a task's progress."""
+
+    def test_interrupted_task_checkpoints_progress(self, monkeypatch):
+        """A shutdown should leave a checkpoint of finished places, not in-flight ones."""
+        def fake_scrape(location, stop_signal, stats, seen_keys, done_keys, **kwargs):
+            if location == "A":
+                seen_keys.update({"a1", "a2"})
+                done_keys.update({"a1", "a2"})
+                stats["leads_saved"] += 2
+                return
+            seen_keys.update({"b1", "b2"})
+            done_keys.add("b1")
+            stats["feed_cards"] = 40
+            automation.interrupt_running_tasks()
+            while not stop_signal():
+                time.sleep(0.01)
+            yield from ()
+
+        monkeypatch.setattr(automation, "iter_google_maps", fake_scrape)
+        task_id, request = make_task(locations=["A", "B"])
+
+        background_task_scraper(task_id, request)
+
+        assert TASKS.pop(task_id)["status"] == TaskStatus.INTERRUPTED
+        checkpoint = load_checkpoint(task_id)
+        assert checkpoint["status"] == "interrupted"
+        assert checkpoint["request"]["locations"] == ["A", "B"]
+        a, b = checkpoint["locations"]["A"], checkpoint["locations"]["B"]
+        assert (a["status"], a["leads"], a["done_keys"]) == ("completed", 2, ["a1", "a2"])
+        assert (b["status"], b["done_keys"], b["feed_depth"]) == ("stopped", ["b1"], 40)
+
+    def test_shutdown_handlers_are_restored(self):
+        """Each lifespan should wrap the original signal handlers, not the previous wrapper."""
+        original = signal.getsignal(signal.SIGTERM)
+        for _ in range(2):
+            wrapped = main.checkpoint_on_shutdown_signals()
+            assert wrapped[signal.SIGTERM] is original
+            assert signal.getsignal(signal.SIGTERM) is not original
+            main.restore_signal_handlers(wrapped)
+
+        assert signal.getsignal(signal.SIGTERM) is original
+
+    def test_completed_task_drops_checkpoint(self, monkeypatch):
+        """A task that completes has nothing to resume."""
+        monkeypatch.setattr(automation, "iter_google_maps", lambda **kwargs: iter(()))
+        task_id, request = make_task()
+
+        background_task_scraper(task_id, request)
+
+        assert TASKS.pop(task_id)["status"] == TaskStatus.COMPLETED
+        assert load_checkpoint(task_id) is None
+
+    def test_resumed_tiles_skip_searched_ones(self, monkeypatch):
+        """Searched tiles are skipped, saturated ones expand into their children."""
+        viewports = []
+
+        def fake_scrape(viewport, resume_depth, seen_keys, **kwargs):
+            viewports.append((viewport, resume_depth, set(seen_keys)))
+            yield from ()
+
+        monkeypatch.setattr(automation, "iter_google_maps", fake_scrape)
+        monkeypatch.setattr(automation.settings, "tile_size_km", 100)
+        task_id, request = make_task(tiling=True, locations=["Toronto"])
+        (root,) = automation.plan_tiles(automation.lookup_bounds("Toronto"), 100)
+        children = automation.subdivide(root)
+        TASK_PROGRESS[task_id] = {"Toronto": automation.new_location_progress({
+            "done_keys": ["x"],
+            "tiles_done": [root, children[0]],
+            "tiles_saturated": [root],
+            "tile_depths": {automation.tile_label(children[1]): 60},
+        })}
+
+        background_task_scraper(task_id, request)
+
+        entry = TASKS.pop(task_id)["locations"]["Toronto"]
+        assert entry["status"] == TaskStatus.COMPLETED
+        assert entry["tiles"] == {"planned": 5, "done": 5, "subdivided": 1}
+        assert [v for v, _, _ in viewports] == children[1:]
+        assert [depth for _, depth, _ in viewports] == [60, 0, 0]
+        assert all(seen == {"x"} for _, _, seen in viewports)
+
+    def test_tiles_share_the_location_limit(self, monkeypatch):
+        """Parallel tiles should stop once the location's limit is reached between them."""
+        started = threading.Barrier(2)
+        first_counted = threading.Event()
+        saved = []
+
+        def fake_scrape(viewport, stop_signal, total, stats, **kwargs):
+            first = started.wait(timeout=5) == 0
+            if not first:
+                first_counted.wait(timeout=5)
+            for i in range(total):
+                if stop_signal():
+                    return
+                saved.append(viewport)
+                stats["leads_saved"] += 1
+                yield {"place_id": f"{automation.tile_label(viewport)}-{i}", "is_new": True}
+                # Resumed once the task has counted the lead
+                first_counted.set()
+
+        monkeypatch.setattr(automation, "iter_google_maps", fake_scrape)
+        monkeypatch.setattr(automation.settings, "tile_size_km", 10)
+        assert len(automation.plan_tiles(automation.lookup_bounds("Toronto"), 10)) >= 2
+        task_id, request = make_task(tiling=True, locations=["Toronto"], limit_per_location=1, max_parallel_locations=2)
+
+        background_task_scraper(task_id, request)
+
+        state = automation.checkpoint_state(task_id)["Toronto"]
+        entry = TASKS.pop(task_id)["locations"]["Toronto"]
+        assert len(saved) == 1
+        assert entry["leads"] == 1
+        assert entry["status"] == TaskStatus.COMPLETED
+        # Tiles skipped once the limit was reached are not reported as searched
+        assert entry["tiles"]["done"] == len(state["tiles_done"]) == 2
+        assert entry["tiles"]["planned"] > 2
+
+
+class TestSearchCache:
+    """Tests for answering locations from the search cache."""
+
+    def test_repeat_search_is_served_from_cache(self, monkeypatch):
+        """A completed search should answer a repeat within max_age without scraping."""
+        location = f"Cacheville {uuid.uuid4()}"
+        calls = []
+
+        def fake_scrape(location, stats, **kwargs):
+            calls.append(location)
+            stats["leads_saved"] += 1
+            yield {"place_id": "0x1:0x2"}
+            yield {"place_id": "0x3:0x4"}
+
+        monkeypatch.setattr(automation, "iter_google_maps", fake_scrape)
+        monkeypatch.setattr(automation, "count_leads_by_place_ids", lambda place_ids: len(place_ids))
+        task_id, request = make_task(locations=[location])
+        background_task_scraper(task_id, request)
+        TASKS.pop(task_id)
+
+        task_id, request = make_task(locations=[location], max_age=3600)
+        background_task_scraper(task_id, request)
+
+        entry = TASKS.pop(task_id)["locations"][location]
+        assert calls == [location]
+        assert entry["status"] == TaskStatus.COMPLETED
+        assert entry["leads"] == 2
+        assert entry["cache"]["hit"] is True
+
+    def test_without_max_age_always_scrapes(self, monkeypatch):
+        """Requests without max_age should never be answered from the cache."""
+        calls = []
+
+        def fake_scrape(location, **kwargs):
+            calls.append(location)
+            yield from ()
+
+        monkeypatch.setattr(automation, "iter_google_maps", fake_scrape)
+        monkeypatch.setattr(automation, "get_cached_search", lambda *args: pytest.fail("cache consulted"))
+        task_id, request = make_task(locations=["Nocache"])
+
+        background_task_scraper(task_id, request)
+
+        assert TASKS.pop(task_id)["locations"]["Nocache"]["cache"] is None
+        assert calls == ["Nocache"]
@@ -0,0 +1,106 @@
+"""
+Tests for bulk lead ingestion through COPY and a set-based merge.
+"""
+import uuid
+import pytest
+from app.db.database import get_connection, bulk_insert_leads
+
+
+@pytest.fixture
+def address():
+    """Unique address shared by a test's leads, deleted afterwards."""
+    value = f"1 Test St {uuid.uuid4()}"
+    yield value
+    with get_connection() as conn:
+        conn.execute("DELETE FROM leads WHERE address = %s", (value,))
+
+
+def make_lead(name, address, **fields):
+    return {
+        "business_name": name,
+        "industry": "bakery",
+        "category": "Bakery",
+        "location": "Testville",
+        "address": address,
+        "rating": "4.5",
+        "review_count": 12,
+        "is_claimed": False,
+        "has_website": False,
+        "website_url": None,
+        "phone": "+1 555 0100",
+        "place_id": f"0x{uuid.uuid4().hex[:8]}",
+        **fields,
+    }
+
+
+def stored(address):
+    with get_connection() as conn:
+        return conn.execute(
+            "SELECT business_name, rating, review_count, place_id FROM leads WHERE address = %s ORDER BY business_name",
+            (address,)
+        ).fetchall()
+
+
+class TestBulkInsertLeads:
+    """Tests for bulk_insert_leads."""
+
+    def test_inserts_and_reports_new_rows(self, address):
+        """Every new lead should be stored with its fields and reported as new."""
+        leads = [make_lead(name, address) for name in ["A", "B", "C"]]
+
+        assert bulk_insert_leads(leads) == [True, True, True]
+        rows = stored(address)
+        assert [row["business_name"] for row in rows] == ["A", "B", "C"]
+        assert float(rows[0]["rating"]) == 4.5
+        assert rows[0]["review_count"] == 12
+        assert rows[0]["place_id"] == leads[0]["place_id"]
+
+    def test_existing_rows_are_not_new(self, address):
+        """Leads already in the table should be reported as duplicates."""
+        bulk_insert_leads([make_lead("A", address)])
+
+        assert bulk_insert_leads([make_lead("A", address), make_lead("B", address)]) == [False, True]
+
+    def test_duplicates_within_batch(self, address):
+        """Only the first of repeated leads in one batch should be new and stored."""
+        first = make_lead("A", address, review_count=1)
+        again = make_lead("A", address, review_count=2)
+
+        assert bulk_insert_leads([first, make_lead("B", address), again]) == [True, True, False]
+        assert stored(address)[0]["review_count"] == 1
+
+    def test_null_addresses_are_not_duplicates(self):
+        """Leads without an address should all be stored, as one-by-one inserts would."""
+        name = f"No Address {uuid.uuid4()}"
+        try:
+            assert bulk_insert_leads([make_lead(name, None), make_lead(name, None)]) == [True, True]
+            with get_connection() as conn:
+                count = conn.execute(
+                    "SELECT COUNT(*) AS count FROM leads WHERE business_name = %s", (name,)
+                ).fetchone()["count"]
+            assert count == 2
+        finally:
+            with get_connection() as conn:
+                conn.execute("DELETE FROM leads WHERE business_name = %s", (name,))
+
+    def test_empty_address_is_not_null(self):
+        """A lead with an empty address should not be matched to one without an address."""
+        name = f"Empty Address {uuid.uuid4()}"
+        try:
+            bulk_insert_leads([make_lead(name, "")])
+
+            assert bulk_insert_leads([make_lead(name, ""), make_lead(name, None)]) == [False, True]
+        finally:
+            with get_connection() as conn:
+                conn.execute("DELETE FROM leads WHERE business_name = %s", (name,))
+
+    def test_bad_row_inserts_nothing(self, address):
+        """A lead the table rejects should fail the whole batch."""
+        with pytest.raises(Exception):
+            bulk_insert_leads([make_lead("A", address), make_lead("B", address, review_count="many")])
+
+        assert stored(address) == []
+
+    def test_empty_batch(self):
+        """An empty batch should not touch the database."""
+        assert bulk_insert_leads([]) == []
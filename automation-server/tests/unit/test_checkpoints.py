@@ -0,0 +1,78 @@
+"""
+Tests for task checkpoint database operations.
+"""
+import uuid
+import pytest
+from app.db.database import get_connection
+from app.db.checkpoints import (
+    save_checkpoint,
+    load_checkpoint,
+    list_checkpoints,
+    mark_interrupted,
+    delete_checkpoint
+)
+
+
+@pytest.fixture
+def task_id():
+    task_id = str(uuid.uuid4())
+    yield task_id
+    delete_checkpoint(task_id)
+
+
+class TestCheckpoints:
+    """Tests for saving and loading task checkpoints."""
+
+    def test_save_and_load(self, task_id):
+        """A saved checkpoint should load back unchanged."""
+        locations = {"Mumbai": {"status": "running", "leads": 3, "done_keys": ["0x1:0x2"], "feed_depth": 40}}
+        assert save_checkpoint(task_id, "running", {"industry": "gyms", "locations": ["Mumbai"]}, locations)
+
+        checkpoint = load_checkpoint(task_id)
+        assert checkpoint["status"] == "running"
+        assert checkpoint["request"]["industry"] == "gyms"
+        assert checkpoint["locations"] == locations
+
+    def test_save_overwrites(self, task_id):
+        """Saving again should replace the previous checkpoint."""
+        save_checkpoint(task_id, "running", {"industry": "gyms"}, {"A": {"leads": 1}})
+        save_checkpoint(task_id, "stopped", {"industry": "gyms"}, {"A": {"leads": 5}})
+
+        checkpoint = load_checkpoint(task_id)
+        assert checkpoint["status"] == "stopped"
+        assert checkpoint["locations"]["A"]["leads"] == 5
+
+    def test_list_summarizes(self, task_id):
+        """Listings should count locations without returning the seen ids."""
+        save_checkpoint(task_id, "stopped", {"industry": "gyms"}, {"A": {"status": "completed"}, "B": {"status": "stopped"}})
+
+        (summary,) = [c for c in list_checkpoints(["stopped"]) if c["task_id"] == task_id]
+        assert summary["industry"] == "gyms"
+        assert (summary["locations"], summary["locations_completed"]) == (2, 1)
+        assert "done_keys" not in str(summary)
+
+    def test_mark_interrupted(self, task_id):
+        """Checkpoints left running by a dead server should become interrupted."""
+        save_checkpoint(task_id, "running", {"industry": "gyms"}, {})
+
+        assert mark_interrupted(["idle", "running"], "interrupted") >= 1
+        assert load_checkpoint(task_id)["status"] == "interrupted"
+
+    def test_mark_interrupted_skips_live_tasks(self, task_id):
+        """Recently rewritten checkpoints may belong to another live server and stay running."""
+        save_checkpoint(task_id, "running", {"industry": "gyms"}, {})
+
+        mark_interrupted(["idle", "running"], "interrupted", stale_seconds=60)
+        assert load_checkpoint(task_id)["status"] == "running"
+
+        with get_connection() as conn:
+            conn.execute(
+                "UPDATE task_checkpoints SET updated_at = updated_at - INTERVAL '2 minutes' WHERE task_id = %s",
+                (task_id,)
+            )
+        mark_interrupted(["idle", "running"], "interrupted", stale_seconds=60)
+        assert load_checkpoint(task_id)["status"] == "interrupted"
+
+    def test_load_missing(self):
+        """Unknown tasks have no checkpoint."""
+        assert load_checkpoint(str(uuid.uuid4())) is None
@@ -1,6 +1,6 @@
 import pytest
 from unittest.mock import MagicMock, patch
-from app.db import insert_lead
+from app.db import insert_lead, insert_leads
 
 # Mock lead data
 mock_lead = {
@@ -50,3 +50,25 @@ def test_insert_lead_duplicate(mock_get_connection):
     result = insert_lead(mock_lead)
     
     assert result is False
+
+@patch("app.db.database.bulk_insert_leads")
+def test_insert_leads_batch(mock_bulk_insert_leads):
+    """Test inserting a batch reports which leads were new."""
+    mock_bulk_insert_leads.return_value = [True, False]
+    
+    result = insert_leads([mock_lead, mock_lead])
+    
+    assert result == [True, False]
+    mock_bulk_insert_leads.assert_called_once()
+
+@patch("app.db.database.insert_lead")
+@patch("app.db.database.bulk_insert_leads")
+def test_insert_leads_falls_back_to_single_inserts(mock_bulk_insert_leads, mock_insert_lead):
+    """Test a failed batch is retried lead by lead."""
+    mock_bulk_insert_leads.side_effect = Exception("batch failed")
+    mock_insert_lead.side_effect = [True, False]
+    
+    result = insert_leads([mock_lead, mock_lead])
+    
+    assert result == [True, False]
+    assert mock_insert_lead.call_count == 2
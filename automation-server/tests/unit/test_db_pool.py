@@ -0,0 +1,121 @@
+"""
+Tests for the shared database connection pool.
+"""
+import asyncio
+import pytest
+from app.db import database
+from app.db.database import (
+    get_connection,
+    open_pool,
+    close_pool,
+    get_pool_stats,
+    get_async_connection,
+    open_async_pool,
+    close_async_pool,
+    get_async_pool_stats,
+)
+from config import settings
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """Open a small pool for the test and close it afterwards."""
+    monkeypatch.setattr(settings, "db_pool_min_size", 1)
+    monkeypatch.setattr(settings, "db_pool_max_size", 2)
+    monkeypatch.setattr(settings, "db_pool_timeout_seconds", 2)
+    open_pool()
+    yield database._pool
+    close_pool()
+
+
+class TestConnectionPool:
+    """Tests for opening, using and closing the pool."""
+
+    def test_connections_come_from_pool(self, pool):
+        """get_connection should hand out pooled connections with dict rows."""
+        with get_connection() as conn:
+            first = conn.info.backend_pid
+            assert conn.execute("SELECT 1 AS one").fetchone() == {"one": 1}
+        with get_connection() as conn:
+            assert conn.info.backend_pid == first
+
+    def test_failed_transaction_is_rolled_back(self, pool):
+        """A connection returned after an error should be clean for the next caller."""
+        with pytest.raises(Exception):
+            with get_connection() as conn:
+                conn.execute("SELECT * FROM no_such_table")
+        with get_connection() as conn:
+            assert conn.execute("SELECT 1 AS one").fetchone() == {"one": 1}
+
+    def test_stats_report_usage_and_waits(self, pool):
+        """Stats should show connections in use and acquire requests."""
+        with get_connection():
+            stats = get_pool_stats()
+            assert stats["enabled"] is True
+            assert stats["in_use"] == 1
+            assert stats["utilization"] == 0.5
+        stats = get_pool_stats()
+        assert stats["in_use"] == 0
+        assert stats["requests"] >= 1
+        assert stats["max_size"] == 2
+
+    def test_close_falls_back_to_direct_connections(self, pool):
+        """After the pool closes, calls should open their own connections."""
+        close_pool()
+
+        assert get_pool_stats() == {"enabled": False}
+        with get_connection() as conn:
+            assert conn.execute("SELECT 1 AS one").fetchone() == {"one": 1}
+
+    def test_unreachable_database_keeps_direct_connections(self, monkeypatch):
+        """A pool that can't connect should not be installed."""
+        monkeypatch.setitem(database.DB_CONFIG, "port", "1")
+        monkeypatch.setattr(settings, "db_pool_min_size", 1)
+        monkeypatch.setattr(settings, "db_pool_timeout_seconds", 0.5)
+        open_pool()
+
+        assert database._pool is None
+
+
+class TestAsyncConnectionPool:
+    """Tests for the pool used by async route handlers."""
+
+    def test_async_connections_come_from_pool(self, monkeypatch):
+        """On the loop that opened it, async connections should be pooled."""
+        monkeypatch.setattr(settings, "db_pool_min_size", 1)
+        monkeypatch.setattr(settings, "db_pool_max_size", 2)
+
+        async def run():
+            await open_async_pool()
+            try:
+                pids = []
+                for _ in range(2):
+                    async with get_async_connection() as conn:
+                        row = await (await conn.execute("SELECT pg_backend_pid() AS pid")).fetchone()
+                        pids.append(row["pid"])
+                return pids, get_async_pool_stats()
+            finally:
+                await close_async_pool()
+
+        pids, stats = asyncio.run(run())
+
+        assert pids[0] == pids[1]
+        assert stats["enabled"] is True
+        assert stats["requests"] >= 2
+        assert get_async_pool_stats() == {"enabled": False}
+
+    def test_other_loops_connect_directly(self, monkeypatch):
+        """A loop other than the pool's should get its own connection."""
+        monkeypatch.setattr(settings, "db_pool_min_size", 1)
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(open_async_pool())
+        try:
+            async def query():
+                async with get_async_connection() as conn:
+                    return await (await conn.execute("SELECT 1 AS one")).fetchone()
+
+            assert asyncio.run(query()) == {"one": 1}
+            assert get_async_pool_stats()["requests"] == 0
+        finally:
+            loop.run_until_complete(close_async_pool())
+            loop.close()
@@ -0,0 +1,116 @@
+"""
+Tests for the cache of validated API keys.
+"""
+from datetime import datetime, timedelta
+from app.db.key_cache import KeyCache, key_cache
+from app.db.api_keys import (
+    create_api_key,
+    validate_api_key,
+    revoke_api_key,
+    delete_api_key,
+    hash_api_key,
+)
+
+
+def record(key_id, expires_at=None):
+    return {"id": key_id, "name": f"Key {key_id}", "tier": "free", "monthly_limit": 100, "expires_at": expires_at}
+
+
+class TestKeyCache:
+    """Tests for TTL, LRU eviction, expiry and invalidation."""
+
+    def test_hit_after_put(self):
+        """A cached key should be served and counted as a hit."""
+        cache = KeyCache()
+        assert cache.get("h1") is None
+        cache.put("h1", record(1), cache.generation())
+
+        assert cache.get("h1")["id"] == 1
+        assert cache.get_stats()["hits"] == 1
+        assert cache.get_stats()["misses"] == 1
+
+    def test_ttl(self):
+        """Entries older than the TTL should be looked up again."""
+        cache = KeyCache(ttl_seconds=0.05)
+        cache.put("h1", record(1), cache.generation())
+        cache._entries["h1"] = (record(1), cache._entries["h1"][1] - 1)
+
+        assert cache.get("h1") is None
+        assert cache.get_stats()["expired"] == 1
+
+    def test_lru_eviction(self):
+        """Beyond the size cap the least recently used key should go."""
+        cache = KeyCache(max_entries=2)
+        for i in (1, 2):
+            cache.put(f"h{i}", record(i), cache.generation())
+        cache.get("h1")
+        cache.put("h3", record(3), cache.generation())
+
+        assert cache.get("h2") is None
+        assert cache.get("h1") is not None
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_key_expiry_is_honoured(self):
+        """A key past its expires_at should be rejected even within the TTL."""
+        cache = KeyCache()
+        cache.put("h1", record(1, expires_at=datetime.now() - timedelta(seconds=1)), cache.generation())
+
+        assert cache.get("h1") is None
+
+    def test_invalidate_by_id(self):
+        """Invalidating a key id should drop its entry."""
+        cache = KeyCache()
+        cache.put("h1", record(1), cache.generation())
+
+        assert cache.invalidate(1) is True
+        assert cache.get("h1") is None
+
+    def test_lookup_racing_invalidation_is_not_cached(self):
+        """A record read before a revocation must not be cached after it."""
+        cache = KeyCache()
+        generation = cache.generation()
+        cache.invalidate(1)
+        cache.put("h1", record(1), generation)
+
+        assert cache.get("h1") is None
+
+    def test_zero_ttl_disables_cache(self):
+        cache = KeyCache(ttl_seconds=0)
+        cache.put("h1", record(1), cache.generation())
+
+        assert cache.get("h1") is None
+
+
+class TestValidateWithCache:
+    """Tests for validate_api_key going through the shared cache."""
+
+    def test_second_validation_is_a_hit(self):
+        """Polling with the same key should not need another lookup."""
+        key_data = create_api_key(name="Cache Test", tier="free")
+        validate_api_key(key_data["key"])
+        hits = key_cache.get_stats()["hits"]
+
+        assert validate_api_key(key_data["key"])["id"] == key_data["id"]
+        assert key_cache.get_stats()["hits"] == hits + 1
+
+        delete_api_key(key_data["id"])
+
+    def test_revoke_evicts(self):
+        """A revoked key should be rejected on the very next request."""
+        key_data = create_api_key(name="Revoke Cache Test", tier="free")
+        assert validate_api_key(key_data["key"]) is not None
+
+        revoke_api_key(key_data["id"])
+
+        assert key_cache.get(hash_api_key(key_data["key"])) is None
+        assert validate_api_key(key_data["key"]) is None
+        delete_api_key(key_data["id"])
+
+    def test_delete_evicts(self):
+        """A deleted key should be rejected on the very next request."""
+        key_data = create_api_key(name="Delete Cache Test", tier="free")
+        assert validate_api_key(key_data["key"]) is not None
+
+        delete_api_key(key_data["id"])
+
+        assert validate_api_key(key_data["key"]) is None
@@ -0,0 +1,64 @@
+"""
+Tests for the known-lead membership check.
+"""
+from app.services import known_leads as known_leads_module
+from app.services.known_leads import KnownLeads, name_key, known_leads_report
+
+
+def fake_identities(rows):
+    def get_lead_identities(after_id=0):
+        return [row for row in rows if row["id"] > after_id]
+    return get_lead_identities
+
+
+class TestKnownLeads:
+    """Tests for loading and checking known leads."""
+
+    def test_place_ids_and_legacy_names(self, monkeypatch):
+        """Leads with a place id match on it; older leads match on name and location."""
+        monkeypatch.setattr(known_leads_module, "get_lead_identities", fake_identities([
+            {"id": 1, "place_id": "0x1:0x2", "business_name": "Sweet Bakery", "location": "Toronto"},
+            {"id": 2, "place_id": None, "business_name": "Old Bakery", "location": "Toronto"},
+        ]))
+        known = KnownLeads()
+        known.refresh()
+
+        assert known.contains("0x1:0x2", "Renamed Bakery", "Toronto")
+        assert not known.contains("0x9:0x9", "Sweet Bakery", "Toronto")
+        assert known.contains("0x3:0x4", "old  bakery", "toronto")
+        assert not known.contains("0x3:0x4", "Old Bakery", "Mumbai")
+
+    def test_refresh_only_loads_new_rows(self, monkeypatch):
+        """Refreshes should pick up rows inserted since the last one."""
+        rows = [{"id": 1, "place_id": "a", "business_name": "A", "location": "X"}]
+        monkeypatch.setattr(known_leads_module, "get_lead_identities", fake_identities(rows))
+        known = KnownLeads()
+        known.refresh()
+        rows.append({"id": 5, "place_id": "b", "business_name": "B", "location": "X"})
+        known.refresh()
+
+        assert known.contains("b", "B", "X")
+        assert known.get_stats()["last_lead_id"] == 5
+        assert known.get_stats()["place_ids"] == 2
+
+    def test_add(self):
+        """Leads saved by this process should be known straight away."""
+        known = KnownLeads()
+        known.add("0x5:0x6", "New Bakery", "Delhi")
+
+        assert known.contains("0x5:0x6", "New Bakery", "Delhi")
+
+    def test_name_key_normalizes(self):
+        assert name_key("Joe's  Pizza", "New York, NY") == name_key("joe s pizza", "new york ny")
+
+
+class TestKnownLeadsReport:
+    """Tests for the per-task skip report."""
+
+    def test_false_positive_rate(self):
+        report = known_leads_report({"cards_skipped_known": 40, "known_audited": 4, "known_false_positives": 1})
+
+        assert report == {"skipped": 40, "audited": 4, "false_positives": 1, "false_positive_rate": 0.25}
+
+    def test_no_audits(self):
+        assert known_leads_report({"cards_skipped_known": 3})["false_positive_rate"] is None
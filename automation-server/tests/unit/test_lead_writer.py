@@ -0,0 +1,139 @@
+"""
+Tests for the write-behind lead writer.
+"""
+import threading
+import time
+from app.services.lead_writer import LeadWriter
+
+
+def lead(name):
+    return {"business_name": name}
+
+
+class TestLeadWriter:
+    """Tests for batching, results, backpressure and flushing."""
+
+    def test_results_reach_callers(self, fake_database):
+        """Every submitter should learn whether its lead was new."""
+        db = fake_database()
+        writer = LeadWriter(batch_size=10, flush_ms=20, write=db.write_leads)
+        writer.start()
+        try:
+            futures = [writer.submit(lead(name)) for name in ["A", "B", "A"]]
+            assert [f.result(timeout=5) for f in futures] == [True, True, False]
+        finally:
+            writer.stop()
+
+    def test_batches_queued_leads(self, fake_database):
+        """Leads queued while a batch is written should go out together."""
+        gate = threading.Event()
+        db = fake_database(gate=gate)
+        writer = LeadWriter(batch_size=50, flush_ms=0, write=db.write_leads)
+        writer.start()
+        try:
+            first = writer.submit(lead("first"))
+            rest = [writer.submit(lead(f"lead {i}")) for i in range(20)]
+            gate.set()
+            assert all(f.result(timeout=5) for f in [first, *rest])
+        finally:
+            writer.stop()
+
+        assert sum(db.batches) == 21
+        assert len(db.batches) <= 3
+        assert writer.get_stats()["new_leads"] == 21
+
+    def test_full_queue_blocks_submit(self, fake_database):
+        """A full queue should make submitters wait instead of buffering more."""
+        gate = threading.Event()
+        writer = LeadWriter(queue_size=2, batch_size=1, flush_ms=0, write=fake_database(gate=gate).write_leads)
+        writer.start()
+        try:
+            futures = [writer.submit(lead("A"))]
+            # Wait until the writer holds A, so B and C fill the queue
+            while writer.get_stats()["queued"]:
+                time.sleep(0.01)
+            futures += [writer.submit(lead(name)) for name in ["B", "C"]]
+            blocked = threading.Thread(target=lambda: futures.append(writer.submit(lead("D"))))
+            blocked.start()
+            blocked.join(0.2)
+            assert blocked.is_alive()
+
+            gate.set()
+            blocked.join(5)
+            assert not blocked.is_alive()
+            assert all(f.result(timeout=5) for f in futures)
+            assert writer.get_stats()["backpressure_waits"] == 1
+        finally:
+            gate.set()
+            writer.stop()
+
+    def test_flush_waits_for_queued_leads(self, fake_database):
+        """flush() should return once everything submitted so far is written."""
+        gate = threading.Event()
+        db = fake_database(gate=gate)
+        writer = LeadWriter(flush_ms=0, write=db.write_leads)
+        writer.start()
+        try:
+            writer.submit(lead("A"))
+            assert writer.flush(timeout=0.1) is False
+
+            gate.set()
+            assert writer.flush(timeout=5) is True
+            assert db.names == {"A"}
+        finally:
+            writer.stop()
+
+    def test_stop_writes_queued_leads(self, fake_database):
+        """Stopping the writer should not drop leads still in the queue."""
+        db = fake_database()
+        writer = LeadWriter(flush_ms=1000, write=db.write_leads)
+        writer.start()
+        futures = [writer.submit(lead(name)) for name in ["A", "B"]]
+        writer.stop()
+
+        assert db.names == {"A", "B"}
+        assert all(f.done() for f in futures)
+
+    def test_stop_timeout_leaves_queue_to_thread(self, fake_database):
+        """A writer still busy when stop() times out should keep its queue to itself."""
+        gate = threading.Event()
+        db = fake_database(gate=gate)
+        writer = LeadWriter(flush_ms=0, write=db.write_leads)
+        writer.start()
+        try:
+            first = writer.submit(lead("A"))
+            while writer.get_stats()["queued"]:
+                time.sleep(0.01)
+            second = writer.submit(lead("B"))
+
+            writer.stop(timeout=0.1)
+            assert writer.running
+            assert db.batches == []
+
+            gate.set()
+            assert first.result(timeout=5) is True
+            assert second.result(timeout=5) is True
+        finally:
+            gate.set()
+            writer.stop()
+
+        assert db.batches == [1, 1]
+
+    def test_failed_batch_raises_in_callers(self, fake_database):
+        """A batch the database rejected should surface as an error to its submitters."""
+        writer = LeadWriter(flush_ms=0, write=fake_database(fail=True).write_leads)
+        writer.start()
+        try:
+            future = writer.submit(lead("A"))
+            assert isinstance(future.exception(timeout=5), RuntimeError)
+            assert writer.get_stats()["failed_batches"] == 1
+        finally:
+            writer.stop()
+
+    def test_writes_directly_when_not_running(self, fake_database):
+        """Without the writer thread a lead should be written on submit."""
+        db = fake_database()
+        writer = LeadWriter(write=db.write_leads)
+
+        assert writer.submit(lead("A")).result(timeout=0) is True
+        assert db.batches == [1]
@@ -0,0 +1,113 @@
+"""
+Tests for decoding Google Maps network payloads.
+"""
+import json
+from app.services.maps_payload import (
+    XSSI_PREFIX,
+    decode_places,
+    feature_id_from_url,
+    is_payload_url,
+    place_key,
+)
+
+
+def make_record(feature_id="0x89d4cb:0x1a2b", name="Test Bakery", website=None, claim_link=None):
+    """Build a place record with values at the offsets the decoder reads."""
+    record = [None] * 180
+    record[4] = [None] * 9
+    record[4][7] = 4.5
+    record[4][8] = 120
+    if website:
+        record[7] = [website, "testbakery.com"]
+    record[10] = feature_id
+    record[11] = name
+    record[13] = ["Bakery", "Cafe"]
+    record[18] = f"{name}, 123 Bread St, Toronto"
+    record[39] = "123 Bread St, Toronto"
+    record[78] = "ChIJtest123"
+    record[178] = [["+1 416-555-0100"]]
+    if claim_link:
+        record[49] = [claim_link]
+    return record
+
+
+def make_body(*records):
+    """Wrap records the way a search response nests them."""
+    return XSSI_PREFIX + "\n" + json.dumps([["query", [[None, record] for record in records]]])
+
+
+class TestDecodePlaces:
+    """Tests for place record decoding."""
+
+    def test_decodes_all_fields(self):
+        """A record should map onto the lead fields."""
+        places = decode_places(make_body(make_record(website="https://testbakery.com")))
+
+        assert len(places) == 1
+        place = places[0]
+        assert place["feature_id"] == "0x89d4cb:0x1a2b"
+        assert place["place_id"] == "ChIJtest123"
+        assert place["business_name"] == "Test Bakery"
+        assert place["address"] == "123 Bread St, Toronto"
+        assert place["phone"] == "+1 416-555-0100"
+        assert place["rating"] == 4.5
+        assert place["review_count"] == 120
+        assert place["category"] == "Bakery"
+        assert place["has_website"] is True
+        assert place["website_url"] == "https://testbakery.com"
+        assert place["is_claimed"] is True
+
+    def test_missing_website_and_claim_link(self):
+        """No website and a claim link should flag a high-value lead."""
+        record = make_record(claim_link="https://business.google.com/create?fid=1")
+        place = decode_places(make_body(record))[0]
+
+        assert place["has_website"] is False
+        assert place["website_url"] is None
+        assert place["is_claimed"] is False
+
+    def test_address_fallback_strips_name(self):
+        """The short address slot should be used with the name prefix removed."""
+        record = make_record()
+        record[39] = None
+        place = decode_places(make_body(record))[0]
+
+        assert place["address"] == "123 Bread St, Toronto"
+
+    def test_nested_payload_strings_and_duplicates(self):
+        """XSSI-prefixed strings should be decoded and duplicates dropped."""
+        inner = make_body(make_record(), make_record(feature_id="0x1:0x2", name="Other"))
+        body = json.dumps([inner, [make_record()]])
+
+        names = sorted(p["business_name"] for p in decode_places(body))
+
+        assert names == ["Other", "Test Bakery"]
+
+    def test_invalid_body(self):
+        """Non-JSON bodies should decode to nothing."""
+        assert decode_places("<html></html>") == []
+
+
+class TestPayloadHelpers:
+    """Tests for URL helpers."""
+
+    def test_feature_id_from_url(self):
+        """Feature id should be parsed from the place URL data segment."""
+        url = "https://www.google.com/maps/place/Test+Bakery/data=!4m7!3m6!1s0x89d4cb:0x1a2b!8m2!3d43.6!4d-79.3"
+        assert feature_id_from_url(url) == "0x89d4cb:0x1a2b"
+        assert feature_id_from_url("https://www.google.com/maps/place/Test") is None
+        assert feature_id_from_url(None) is None
+
+    def test_place_key(self):
+        """Place key should prefer feature id, then place id, then the bare URL."""
+        base = "https://www.google.com/maps/place/Test+Bakery"
+        assert place_key(base + "/data=!4m7!3m6!1s0x89d4cb:0x1a2b!8m2?authuser=0") == "0x89d4cb:0x1a2b"
+        assert place_key(base + "/data=!4m2!3m1!19sChIJtest123?hl=en") == "ChIJtest123"
+        assert place_key(base + "?hl=en") == base
+        assert place_key(None) is None
+
+    def test_is_payload_url(self):
+        """Only search and place XHRs should be captured."""
+        assert is_payload_url("https://www.google.com/search?tbm=map&q=bakery")
+        assert is_payload_url("https://www.google.com/maps/preview/place?pb=!1m1")
+        assert not is_payload_url("https://www.google.com/maps/vt?pb=tile")
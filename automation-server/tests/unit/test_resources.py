@@ -0,0 +1,26 @@
+"""
+Tests for lean-mode request routing.
+"""
+from app.services.resources import should_block
+
+
+class TestLeanRouting:
+    """Tests for the lean-mode block/allow decision."""
+
+    def test_blocks_non_essential_types(self):
+        """Images, fonts and media should be aborted."""
+        assert should_block("https://www.gstatic.com/some/font.woff2", "font")
+        assert should_block("https://example.com/video.mp4", "media")
+        assert should_block("https://www.google.com/images/icon.png", "image")
+
+    def test_blocks_tiles_and_photos(self):
+        """Map tiles and photo hosts should be aborted whatever their type."""
+        assert should_block("https://www.google.com/maps/vt?pb=!1m5", "xhr")
+        assert should_block("https://lh5.googleusercontent.com/p/AF1Q=w80", "fetch")
+
+    def test_allows_extraction_requests(self):
+        """Documents, app code and place/search XHRs must go through."""
+        assert not should_block("https://www.google.com/maps/search/bakery+in+Toronto?hl=en", "document")
+        assert not should_block("https://www.google.com/search?tbm=map&q=bakery", "xhr")
+        assert not should_block("https://www.google.com/maps/preview/place?pb=!1m1", "xhr")
+        assert not should_block("https://www.google.com/maps/_/js/k=maps.m.en.abc", "script")
@@ -0,0 +1,473 @@
+"""
+Tests for the scraper's pure helpers (no browser needed).
+"""
+from app.models.automation import CardPrefilter
+from contextlib import asynccontextmanager
+import asyncio
+import pytest
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from app.services import scraper
+from app.services.scraper import (
+    HAR_RECORD,
+    HAR_REPLAY,
+    _har_options,
+    _wait_for,
+    _waited,
+    iter_google_maps,
+    iter_google_maps_async,
+    merge_scrape_stats,
+    new_scrape_stats,
+    passes_prefilter,
+    select_new_cards,
+)
+
+
+def make_feed(*ids):
+    return [
+        make_card(name=f"Place {i}", place_url=f"https://www.google.com/maps/place/P{i}/data=!4m7!3m6!1s0x{i}:0x{i}?authuser=0")
+        for i in ids
+    ]
+
+
+def make_card(**overrides):
+    card = {
+        "name": "Test Bakery",
+        "place_url": "https://www.google.com/maps/place/Test+Bakery/data=!4m7!3m6!1s0x1:0x2",
+        "rating": 4.2,
+        "review_count": 35,
+        "category": "Bakery",
+        "has_website": False,
+    }
+    card.update(overrides)
+    return card
+
+
+class TestCardPrefilter:
+    """Tests for the fast-path card prefilter."""
+
+    def test_default_skips_cards_with_website(self):
+        """Default prefilter should only keep businesses without a website."""
+        prefilter = CardPrefilter().model_dump()
+
+        assert passes_prefilter(make_card(), prefilter)
+        assert not passes_prefilter(make_card(has_website=True), prefilter)
+
+    def test_review_bounds(self):
+        """Review count should be checked against min and max."""
+        prefilter = CardPrefilter(min_reviews=10, max_reviews=100).model_dump()
+
+        assert passes_prefilter(make_card(review_count=10), prefilter)
+        assert not passes_prefilter(make_card(review_count=9), prefilter)
+        assert not passes_prefilter(make_card(review_count=101), prefilter)
+
+    def test_min_rating_skips_unrated(self):
+        """Cards below the rating floor, or without a rating, should be skipped."""
+        prefilter = CardPrefilter(min_rating=4.0).model_dump()
+
+        assert passes_prefilter(make_card(rating=4.0), prefilter)
+        assert not passes_prefilter(make_card(rating=3.9), prefilter)
+        assert not passes_prefilter(make_card(rating=None), prefilter)
+
+    def test_website_allowed_when_disabled(self):
+        """Turning off skip_with_website should keep businesses with a website."""
+        prefilter = CardPrefilter(skip_with_website=False).model_dump()
+
+        assert passes_prefilter(make_card(has_website=True), prefilter)
+
+
+class TestSelectNewCards:
+    """Tests for place-id based feed tracking."""
+
+    def test_appended_cards(self):
+        """A growing feed should yield only the cards added since the last read."""
+        stats, seen = new_scrape_stats(), set()
+
+        first = select_new_cards(make_feed(1, 2), seen, 0, stats)
+        second = select_new_cards(make_feed(1, 2, 3), seen, 2, stats)
+
+        assert [key for key, _ in first] == ["0x1:0x1", "0x2:0x2"]
+        assert [key for key, _ in second] == ["0x3:0x3"]
+        assert stats["cards_repeated"] == 0
+        assert stats["cards_shifted"] == 0
+
+    def test_virtualized_feed(self):
+        """Recycled positions should neither re-open nor miss cards."""
+        stats, seen = new_scrape_stats(), set()
+        select_new_cards(make_feed(1, 2, 3), seen, 0, stats)
+
+        # Feed dropped card 1 from the top and appended cards 4 and 5
+        new_cards = select_new_cards(make_feed(2, 3, 4, 5), seen, 3, stats)
+
+        assert [card["name"] for _, card in new_cards] == ["Place 4", "Place 5"]
+        assert stats["cards_shifted"] == 1
+        assert stats["cards_repeated"] == 0
+
+    def test_reordered_feed(self):
+        """Cards pushed to new positions should be counted, not re-opened."""
+        stats, seen = new_scrape_stats(), set()
+        select_new_cards(make_feed(1, 2), seen, 0, stats)
+
+        new_cards = select_new_cards(make_feed(3, 1, 2), seen, 2, stats)
+
+        assert [key for key, _ in new_cards] == ["0x3:0x3"]
+        assert stats["cards_shifted"] == 1
+        assert stats["cards_repeated"] == 1
+
+    def test_unhydrated_cards_are_retried(self):
+        """Cards without a name or link should be picked up on a later read."""
+        stats, seen = new_scrape_stats(), set()
+        feed = make_feed(1, 2)
+        feed[1]["name"] = None
+
+        assert len(select_new_cards(feed, seen, 0, stats)) == 1
+        assert [key for key, _ in select_new_cards(make_feed(1, 2), seen, 2, stats)] == ["0x2:0x2"]
+
+
+class TestMergeScrapeStats:
+    """Tests for combining per-location stats."""
+
+    def test_sums_counters(self):
+        """Counters should add up and floats stay rounded."""
+        total, first, second = new_scrape_stats(), new_scrape_stats(), new_scrape_stats()
+        first.update(leads_saved=2, idle_seconds=0.1)
+        second.update(leads_saved=3, idle_seconds=0.2)
+
+        merge_scrape_stats(total, first)
+        merge_scrape_stats(total, second)
+
+        assert total["leads_saved"] == 5
+        assert total["idle_seconds"] == 0.3
+
+
+class TestHarOptions:
+    """Tests for record/replay argument handling."""
+
+    def test_no_har(self):
+        """Without a HAR mode the context gets no extra options."""
+        assert _har_options(None, None) == {}
+
+    def test_record_options(self, tmp_path):
+        """Recording should create the folder and attach bodies for zip archives."""
+        path = str(tmp_path / "recordings" / "run.har.zip")
+
+        options = _har_options(HAR_RECORD, path)
+
+        assert options == {"record_har_path": path, "record_har_content": "attach"}
+        assert (tmp_path / "recordings").is_dir()
+        assert _har_options(HAR_RECORD, str(tmp_path / "run.har"))["record_har_content"] == "embed"
+
+    def test_replay_needs_recording(self, tmp_path):
+        """Replaying a missing file should fail before a browser is launched."""
+        with pytest.raises(FileNotFoundError):
+            _har_options(HAR_REPLAY, str(tmp_path / "missing.har"))
+
+    def test_invalid_arguments(self):
+        """Unknown modes and missing paths should be rejected."""
+        with pytest.raises(ValueError):
+            _har_options("rewind", "run.har")
+        with pytest.raises(ValueError):
+            _har_options(HAR_RECORD, None)
+
+
+class WaitPage:
+    """Page whose wait condition holds after `holds_after` seconds, or never."""
+
+    def __init__(self, holds_after=None):
+        self.holds_after = holds_after
+
+    async def wait_for_function(self, expression, arg=None, timeout=None):
+        if self.holds_after is not None and self.holds_after * 1000 <= timeout:
+            await asyncio.sleep(self.holds_after)
+            return
+        await asyncio.sleep(timeout / 1000)
+        raise PlaywrightTimeoutError(f"Timeout {timeout}ms exceeded.")
+
+
+class TestWaits:
+    """Tests for condition-based waits and their idle time accounting."""
+
+    def test_condition_ends_wait_early(self):
+        """A wait should end when its condition holds, counting the time saved vs the fixed sleep."""
+        stats = new_scrape_stats()
+
+        result = asyncio.run(_waited(stats, _wait_for(WaitPage(holds_after=0.01), "() => true", timeout_ms=1000), fixed_seconds=0.5))
+
+        assert result is True
+        assert (stats["waits"], stats["wait_timeouts"]) == (1, 0)
+        assert stats["idle_seconds"] < 0.5
+        assert stats["idle_saved_seconds"] > 0.3
+
+    def test_timeout_returns_false(self):
+        """A condition that never holds should time out without raising, and save nothing."""
+        stats = new_scrape_stats()
+
+        result = asyncio.run(_waited(stats, _wait_for(WaitPage(), "() => false", timeout_ms=50), fixed_seconds=0.01))
+
+        assert result is False
+        assert (stats["waits"], stats["wait_timeouts"]) == (1, 1)
+        assert stats["idle_seconds"] >= 0.05
+        assert stats["idle_saved_seconds"] == 0
+
+    def test_failed_wait_is_still_charged(self):
+        """A wait that raises should propagate, with its time still charged as idle."""
+        stats = new_scrape_stats()
+
+        async def broken():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("page closed")
+
+        with pytest.raises(RuntimeError, match="page closed"):
+            asyncio.run(_waited(stats, broken(), fixed_seconds=1))
+        assert (stats["waits"], stats["wait_timeouts"]) == (1, 0)
+        assert stats["idle_seconds"] > 0
+
+
+def fake_scrape(count, produced, fail=False):
+    """Stand-in for the browser part of the scraper: emits `count` leads."""
+    async def scrape(stop_signal=None, sink=None, emit=None, **kwargs):
+        for i in range(count):
+            if stop_signal and stop_signal():
+                return
+            lead = {"place_id": f"p{i}", "business_name": f"Place {i}"}
+            await emit({**lead, "is_new": sink(lead)})
+            produced.append(i)
+        if fail:
+            raise RuntimeError("browser crashed")
+    return scrape
+
+
+class TestIterGoogleMaps:
+    """Tests for streaming leads out of the scraper."""
+
+    def test_async_yields_leads_in_order(self, monkeypatch):
+        """Leads should come out as they are emitted, after going through the sink."""
+        monkeypatch.setattr(scraper, "_scrape_google_maps", fake_scrape(3, []))
+
+        async def collect():
+            return [lead async for lead in iter_google_maps_async("bakery", "Toronto", sink=lambda lead: lead["place_id"] != "p1")]
+
+        leads = asyncio.run(collect())
+        assert [lead["place_id"] for lead in leads] == ["p0", "p1", "p2"]
+        assert [lead["is_new"] for lead in leads] == [True, False, True]
+
+    def test_async_scrape_waits_for_slow_consumer(self, monkeypatch):
+        """The scrape should not run more than the queue size ahead of the consumer."""
+        produced = []
+        monkeypatch.setattr(scraper, "_scrape_google_maps", fake_scrape(500, produced))
+
+        async def take_one():
+            leads = iter_google_maps_async("bakery", "Toronto", sink=lambda lead: True)
+            first = await anext(leads)
+            await asyncio.sleep(0.05)
+            await leads.aclose()
+            return first
+
+        assert asyncio.run(take_one())["place_id"] == "p0"
+        assert len(produced) <= scraper.LEAD_QUEUE_SIZE + 2
+
+    def test_async_errors_reach_consumer(self, monkeypatch):
+        """An exception in the scrape should be raised after the leads found before it."""
+        monkeypatch.setattr(scraper, "_scrape_google_maps", fake_scrape(2, [], fail=True))
+
+        async def collect(leads):
+            async for lead in iter_google_maps_async("bakery", "Toronto", sink=lambda lead: True):
+                leads.append(lead)
+
+        leads = []
+        with pytest.raises(RuntimeError, match="browser crashed"):
+            asyncio.run(collect(leads))
+        assert len(leads) == 2
+
+    def test_sync_iterator_stops_scrape_when_closed(self, monkeypatch):
+        """Breaking out of the blocking iterator should stop the scrape."""
+        produced = []
+        monkeypatch.setattr(scraper, "_scrape_google_maps", fake_scrape(500, produced))
+        monkeypatch.setattr(scraper, "insert_lead", lambda lead: True)
+
+        leads = iter_google_maps(industry="bakery", location="Toronto")
+        assert next(leads)["place_id"] == "p0"
+        leads.close()
+        stopped_at = len(produced)
+
+        assert stopped_at < 500
+        assert len(produced) == stopped_at
+
+    def test_sync_iterator_passes_stop_signal(self, monkeypatch):
+        """The caller's stop signal should still end the scrape."""
+        monkeypatch.setattr(scraper, "_scrape_google_maps", fake_scrape(5, []))
+        monkeypatch.setattr(scraper, "insert_lead", lambda lead: True)
+
+        assert list(iter_google_maps(industry="bakery", location="Toronto", stop_signal=lambda: True)) == []
+
+
+class NoFeedPage:
+    """Search page whose results feed never appears."""
+
+    def __init__(self):
+        self.waited_for = []
+
+    async def goto(self, url, timeout=None):
+        pass
+
+    async def wait_for_selector(self, selector, timeout=None):
+        self.waited_for.append(selector)
+        raise TimeoutError(selector)
+
+    def on(self, event, handler):
+        pass
+
+
+class NoFeedContext:
+    def __init__(self):
+        self.page = NoFeedPage()
+
+    async def new_page(self):
+        return self.page
+
+    async def new_cdp_session(self, page):
+        raise RuntimeError("no CDP")
+
+    def on(self, event, handler):
+        pass
+
+
+class TestNoFeed:
+    """Tests for searches whose results feed never loads."""
+
+    def test_missing_feed_ends_search_quietly(self, monkeypatch, capsys):
+        """A search without a feed should end with no leads, not a critical error."""
+        context = NoFeedContext()
+
+        @asynccontextmanager
+        async def browser_context(**options):
+            yield context
+
+        monkeypatch.setattr(scraper, "_browser_context", browser_context)
+        emitted = []
+
+        async def emit(lead):
+            emitted.append(lead)
+
+        asyncio.run(scraper._scrape_google_maps("bakery", "Toronto", sink=lambda lead: True, emit=emit))
+
+        output = capsys.readouterr().out
+        assert 'div[role="feed"]' in context.page.waited_for
+        assert "Could not find feed" in output
+        assert "Critical Error" not in output
+        assert emitted == []
+
+
+
+class FeedPage:
+    """Search page whose feed shows a fixed list of cards that never grows."""
+
+    def __init__(self, cards):
+        self.cards = cards
+        self.mouse = self
+
+    async def goto(self, url, timeout=None):
+        pass
+
+    async def wait_for_selector(self, selector, timeout=None):
+        if "Accept all" in selector:
+            raise TimeoutError(selector)
+
+    async def evaluate(self, expression, arg=None):
+        return self.cards
+
+    async def query_selector(self, selector):
+        return None
+
+    async def query_selector_all(self, selector):
+        return []
+
+    async def hover(self, selector):
+        pass
+
+    async def wheel(self, delta_x, delta_y):
+        pass
+
+    async def wait_for_function(self, expression, arg=None, timeout=None):
+        return True
+
+    def get_by_text(self, text):
+        return self
+
+    async def is_visible(self):
+        return False
+
+    def on(self, event, handler):
+        pass
+
+
+class FeedContext(NoFeedContext):
+    def __init__(self, cards):
+        self.page = FeedPage(cards)
+
+
+def run_feed_scrape(monkeypatch, cards, sink, **kwargs):
+    """Run the async engine over a fake feed, with instant detail pages. Returns the emitted leads."""
+    context = FeedContext(cards)
+
+    @asynccontextmanager
+    async def browser_context(**options):
+        yield context
+
+    async def open_place(page, expected_name, place_url, stats):
+        await asyncio.sleep(0.01)
+        return expected_name
+
+    async def extract_details(page, expected_name, stats):
+        return {"rating": 4.5, "review_count": 10, "is_claimed": False, "address": "1 Main St"}
+
+    monkeypatch.setattr(scraper, "_browser_context", browser_context)
+    monkeypatch.setattr(scraper, "_open_place", open_place)
+    monkeypatch.setattr(scraper, "_extract_details", extract_details)
+    emitted = []
+
+    async def emit(lead):
+        emitted.append(lead)
+
+    asyncio.run(scraper._scrape_google_maps("bakery", "Toronto", sink=sink, emit=emit, **kwargs))
+    return emitted
+
+
+class TestConcurrentLimit:
+    """Tests for the lead limit with several detail pages open at once."""
+
+    def test_concurrent_pages_stop_at_total(self, monkeypatch):
+        """Detail pages finishing together should not save more leads than `total`."""
+        saved = []
+
+        def sink(lead):
+            saved.append(lead["place_id"])
+            return True
+
+        emitted = run_feed_scrape(monkeypatch, make_feed(*range(1, 9)), sink, total=2, concurrency=5)
+
+        assert len(saved) == 2
+        assert [lead["is_new"] for lead in emitted] == [True, True]
+
+    def test_duplicates_free_their_slot(self, monkeypatch):
+        """A lead that turns out to be a duplicate should not use up the limit."""
+        # The first place is already stored
+        emitted = run_feed_scrape(
+            monkeypatch, make_feed(*range(1, 9)), lambda lead: lead["business_name"] != "Place 1",
+            total=2, concurrency=5
+        )
+
+        assert [lead["is_new"] for lead in emitted].count(True) == 2
+
+
+class TestKnownLeadsOptIn:
+    """Tests for the in-process known-leads set with skip_known off."""
+
+    def test_saved_leads_not_remembered_without_skip_known(self, monkeypatch):
+        """Without skip_known nothing reads the set, so nothing should be added to it."""
+        added = []
+        monkeypatch.setattr(scraper.known_leads, "add", lambda *args: added.append(args))
+
+        emitted = run_feed_scrape(monkeypatch, make_feed(1, 2), lambda lead: True, total=2)
+
+        assert len(emitted) == 2
+        assert added == []
@@ -0,0 +1,96 @@
+"""
+Tests for the search result cache.
+"""
+import uuid
+import pytest
+from app.db.database import get_connection
+from app.db.search_cache import normalize_query, get_cached_search, store_search, get_search_cache_stats
+from config import settings
+
+
+@pytest.fixture
+def query_key():
+    key = normalize_query("bakery", f"Testville {uuid.uuid4()}")
+    yield key
+    with get_connection() as conn:
+        conn.execute("DELETE FROM search_cache WHERE query_key = %s", (key,))
+
+
+def age_entry(query_key, seconds):
+    with get_connection() as conn:
+        conn.execute(
+            "UPDATE search_cache SET created_at = created_at - make_interval(secs => %s) WHERE query_key = %s",
+            (seconds, query_key)
+        )
+
+
+class TestNormalizeQuery:
+    """Tests for cache keys."""
+
+    def test_ignores_case_spacing_and_punctuation(self):
+        """Spellings of the same search should share a key."""
+        assert normalize_query("Gyms", "New York, NY") == normalize_query(" gyms ", "new york  ny")
+
+    def test_variant_separates_searches(self):
+        """Searches finding different places should not share a key."""
+        assert normalize_query("gyms", "Delhi", "tiled") != normalize_query("gyms", "Delhi")
+
+
+class TestSearchCache:
+    """Tests for storing and looking up searches."""
+
+    def test_hit_within_max_age(self, query_key):
+        """A fresh complete entry should be returned with its place ids."""
+        assert store_search(query_key, "bakery", "Testville", ["b", "a"], complete=True)
+
+        cached = get_cached_search(query_key, max_age_seconds=3600)
+        assert cached["place_ids"] == ["a", "b"]
+        assert cached["age_seconds"] <= 1
+
+    def test_older_than_max_age_misses(self, query_key):
+        """Entries older than the request's max_age should not be used."""
+        store_search(query_key, "bakery", "Testville", ["a"], complete=True)
+        age_entry(query_key, 7200)
+
+        assert get_cached_search(query_key, max_age_seconds=3600) is None
+        assert get_cached_search(query_key, max_age_seconds=86400) is not None
+
+    def test_ttl_caps_max_age(self, query_key, monkeypatch):
+        """Entries past the TTL should miss whatever max_age asks for."""
+        monkeypatch.setattr(settings, "search_cache_ttl_seconds", 60)
+        store_search(query_key, "bakery", "Testville", ["a"], complete=True)
+        age_entry(query_key, 120)
+
+        assert get_cached_search(query_key, max_age_seconds=86400) is None
+
+    def test_incomplete_entry_needs_enough_places(self, query_key):
+        """A search cut off at a limit only serves requests it has enough places for."""
+        store_search(query_key, "bakery", "Testville", ["a", "b", "c"], complete=False)
+
+        assert get_cached_search(query_key, 3600) is None
+        assert get_cached_search(query_key, 3600, min_places=5) is None
+        assert get_cached_search(query_key, 3600, min_places=3) is not None
+
+    def test_lru_eviction(self, query_key, monkeypatch):
+        """Beyond the size cap the least recently used entries should be evicted."""
+        other = normalize_query("bakery", f"Otherville {uuid.uuid4()}")
+        store_search(query_key, "bakery", "Testville", ["a"], complete=True)
+        monkeypatch.setattr(settings, "search_cache_max_entries", 1)
+        store_search(other, "bakery", "Otherville", ["b"], complete=True)
+
+        assert get_cached_search(query_key, 3600) is None
+        assert get_cached_search(other, 3600) is not None
+        with get_connection() as conn:
+            conn.execute("DELETE FROM search_cache WHERE query_key = %s", (other,))
+
+    def test_stats_count_hits_and_misses(self, query_key):
+        """Lookups should show up in the hit ratio."""
+        before = get_search_cache_stats()
+        store_search(query_key, "bakery", "Testville", ["a"], complete=True)
+        get_cached_search(query_key, 3600)
+        get_cached_search(normalize_query("bakery", "Nowhere"), 3600)
+
+        after = get_search_cache_stats()
+        assert after["lookups"] - before["lookups"] == 2
+        assert after["hits"] - before["hits"] == 1
+        assert 0 <= after["hit_ratio"] <= 1
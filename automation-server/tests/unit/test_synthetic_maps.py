@@ -0,0 +1,46 @@
+"""
+Tests for the synthetic Maps server used by the benchmarks (no browser needed).
+"""
+from urllib.request import urlopen
+from benchmarks.synthetic_maps import SyntheticMapsConfig, SyntheticMapsServer
+from app.services.maps_payload import decode_places
+
+
+def fetch(url):
+    with urlopen(url) as response:
+        return response.read().decode("utf-8")
+
+
+class TestSyntheticMapsServer:
+    """Tests for the markup and payloads the scraper is benchmarked against."""
+
+    def test_search_page_markup(self):
+        """The search page should inline the first cards and their records."""
+        config = SyntheticMapsConfig(feed_size=30, page_size=10, latency_ms=0)
+        with SyntheticMapsServer(config) as server:
+            page = fetch(f"{server.base_url}/maps/search/bakery+in+Testville?hl=en")
+
+        assert page.count('role="article"') == 10
+        assert 'role="feed"' in page
+        assert 'class="qBF1Pd"' in page
+        assert "window.APP_INITIALIZATION_STATE" in page
+        assert "HlvSq" in page
+
+    def test_feed_payload_decodes(self):
+        """Lazy-loaded pages should decode with the network-mode decoder."""
+        config = SyntheticMapsConfig(feed_size=25, page_size=10, latency_ms=0)
+        with SyntheticMapsServer(config) as server:
+            places = decode_places(fetch(f"{server.base_url}/search?tbm=map&q=bakery&offset=20"))
+
+        assert [p["business_name"].split()[-1] for p in places] == ["21", "22", "23", "24", "25"]
+        assert all(p["address"].endswith("Benchmark St, Testville") for p in places)
+
+    def test_place_page(self):
+        """Place pages should be served by feature id from the card link."""
+        config = SyntheticMapsConfig(feed_size=5, latency_ms=0)
+        with SyntheticMapsServer(config) as server:
+            place = server.places[2]
+            page = fetch(server.place_url(place))
+
+        assert f'<h1 class="DUwDvf">{place["name"]}</h1>' in page
+        assert 'data-item-id=\\"address\\"' in page
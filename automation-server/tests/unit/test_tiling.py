@@ -0,0 +1,63 @@
+"""
+Tests for the geographic tiling planner.
+"""
+from app.services.tiling import (
+    MAX_INITIAL_TILES,
+    is_saturated,
+    lookup_bounds,
+    plan_tiles,
+    subdivide,
+    tile_search_url,
+    tile_zoom,
+)
+
+
+class TestGazetteer:
+    """Tests for the offline location lookup."""
+
+    def test_lookup_names_and_aliases(self):
+        """Case, country suffixes and old names should resolve to one entry."""
+        assert lookup_bounds("Mumbai") == lookup_bounds("mumbai, India") == lookup_bounds("Bombay")
+        assert lookup_bounds("Atlantis") is None
+
+
+class TestPlanTiles:
+    """Tests for splitting a bounding box into viewport tiles."""
+
+    def test_grid_covers_bounds(self):
+        """Tiles should cover the box exactly and be about the requested size."""
+        bounds = lookup_bounds("Mumbai")
+        tiles = plan_tiles(bounds, tile_size_km=5)
+
+        assert 20 <= len(tiles) <= MAX_INITIAL_TILES
+        assert min(t["south"] for t in tiles) == bounds[0]
+        assert min(t["west"] for t in tiles) == bounds[1]
+        assert max(t["north"] for t in tiles) == bounds[2]
+        assert max(t["east"] for t in tiles) == bounds[3]
+        assert all(t["depth"] == 0 for t in tiles)
+
+    def test_grid_is_capped(self):
+        """Tiny tiles should coarsen the grid instead of exploding it."""
+        assert len(plan_tiles(lookup_bounds("Los Angeles"), tile_size_km=0.5)) <= MAX_INITIAL_TILES
+
+    def test_subdivide(self):
+        """Subdividing should yield four quadrants one level deeper and zoomed in."""
+        tile = plan_tiles(lookup_bounds("Toronto"), tile_size_km=100)[0]
+        children = subdivide(tile)
+
+        assert len(children) == 4
+        assert all(child["depth"] == 1 for child in children)
+        assert all(tile_zoom(child) == tile_zoom(tile) + 1 for child in children)
+
+    def test_search_url(self):
+        """The search URL should carry the industry and the tile viewport."""
+        tile = {"south": 43.6, "west": -79.5, "north": 43.7, "east": -79.3, "depth": 0}
+
+        assert tile_search_url("coffee shops", tile) == (
+            f"https://www.google.com/maps/search/coffee+shops/@43.650000,-79.400000,{tile_zoom(tile)}z?hl=en"
+        )
+
+    def test_saturation(self):
+        """Only feeds near the results cap should count as saturated."""
+        assert is_saturated(120)
+        assert not is_saturated(40)
@@ -0,0 +1,123 @@
+"""
+Tests for the per-key monthly usage counters.
+"""
+import pytest
+from datetime import datetime, timedelta, timezone
+from app.db.database import get_connection
+from app.db.api_keys import (
+    create_api_key,
+    delete_api_key,
+    log_usage,
+    bulk_log_usage,
+    get_usage_stats,
+    check_quota,
+    rebuild_usage_counters,
+)
+
+
+@pytest.fixture
+def key_id():
+    key_data = create_api_key(name="Counter Test", tier="free")
+    yield key_data["id"]
+    delete_api_key(key_data["id"])
+
+
+def counters(key_id):
+    with get_connection() as conn:
+        return conn.execute(
+            "SELECT month, requests, leads FROM usage_counters WHERE api_key_id = %s ORDER BY month",
+            (key_id,)
+        ).fetchall()
+
+
+class TestUsageCounters:
+    """Tests for keeping counters in step with the usage logs."""
+
+    def test_log_usage_updates_counter(self, key_id):
+        """Each logged request should add to this month's counter."""
+        log_usage(key_id, "/test", 5)
+        log_usage(key_id, "/test", 3)
+
+        rows = counters(key_id)
+        assert len(rows) == 1
+        assert rows[0]["requests"] == 2
+        assert rows[0]["leads"] == 8
+
+    def test_quota_reads_counter(self, key_id):
+        """The quota check should follow this month's counter."""
+        log_usage(key_id, "/test", 9)
+        assert check_quota(key_id, 10) is True
+
+        log_usage(key_id, "/test", 1)
+        assert check_quota(key_id, 10) is False
+        assert check_quota(key_id, -1) is True
+
+    def test_usage_stats_split_total_and_month(self, key_id):
+        """Older months should count towards totals but not this month's usage."""
+        log_usage(key_id, "/test", 4)
+        with get_connection() as conn:
+            conn.execute(
+                "INSERT INTO usage_logs (api_key_id, endpoint, leads_scraped, timestamp) VALUES (%s, '/old', 6, CURRENT_TIMESTAMP - INTERVAL '2 months')",
+                (key_id,)
+            )
+        rebuild_usage_counters(key_id)
+
+        stats = get_usage_stats(key_id)
+        assert stats["total_requests"] == 2
+        assert stats["total_leads"] == 10
+        assert stats["monthly_leads"] == 4
+        assert stats["remaining_quota"] == stats["monthly_limit"] - 4
+
+    def test_rebuild_repairs_drift(self, key_id):
+        """Rebuilding should restore counters that disagree with the logs."""
+        log_usage(key_id, "/test", 2)
+        with get_connection() as conn:
+            conn.execute("UPDATE usage_counters SET leads = 999 WHERE api_key_id = %s", (key_id,))
+
+        result = rebuild_usage_counters(key_id)
+
+        assert result == {"counters": 1, "drifted": 1}
+        assert counters(key_id)[0]["leads"] == 2
+
+    def test_rebuild_of_one_key_leaves_others(self, key_id):
+        """A per-key rebuild should not touch other keys' counters."""
+        other = create_api_key(name="Other Counter Test", tier="free")
+        try:
+            log_usage(other["id"], "/test", 1)
+            with get_connection() as conn:
+                conn.execute("UPDATE usage_counters SET leads = 50 WHERE api_key_id = %s", (other["id"],))
+
+            rebuild_usage_counters(key_id)
+
+            assert counters(other["id"])[0]["leads"] == 50
+        finally:
+            delete_api_key(other["id"])
+
+    def test_bulk_log_groups_counters_by_month(self, key_id):
+        """A batch should add to the counter of the month each event happened in."""
+        now = datetime.now(timezone.utc)
+        events = [
+            {"api_key_id": key_id, "endpoint": "/a", "leads_scraped": 2, "timestamp": now},
+            {"api_key_id": key_id, "endpoint": "/b", "leads_scraped": 3, "timestamp": now},
+            {"api_key_id": key_id, "endpoint": "/c", "leads_scraped": 4, "timestamp": now - timedelta(days=62)},
+        ]
+
+        assert bulk_log_usage(events) == 3
+
+        rows = counters(key_id)
+        assert [(r["requests"], r["leads"]) for r in rows] == [(1, 4), (2, 5)]
+        assert rebuild_usage_counters(key_id)["drifted"] == 0
+
+    def test_bulk_log_skips_deleted_keys(self, key_id):
+        """Events of a key deleted before the batch was written should be dropped."""
+        gone = create_api_key(name="Deleted Counter Test", tier="free")
+        delete_api_key(gone["id"])
+        now = datetime.now(timezone.utc)
+
+        logged = bulk_log_usage([
+            {"api_key_id": key_id, "endpoint": "/a", "leads_scraped": 1, "timestamp": now},
+            {"api_key_id": gone["id"], "endpoint": "/a", "leads_scraped": 1, "timestamp": now},
+        ])
+
+        assert logged == 1
+        assert counters(key_id)[0]["requests"] == 1
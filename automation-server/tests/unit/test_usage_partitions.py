@@ -0,0 +1,126 @@
+"""
+Tests for the monthly usage_logs partitions.
+"""
+import pytest
+from datetime import date
+from app.db.database import get_connection
+from app.db.api_keys import create_api_key, delete_api_key, log_usage
+from app.db.usage_partitions import (
+    DEFAULT_PARTITION,
+    month_start,
+    partition_name,
+    maintain_usage_partitions,
+    list_usage_partitions,
+)
+from config import settings
+
+# Far enough back not to collide with real usage
+OLD_MONTH = date(2001, 1, 1)
+
+
+@pytest.fixture
+def key_id():
+    key_data = create_api_key(name="Partition Test", tier="free")
+    yield key_data["id"]
+    delete_api_key(key_data["id"])
+
+
+def partition_of(log_id):
+    with get_connection() as conn:
+        return conn.execute(
+            "SELECT tableoid::regclass::text AS partition FROM usage_logs WHERE id = %s",
+            (log_id,)
+        ).fetchone()["partition"]
+
+
+def insert_old_log(key_id):
+    with get_connection() as conn:
+        return conn.execute(
+            "INSERT INTO usage_logs (api_key_id, endpoint, timestamp) VALUES (%s, '/old', %s) RETURNING id",
+            (key_id, OLD_MONTH.replace(day=15))
+        ).fetchone()["id"]
+
+
+def drop_old_partition():
+    with get_connection() as conn:
+        conn.execute(f"DROP TABLE IF EXISTS {partition_name(OLD_MONTH)}")
+
+
+class TestMonthMath:
+    """Tests for month arithmetic and partition names."""
+
+    def test_month_start_offsets(self):
+        assert month_start(date(2026, 10, 16)) == date(2026, 10, 1)
+        assert month_start(date(2026, 11, 30), 2) == date(2027, 1, 1)
+        assert month_start(date(2026, 1, 1), -1) == date(2025, 12, 1)
+
+    def test_partition_name(self):
+        assert partition_name(date(2026, 3, 1)) == "usage_logs_2026_03"
+
+
+class TestUsagePartitions:
+    """Tests for partition creation, routing and retention."""
+
+    def test_upcoming_months_exist(self):
+        """Startup should have created this month's and the next months' partitions."""
+        with get_connection() as conn:
+            this_month = conn.execute("SELECT date_trunc('month', CURRENT_TIMESTAMP)::date AS month").fetchone()["month"]
+        months = {p["month"] for p in list_usage_partitions()}
+
+        for i in range(settings.usage_partition_months_ahead + 1):
+            assert month_start(this_month, i).isoformat() in months
+
+    def test_logs_land_in_month_partition(self, key_id):
+        """New logs should be stored in this month's partition."""
+        log_usage(key_id, "/test", 1)
+        with get_connection() as conn:
+            row = conn.execute(
+                "SELECT id, timestamp FROM usage_logs WHERE api_key_id = %s", (key_id,)
+            ).fetchone()
+
+        assert partition_of(row["id"]) == partition_name(row["timestamp"].date())
+
+    def test_maintenance_moves_default_rows(self, key_id):
+        """Logs of a month without a partition should move into a new one."""
+        try:
+            log_id = insert_old_log(key_id)
+            assert partition_of(log_id) == DEFAULT_PARTITION
+
+            result = maintain_usage_partitions()
+
+            assert partition_name(OLD_MONTH) in result["created"]
+            assert partition_of(log_id) == partition_name(OLD_MONTH)
+        finally:
+            drop_old_partition()
+
+    def test_retention_detaches_old_months(self, key_id, monkeypatch):
+        """Months past the retention window should be detached and kept as tables."""
+        try:
+            insert_old_log(key_id)
+            maintain_usage_partitions()
+
+            monkeypatch.setattr(settings, "usage_log_retention_months", 12)
+            monkeypatch.setattr(settings, "usage_log_retention_action", "detach")
+            result = maintain_usage_partitions()
+
+            assert result["removed"] == [partition_name(OLD_MONTH)]
+            assert partition_name(OLD_MONTH) not in {p["name"] for p in list_usage_partitions()}
+            with get_connection() as conn:
+                detached = conn.execute(f"SELECT COUNT(*) AS count FROM {partition_name(OLD_MONTH)}").fetchone()
+            assert detached["count"] == 1
+        finally:
+            drop_old_partition()
+
+    def test_retention_can_drop_old_months(self, key_id, monkeypatch):
+        """With the drop action, old partitions should be deleted."""
+        insert_old_log(key_id)
+        monkeypatch.setattr(settings, "usage_log_retention_months", 12)
+        monkeypatch.setattr(settings, "usage_log_retention_action", "drop")
+
+        result = maintain_usage_partitions()
+
+        assert result["removed"] == [partition_name(OLD_MONTH)]
+        assert result["retention_action"] == "drop"
+        with get_connection() as conn:
+            gone = conn.execute("SELECT to_regclass(%s) AS oid", (partition_name(OLD_MONTH),)).fetchone()
+        assert gone["oid"] is None
@@ -0,0 +1,122 @@
+"""
+Tests for the write-behind usage writer.
+"""
+import threading
+import time
+from app.services.usage_writer import UsageWriter
+
+
+class TestUsageWriter:
+    """Tests for batching, time stamping, backpressure and flushing."""
+
+    def test_batches_queued_events(self, fake_database):
+        """Events recorded while a batch is written should go out together."""
+        gate = threading.Event()
+        db = fake_database(gate=gate)
+        writer = UsageWriter(batch_size=50, flush_ms=0, write=db.write_events)
+        writer.start()
+        try:
+            for i in range(21):
+                writer.record(1, f"/test/{i}")
+            gate.set()
+            assert writer.flush(timeout=5) is True
+        finally:
+            writer.stop()
+
+        assert sum(db.batches) == 21
+        assert len(db.batches) <= 3
+        assert writer.get_stats()["written"] == 21
+
+    def test_batch_size_triggers_write(self, fake_database):
+        """A full batch should be written without waiting for flush_ms."""
+        db = fake_database()
+        writer = UsageWriter(batch_size=5, flush_ms=60000, write=db.write_events)
+        writer.start()
+        try:
+            for _ in range(5):
+                writer.record(1, "/test")
+            assert writer.flush(timeout=5) is True
+            assert db.batches == [5]
+        finally:
+            writer.stop()
+
+    def test_events_keep_their_time(self, fake_database):
+        """Events should be stamped when recorded, not when written."""
+        gate = threading.Event()
+        db = fake_database(gate=gate)
+        writer = UsageWriter(flush_ms=0, write=db.write_events)
+        writer.start()
+        try:
+            writer.record(7, "/automation/start", 3)
+            time.sleep(0.1)
+            written_after = time.time()
+            gate.set()
+            writer.flush(timeout=5)
+        finally:
+            writer.stop()
+
+        event = db.events[0]
+        assert (event["api_key_id"], event["endpoint"], event["leads_scraped"]) == (7, "/automation/start", 3)
+        assert event["timestamp"].tzinfo is not None
+        assert event["timestamp"].timestamp() < written_after
+
+    def test_full_queue_blocks_record(self, fake_database):
+        """A full queue should make callers wait instead of buffering more."""
+        gate = threading.Event()
+        db = fake_database(gate=gate)
+        writer = UsageWriter(queue_size=2, batch_size=1, flush_ms=0, write=db.write_events)
+        writer.start()
+        try:
+            writer.record(1, "/a")
+            # Wait until the writer holds the first event, so two more fill the queue
+            while writer.get_stats()["queued"]:
+                time.sleep(0.01)
+            writer.record(1, "/b")
+            writer.record(1, "/c")
+            blocked = threading.Thread(target=writer.record, args=(1, "/d"))
+            blocked.start()
+            blocked.join(0.2)
+            assert blocked.is_alive()
+
+            gate.set()
+            blocked.join(5)
+            assert not blocked.is_alive()
+            assert writer.flush(timeout=5) is True
+            assert [e["endpoint"] for e in db.events] == ["/a", "/b", "/c", "/d"]
+            assert writer.get_stats()["backpressure_waits"] == 1
+        finally:
+            gate.set()
+            writer.stop()
+
+    def test_stop_writes_queued_events(self, fake_database):
+        """Stopping the writer should not drop events still in the queue."""
+        db = fake_database()
+        writer = UsageWriter(flush_ms=60000, write=db.write_events)
+        writer.start()
+        writer.record(1, "/a")
+        writer.record(1, "/b")
+        writer.stop()
+
+        assert [e["endpoint"] for e in db.events] == ["/a", "/b"]
+        assert writer.get_stats()["pending"] == 0
+
+    def test_failed_batch_is_counted(self, fake_database):
+        """A batch the database rejected should be counted as dropped, not hang flush()."""
+        writer = UsageWriter(flush_ms=0, write=fake_database(fail=True).write_events)
+        writer.start()
+        try:
+            writer.record(1, "/a")
+            assert writer.flush(timeout=5) is True
+            assert writer.get_stats()["dropped"] == 1
+        finally:
+            writer.stop()
+
+    def test_writes_directly_when_not_running(self, fake_database):
+        """Without the writer thread an event should be written on record."""
+        db = fake_database()
+        writer = UsageWriter(write=db.write_events)
+
+        writer.record(1, "/a")
+
+        assert db.batches == [1]
+        assert writer.get_stats()["submitted"] == 1
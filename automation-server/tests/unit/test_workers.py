@@ -0,0 +1,120 @@
+"""
+Tests for the supervised scraper worker processes.
+"""
+import os
+import threading
+import time
+import pytest
+from app.services.workers import WorkerSupervisor
+
+TARGET = "tests.unit.test_workers:fake_scrape"
+
+
+def fake_scrape(location, stop_signal, stats, marker=None, seen_keys=None, **kwargs):
+    """Stand-in for iter_google_maps, run inside the worker process."""
+    if seen_keys is not None:
+        seen_keys.add(f"place in {location}")
+    if location == "hang" and not os.path.exists(marker):
+        open(marker, "w").close()
+        time.sleep(60)
+    if location == "crash":
+        os._exit(1)
+    if location == "loop":
+        while not stop_signal():
+            time.sleep(0.01)
+        return []
+    if location == "error":
+        raise ValueError("bad location")
+
+    stats["leads_saved"] = 2
+    return [{"business_name": f"Lead in {location}"}]
+
+
+@pytest.fixture
+def supervisor():
+    supervisor = WorkerSupervisor(
+        workers=1,
+        hang_timeout_seconds=2,
+        heartbeat_seconds=0.1,
+        max_attempts=2,
+        target=TARGET,
+        use_browser_pool=False,
+    )
+    supervisor.start()
+    yield supervisor
+    supervisor.stop()
+
+
+class TestWorkerSupervisor:
+    """Tests for job dispatch, stop forwarding and the watchdog."""
+
+    def test_results_and_stats_come_back(self, supervisor):
+        """A job's leads and stats should reach the calling process."""
+        stats = {}
+
+        results = supervisor.scrape(location="Toronto", stats=stats)
+
+        assert results == [{"business_name": "Lead in Toronto"}]
+        assert stats["leads_saved"] == 2
+        assert supervisor.get_stats()["jobs_completed"] == 1
+
+    def test_sets_are_merged_back(self, supervisor):
+        """Place ids the worker adds to a set argument should reach the caller's set."""
+        seen_keys = {"known"}
+
+        supervisor.scrape(location="Toronto", seen_keys=seen_keys)
+
+        assert seen_keys == {"known", "place in Toronto"}
+
+    def test_errors_are_raised_to_caller(self, supervisor):
+        """An exception in the worker should fail the job, not the worker."""
+        with pytest.raises(RuntimeError, match="bad location"):
+            supervisor.scrape(location="error")
+
+        assert supervisor.scrape(location="Toronto")
+        assert supervisor.get_stats()["restarts"] == 0
+
+    def test_stop_signal_is_forwarded(self, supervisor):
+        """Setting the caller's stop flag should end the worker's run."""
+        stop = threading.Event()
+        threading.Timer(0.5, stop.set).start()
+
+        assert supervisor.scrape(location="loop", stop_signal=stop.is_set) == []
+
+    def test_hung_worker_is_restarted_and_job_retried(self, supervisor, tmp_path):
+        """A worker without heartbeats should be killed and its job re-run."""
+        results = supervisor.scrape(location="hang", marker=str(tmp_path / "hung"))
+
+        stats = supervisor.get_stats()
+        assert results == [{"business_name": "Lead in hang"}]
+        assert stats["hangs"] == 1
+        assert stats["restarts"] == 1
+        assert stats["jobs_requeued"] == 1
+
+    def test_respawn_does_not_block_callers(self, supervisor):
+        """Replacing a dead worker should not hold up stats or new jobs while it spawns."""
+        spawning = threading.Event()
+        spawn = supervisor._spawn
+
+        def slow_spawn(slot):
+            spawning.set()
+            time.sleep(1)
+            return spawn(slot)
+
+        supervisor._spawn = slow_spawn
+        supervisor._workers[0].process.kill()
+        assert spawning.wait(5)
+
+        start = time.monotonic()
+        supervisor.get_stats()
+        assert time.monotonic() - start < 0.5
+        assert supervisor.scrape(location="Toronto")
+        assert supervisor.get_stats()["restarts"] == 1
+
+    def test_crashing_job_fails_after_max_attempts(self, supervisor):
+        """A job that kills its worker every time should fail, and the pool recover."""
+        with pytest.raises(RuntimeError, match="crashed after 2 attempt"):
+            supervisor.scrape(location="crash")
+
+        assert supervisor.get_stats()["crashes"] == 2
+        assert supervisor.scrape(location="Toronto")